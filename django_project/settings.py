@@ -207,6 +207,24 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# "hosts" cache stores per-host request limits, shared by web and worker processes.
+# Database cache table is created by `feeds` migration `0020_create_cache_tables`.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "hosts": {
+        "BACKEND": env.str(
+            "HOSTS_CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"
+        ),
+        "LOCATION": env.str("HOSTS_CACHE_LOCATION", "feeds_host_limits"),
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -290,5 +308,84 @@ ACCOUNT_LOGOUT_REDIRECT_URL = reverse_lazy("account_login")
 
 CELERY_BROKER_URL = env("CELERY_BROKER_URL")
 
-# Number of threads in `services.feed_update()`:
+# Number of threads in `services.entries_enrich_images()`:
 FEED_UPDATE_MAX_WORKERS = env.int("FEED_UPDATE_MAX_WORKERS", 2)
+# Default engine for `services.update_all_feeds()`: "sync" or "asyncio":
+FEED_UPDATE_ENGINE = env.str("FEED_UPDATE_ENGINE", "sync")
+# Max. number of simultaneous feed requests when using "asyncio" engine:
+FEED_FETCH_CONCURRENCY = env.int("FEED_FETCH_CONCURRENCY", 100)
+# Max. size of the feed to download, in bytes. Larger feeds are rejected:
+FEED_MAX_SIZE = env.int("FEED_MAX_SIZE", 10 * 1024 * 1024)
+# Max. total time of the feed download, in seconds. Slower downloads are aborted:
+FEED_FETCH_DEADLINE = env.int("FEED_FETCH_DEADLINE", 30)
+# Number of entries processed by single `tasks.enrich_entry_images` task:
+ENTRY_IMAGE_BATCH_SIZE = env.int("ENTRY_IMAGE_BATCH_SIZE", 20)
+# Celery rate limit of `tasks.enrich_entry_images` (per worker):
+ENTRY_IMAGE_RATE_LIMIT = env.str("ENTRY_IMAGE_RATE_LIMIT", "30/m")
+# Images of new entries which are still pending are scheduled again, if the entries were
+# created between max. and min. age ago, every `ENTRY_IMAGE_PENDING_INTERVAL` (in seconds):
+ENTRY_IMAGE_PENDING_MIN_AGE = env.int("ENTRY_IMAGE_PENDING_MIN_AGE", 60 * 60)
+ENTRY_IMAGE_PENDING_MAX_AGE = env.int("ENTRY_IMAGE_PENDING_MAX_AGE", 24 * 60 * 60)
+ENTRY_IMAGE_PENDING_INTERVAL = env.int("ENTRY_IMAGE_PENDING_INTERVAL", 60 * 60)
+
+# Per-host limits of outbound HTTP requests, shared by all threads and worker processes
+# (see `feeds.host_limiter`):
+# Max. number of simultaneous requests to one host:
+HOST_MAX_CONCURRENT_REQUESTS = env.int("HOST_MAX_CONCURRENT_REQUESTS", 2)
+# Min. interval between requests to one host, in seconds:
+HOST_MIN_REQUEST_INTERVAL = env.float("HOST_MIN_REQUEST_INTERVAL", 1.0)
+# Max. time to wait for the busy host before requesting it anyway, in seconds:
+HOST_LIMIT_MAX_WAIT = env.int("HOST_LIMIT_MAX_WAIT", 30)
+# Request slot expires after this time, in case the process holding it has crashed, in seconds:
+HOST_SLOT_TIMEOUT = env.int("HOST_SLOT_TIMEOUT", 60)
+# Cache used to store request slots. Must be shared by all worker processes (table of
+# the database cache is created by `feeds` migrations):
+HOST_LIMIT_CACHE = "hosts"
+
+# Outbound HTTP requests (see `feeds.http_client`):
+# Number of hosts to keep connection pools for, per process:
+HTTP_POOL_CONNECTIONS = env.int("HTTP_POOL_CONNECTIONS", 100)
+# Max. number of keep-alive connections to each host, per process:
+HTTP_POOL_MAXSIZE = env.int("HTTP_POOL_MAXSIZE", 10)
+# Number of retries on connection errors and 500, 502, 504 responses:
+HTTP_RETRIES = env.int("HTTP_RETRIES", 2)
+# Backoff factor between retries, in seconds (0.5 means 0.5s, 1s, 2s...):
+HTTP_RETRY_BACKOFF = env.float("HTTP_RETRY_BACKOFF", 0.5)
+
+# How long to keep cached site metadata (title, favicon, og:image), in seconds:
+SITE_METADATA_TTL = env.int("SITE_METADATA_TTL", 60 * 60 * 24 * 7)
+
+# Feeds are fetched twice per average interval between their entries, within these
+# bounds, in seconds (see `services.update_due_feeds()`):
+FEED_FETCH_MIN_INTERVAL = env.int("FEED_FETCH_MIN_INTERVAL", 15 * 60)
+FEED_FETCH_MAX_INTERVAL = env.int("FEED_FETCH_MAX_INTERVAL", 24 * 60 * 60)
+# Delay before fetching the feed again after 429/503 response without `Retry-After`, in seconds:
+FEED_THROTTLE_INTERVAL = env.int("FEED_THROTTLE_INTERVAL", 60 * 60)
+# Failing feeds are fetched with exponential backoff. After this many failed fetches in a row
+# the feed is dormant, and is fetched once per `FEED_DORMANT_INTERVAL` seconds:
+FEED_DORMANT_FAILURES = env.int("FEED_DORMANT_FAILURES", 10)
+FEED_DORMANT_INTERVAL = env.int("FEED_DORMANT_INTERVAL", 7 * 24 * 60 * 60)
+# How often Celery beat looks for feeds which are due, in seconds:
+FEED_SCHEDULER_INTERVAL = env.int("FEED_SCHEDULER_INTERVAL", 5 * 60)
+# Feeds taken by a run of the scheduler are not taken by other runs for this time, unless
+# fetched earlier, in seconds:
+FEED_FETCH_CLAIM_TIMEOUT = env.int("FEED_FETCH_CLAIM_TIMEOUT", 60 * 60)
+# How often entry counters of feeds and folders are checked and repaired, in seconds:
+ENTRY_COUNTERS_RECONCILE_INTERVAL = env.int(
+    "ENTRY_COUNTERS_RECONCILE_INTERVAL", 60 * 60
+)
+
+CELERY_BEAT_SCHEDULE = {
+    "update-scheduled-feeds": {
+        "task": "feeds.tasks.update_scheduled_feeds",
+        "schedule": FEED_SCHEDULER_INTERVAL,
+    },
+    "reconcile-feed-entry-counters": {
+        "task": "feeds.tasks.reconcile_feed_entry_counters",
+        "schedule": ENTRY_COUNTERS_RECONCILE_INTERVAL,
+    },
+    "enqueue-pending-entry-images": {
+        "task": "feeds.tasks.enqueue_pending_entry_images",
+        "schedule": ENTRY_IMAGE_PENDING_INTERVAL,
+    },
+}
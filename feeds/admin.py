@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Entry, Feed, Folder, Tag
+from .models import Entry, EntryState, Feed, FeedSource, Folder, SiteMetadata, Tag
 
 
 @admin.register(Tag)
@@ -15,6 +15,21 @@ class TagAdmin(admin.ModelAdmin):
     ]
 
 
+@admin.register(SiteMetadata)
+class SiteMetadataAdmin(admin.ModelAdmin):
+    """
+    Configures admin panel views for SiteMetadata.
+    """
+
+    model = SiteMetadata
+    list_display = [
+        "host",
+        "title",
+        "favicon_url",
+        "fetched",
+    ]
+
+
 @admin.register(Folder)
 class FolderAdmin(admin.ModelAdmin):
     """
@@ -28,6 +43,22 @@ class FolderAdmin(admin.ModelAdmin):
     ]
 
 
+@admin.register(FeedSource)
+class FeedSourceAdmin(admin.ModelAdmin):
+    """
+    Configures admin panel views for FeedSource.
+    """
+
+    model = FeedSource
+    list_display = [
+        "url",
+        "next_fetch_at",
+        "last_status_code",
+        "consecutive_failures",
+        "created",
+    ]
+
+
 @admin.register(Feed)
 class FeedAdmin(admin.ModelAdmin):
     """
@@ -38,6 +69,7 @@ class FeedAdmin(admin.ModelAdmin):
     list_display = [
         "title",
         "user",
+        "source",
         "folder",
         "created",
     ]
@@ -52,10 +84,8 @@ class EntryAdmin(admin.ModelAdmin):
     model = Entry
     list_display = [
         "title",
-        "feed",
+        "source",
         "pub_date",
-        "is_read",
-        "is_favorite",
         "created",
     ]
     readonly_fields = [
@@ -67,23 +97,15 @@ class EntryAdmin(admin.ModelAdmin):
             "Main",
             {
                 "fields": [
-                    "feed",
+                    "source",
                     "title",
                     "author",
                     "url",
+                    "guid",
                     "image_url",
                 ]
             },
         ),
-        (
-            "Status",
-            {
-                "fields": [
-                    "is_read",
-                    "is_favorite",
-                ]
-            },
-        ),
         (
             "Content",
             {
@@ -107,3 +129,22 @@ class EntryAdmin(admin.ModelAdmin):
             },
         ),
     ]
+
+
+@admin.register(EntryState)
+class EntryStateAdmin(admin.ModelAdmin):
+    """
+    Configures admin panel views for EntryState.
+    """
+
+    model = EntryState
+    list_display = [
+        "entry",
+        "feed",
+        "is_read",
+        "is_favorite",
+    ]
+    raw_id_fields = [
+        "entry",
+        "feed",
+    ]
@@ -4,6 +4,12 @@ class CantGetFeedFromURL(Exception):
     pass
 
 
+class CantParseFeed(Exception):
+    """Data from feed URL is not a valid RSS or Atom feed."""
+
+    pass
+
+
 class CantSubscribeToFeed(Exception):
     """Some error has occured while trying to subscribe to feed."""
 
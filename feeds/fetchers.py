@@ -0,0 +1,360 @@
+import asyncio
+import hashlib
+import logging
+import re
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterator, Mapping, NamedTuple
+
+import httpx
+import requests
+from django.conf import settings
+
+from feeds.exceptions import CantGetFeedFromURL
+from feeds.host_limiter import async_host_limit
+from feeds.http_client import DEFAULT_TIMEOUT, USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+
+# Server asks to slow down with these status codes, optionally with `Retry-After` header.
+THROTTLE_STATUS_CODES = [429, 503]
+
+# Size of chunks feed content is downloaded with, in bytes.
+FEED_CHUNK_SIZE = 16 * 1024
+
+MAX_AGE_RE = re.compile(r"\bmax-age\s*=\s*(\d+)", re.I)
+
+
+class FeedFetchResult(NamedTuple):
+    """Result of the HTTP request to the feed URL."""
+
+    status_code: int
+    content: bytes
+    etag: str | None
+    last_modified: str | None
+    # Seconds the response may be cached for, from `Cache-Control` or `Expires` headers.
+    max_age: int | None = None
+    # Seconds to wait before the next request, from `Retry-After` header.
+    retry_after: int | None = None
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 hex digest of the response body."""
+        return hashlib.sha256(self.content).hexdigest()
+
+    @property
+    def not_modified(self) -> bool:
+        """Server responded with "304 Not Modified" to the conditional request."""
+        return self.status_code == 304
+
+    @property
+    def is_success(self) -> bool:
+        """Server responded with "2xx" status code."""
+        return 200 <= self.status_code < 300
+
+    @property
+    def is_throttled(self) -> bool:
+        """Server responded with "429 Too Many Requests" or "503 Service Unavailable"."""
+        return self.status_code in THROTTLE_STATUS_CODES
+
+
+class FeedFetchRequest(NamedTuple):
+    """Feed URL to fetch, with HTTP validators from the previous fetch."""
+
+    url: str
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+def get_feed_request_headers(
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> dict[str, str]:
+    """
+    Build HTTP headers for the feed request. If `etag` or `last_modified` are passed,
+    add headers to make conditional request.
+
+    :param str etag: `ETag` header value from the previous response.
+    :param str last_modified: `Last-Modified` header value from the previous response.
+    :return: dict with HTTP headers.
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def build_feed_fetch_result(
+    status_code: int,
+    content: bytes,
+    headers: Mapping[str, str],
+) -> FeedFetchResult:
+    """
+    Build `FeedFetchResult` from the HTTP response, parsing validators and caching headers.
+
+    :param int status_code: response status code.
+    :param bytes content: response body.
+    :param headers: case-insensitive response headers (from `requests` or `httpx`).
+    :return: `FeedFetchResult` instance.
+    """
+    retry_after = headers.get("Retry-After")
+
+    return FeedFetchResult(
+        status_code=status_code,
+        content=content,
+        etag=headers.get("ETag"),
+        last_modified=headers.get("Last-Modified"),
+        max_age=_get_max_age(headers),
+        retry_after=_get_seconds_until(retry_after) if retry_after else None,
+    )
+
+
+def _get_max_age(headers: Mapping[str, str]) -> int | None:
+    """
+    Get number of seconds the response may be cached for. `Cache-Control: max-age`
+    takes precedence over `Expires`, as in RFC 9111.
+    """
+    if match := MAX_AGE_RE.search(headers.get("Cache-Control") or ""):
+        return int(match.group(1))
+
+    if expires := headers.get("Expires"):
+        return _get_seconds_until(expires, now=_parse_http_date(headers.get("Date")))
+
+    return None
+
+
+def _get_seconds_until(value: str, now: datetime | None = None) -> int | None:
+    """
+    Convert header value, which is either delay in seconds or HTTP date, to number of
+    seconds from `now`. Dates in the past give 0.
+
+    :return: number of seconds, or None if the value can't be parsed.
+    """
+    if value.strip().isdigit():
+        return int(value)
+
+    if not (date := _parse_http_date(value)):
+        return None
+
+    now = now or datetime.now(tz=timezone.utc)
+    return max(int((date - now).total_seconds()), 0)
+
+
+def _parse_http_date(value: str | None) -> datetime | None:
+    """
+    Parse date in HTTP header (e.g. "Wed, 21 Oct 2015 07:28:00 GMT") as aware datetime.
+    """
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
+
+
+def read_response_content(response: requests.Response, deadline: float) -> bytes:
+    """
+    Read body of the streamed `requests` response, up to `settings.FEED_MAX_SIZE` bytes,
+    until `deadline`. Blocking read may not return until the whole chunk is received, so
+    the connection is shut down from the timer thread when the deadline passes.
+
+    :param requests.Response response: response of the request made with `stream=True`.
+    :param float deadline: `time.monotonic()` value to finish download by.
+    :return: response body.
+    :raises CantGetFeedFromURL: if the body is too large, or the deadline has passed.
+    :raises requests.exceptions.RequestException: in case of connection errors.
+    """
+    _check_content_length(response.headers)
+
+    timer = threading.Timer(
+        max(deadline - time.monotonic(), 0), _shutdown_connection, args=[response]
+    )
+    timer.start()
+    try:
+        return _read_chunks(response.iter_content(FEED_CHUNK_SIZE), deadline)
+    except requests.exceptions.RequestException:
+        # Connection was shut down by the timer
+        _check_download_limits(0, deadline)
+        raise
+    finally:
+        timer.cancel()
+
+
+async def aread_response_content(response: httpx.Response, deadline: float) -> bytes:
+    """
+    Same as `read_response_content()`, for the streamed `httpx` response. Reads return data
+    as soon as it's received, so the deadline is checked after each read.
+    """
+    _check_content_length(response.headers)
+
+    content = bytearray()
+    async for chunk in response.aiter_bytes(FEED_CHUNK_SIZE):
+        content += chunk
+        _check_download_limits(len(content), deadline)
+    return bytes(content)
+
+
+def _read_chunks(chunks: Iterator[bytes], deadline: float) -> bytes:
+    """
+    Join `chunks`, checking download limits after each one.
+    """
+    content = bytearray()
+    for chunk in chunks:
+        content += chunk
+        _check_download_limits(len(content), deadline)
+    # Body may be cut off when the connection is shut down
+    _check_download_limits(len(content), deadline)
+    return bytes(content)
+
+
+def _check_content_length(headers: Mapping[str, str]) -> None:
+    """
+    Check `Content-Length` header, so too large feeds are rejected before download.
+
+    :raises CantGetFeedFromURL: if the feed is too large.
+    """
+    content_length = headers.get("Content-Length") or ""
+    if content_length.isdigit():
+        _check_download_limits(int(content_length), deadline=None)
+
+
+def _check_download_limits(size: int, deadline: float | None) -> None:
+    """
+    :raises CantGetFeedFromURL: if `size` is larger than `settings.FEED_MAX_SIZE`,
+                                or `deadline` has passed.
+    """
+    if size > settings.FEED_MAX_SIZE:
+        raise CantGetFeedFromURL(f"Feed is larger than {settings.FEED_MAX_SIZE} bytes")
+
+    if deadline and time.monotonic() >= deadline:
+        raise CantGetFeedFromURL(
+            f"Feed download took longer than {settings.FEED_FETCH_DEADLINE} seconds"
+        )
+
+
+def _shutdown_connection(response: requests.Response) -> None:
+    """
+    Shut down socket of the `response`, interrupting blocked read in the other thread.
+    `http.client` drops the socket from the connection object when the server is going
+    to close the connection, so it is taken from the response stream in that case.
+    """
+    connection = getattr(response.raw, "connection", None)
+    sock = getattr(connection, "sock", None)
+    if sock is None:
+        fp = getattr(getattr(response.raw, "_fp", None), "fp", None)
+        sock = getattr(getattr(fp, "raw", None), "_sock", None)
+    if sock is None:
+        return
+
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def fetch_feeds_concurrently(
+    fetch_requests: list[FeedFetchRequest],
+) -> dict[str, FeedFetchResult | CantGetFeedFromURL]:
+    """
+    Fetch all feeds from `fetch_requests` concurrently using `asyncio` event loop.
+    Number of simultaneous requests is limited by `settings.FEED_FETCH_CONCURRENCY`.
+
+    :param list[FeedFetchRequest] fetch_requests: feed URLs to fetch.
+    :return: dict with feed URLs as keys and `FeedFetchResult` (or `CantGetFeedFromURL`
+             with the reason in case of error) as values.
+    """
+    return asyncio.run(_fetch_feeds(fetch_requests))
+
+
+def _build_async_client() -> httpx.AsyncClient:
+    """
+    Create HTTP client for concurrent feed requests, with the same `User-Agent`
+    and connection pool settings as the shared `requests` session.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.FEED_FETCH_CONCURRENCY,
+        max_keepalive_connections=settings.HTTP_POOL_CONNECTIONS,
+    )
+    return httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT},
+        timeout=DEFAULT_TIMEOUT,
+        follow_redirects=True,
+        limits=limits,
+        transport=httpx.AsyncHTTPTransport(
+            limits=limits, retries=settings.HTTP_RETRIES
+        ),
+    )
+
+
+async def _fetch_feeds(
+    fetch_requests: list[FeedFetchRequest],
+) -> dict[str, FeedFetchResult | CantGetFeedFromURL]:
+    """
+    Fetch feeds from `fetch_requests` using single HTTP client, with limited concurrency.
+    """
+    semaphore = asyncio.Semaphore(settings.FEED_FETCH_CONCURRENCY)
+
+    async with _build_async_client() as client:
+        results = await asyncio.gather(
+            *[
+                _fetch_feed(client, semaphore, fetch_request)
+                for fetch_request in fetch_requests
+            ],
+            return_exceptions=True,
+        )
+
+    fetch_results = {}
+    for fetch_request, result in zip(fetch_requests, results):
+        if isinstance(result, Exception) and not isinstance(result, CantGetFeedFromURL):
+            logger.exception(
+                "An error has occured while trying to fetch feed from URL %s",
+                fetch_request.url,
+                exc_info=result,
+            )
+            result = CantGetFeedFromURL()
+        fetch_results[fetch_request.url] = result
+    return fetch_results
+
+
+async def _fetch_feed(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    fetch_request: FeedFetchRequest,
+) -> FeedFetchResult:
+    """
+    Read feed data from `fetch_request.url`, making conditional request if validators are set.
+
+    :raises CantGetFeedFromURL: in case of any error.
+    """
+    headers = get_feed_request_headers(
+        etag=fetch_request.etag, last_modified=fetch_request.last_modified
+    )
+
+    # Wait for the host first, so feeds from busy hosts don't hold concurrency slots.
+    async with async_host_limit(fetch_request.url), semaphore:
+        deadline = time.monotonic() + settings.FEED_FETCH_DEADLINE
+        try:
+            async with client.stream(
+                "GET", fetch_request.url, headers=headers
+            ) as response:
+                content = await aread_response_content(response, deadline)
+        except httpx.TimeoutException:
+            logger.warning("Timeout when reading RSS %s", fetch_request.url)
+            raise CantGetFeedFromURL("Timeout when reading")
+        except httpx.HTTPError:
+            logger.warning("Failed to get %s", fetch_request.url)
+            raise CantGetFeedFromURL
+        except CantGetFeedFromURL as ex:
+            logger.warning("Failed to get %s: %s", fetch_request.url, ex)
+            raise
+
+    return build_feed_fetch_result(
+        status_code=response.status_code,
+        content=content,
+        headers=response.headers,
+    )
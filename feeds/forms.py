@@ -2,12 +2,16 @@ from django import forms
 from django.forms import ModelForm
 
 from feeds.models import Feed
+from feeds.services import user_subscribed_to_feed
 
 
 class FeedCreateForm(ModelForm):
+    # URL is stored in the shared feed source, not in the feed itself.
+    url = forms.URLField(max_length=1024)
+
     class Meta:
         model = Feed
-        exclude = ["user"]
+        exclude = ["user", "source"]
 
     def __init__(self, *args, **kwargs):
         """
@@ -20,9 +24,37 @@ class FeedCreateForm(ModelForm):
         """
         Check if user already has Feed with the same URL.
         """
-        url = self.data.get("url")
+        url = self.cleaned_data.get("url")
         user = self.request.user
-        if Feed.objects.filter(user=user, url=url).exists():
+        if url and user_subscribed_to_feed(user=user, feed_url=url):
+            raise forms.ValidationError(
+                "You already have subscription to {url}!".format(url=url)
+            )
+        return url
+
+
+class FeedUpdateForm(ModelForm):
+    # URL is stored in the shared feed source, see `services.feed_change_url()`.
+    url = forms.URLField(max_length=1024)
+
+    class Meta:
+        model = Feed
+        fields = ["title", "site_url", "image_url", "folder"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["url"].initial = self.instance.url
+
+    def clean_url(self):
+        """
+        Check if user already has another Feed with the new URL.
+        """
+        url = self.cleaned_data.get("url")
+        if (
+            url
+            and "url" in self.changed_data
+            and user_subscribed_to_feed(user=self.instance.user, feed_url=url)
+        ):
             raise forms.ValidationError(
                 "You already have subscription to {url}!".format(url=url)
             )
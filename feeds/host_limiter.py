@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import asynccontextmanager, contextmanager
+from urllib.parse import urlparse
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.locmem import LocMemCache
+
+logger = logging.getLogger(__name__)
+
+# Delay between attempts to acquire request slot for the busy host, in seconds. It's doubled
+# after each attempt, up to `MAX_POLL_INTERVAL`, to keep the number of cache queries low.
+POLL_INTERVAL = 0.1
+MAX_POLL_INTERVAL = 2.0
+# Prefixes of cache keys in the shared cache, and in the per-process one.
+SHARED_KEY_PREFIX = "feeds:host"
+LOCAL_KEY_PREFIX = "feeds:local-host"
+
+# Per-process cache used when the shared one is unavailable (e.g. its table is missing).
+_local_cache = LocMemCache("feeds-host-limiter", {})
+
+
+def get_host(url: str) -> str:
+    """
+    Get host name (with port, if there's one) from `url`, in lower case.
+    """
+    return urlparse(url).netloc.lower()
+
+
+def try_acquire_host_slot(host: str) -> str | None:
+    """
+    Try to acquire one of `settings.HOST_MAX_CONCURRENT_REQUESTS` request slots of the `host`,
+    without waiting. Slots are stored in the cache shared by all threads and processes,
+    and expire after `settings.HOST_SLOT_TIMEOUT` seconds, in case the process holding
+    the slot has crashed. If the shared cache fails, per-process cache is used instead.
+
+    At least `settings.HOST_MIN_REQUEST_INTERVAL` seconds must also pass since the last
+    request to the host, which keeps requests to the host spaced.
+
+    :param str host: host name.
+    :return: cache key of acquired slot, to be released with `release_host_slot()`,
+             or None if the host is busy.
+    """
+    try:
+        return _try_acquire_host_slot(
+            caches[settings.HOST_LIMIT_CACHE], SHARED_KEY_PREFIX, host
+        )
+    except Exception as ex:
+        logger.warning(
+            "Cache of host limits is unavailable, using per-process limits: %s", ex
+        )
+        return _try_acquire_host_slot(_local_cache, LOCAL_KEY_PREFIX, host)
+
+
+def release_host_slot(slot_key: str) -> None:
+    """
+    Release request slot acquired with `try_acquire_host_slot()`. Slot which can't be
+    released expires after `settings.HOST_SLOT_TIMEOUT` seconds.
+    """
+    if slot_key.startswith(LOCAL_KEY_PREFIX):
+        _local_cache.delete(slot_key)
+        return
+
+    try:
+        caches[settings.HOST_LIMIT_CACHE].delete(slot_key)
+    except Exception as ex:
+        logger.warning("Can't release host slot %s: %s", slot_key, ex)
+
+
+def _try_acquire_host_slot(cache: BaseCache, key_prefix: str, host: str) -> str | None:
+    """
+    Try to acquire request slot of the `host`, using `cache` with keys starting with
+    `key_prefix` (see `try_acquire_host_slot()`).
+    """
+    for index in range(settings.HOST_MAX_CONCURRENT_REQUESTS):
+        slot_key = f"{key_prefix}:{host}:slot:{index}"
+        if cache.add(slot_key, 1, timeout=settings.HOST_SLOT_TIMEOUT):
+            if _try_reserve_request_time(cache, key_prefix, host):
+                return slot_key
+            cache.delete(slot_key)
+            return None
+
+    return None
+
+
+def _try_reserve_request_time(cache: BaseCache, key_prefix: str, host: str) -> bool:
+    """
+    Try to be the first request to the `host` since `settings.HOST_MIN_REQUEST_INTERVAL`
+    seconds before now. Time of the last request is stored for this interval, and
+    `cache.add()` is atomic, so only one request succeeds until it expires.
+    """
+    interval = settings.HOST_MIN_REQUEST_INTERVAL
+    if interval <= 0:
+        return True
+
+    return cache.add(f"{key_prefix}:{host}:last-request", time.time(), timeout=interval)
+
+
+def _iter_poll_intervals() -> Iterator[float]:
+    """
+    Yield delays between attempts to acquire request slot, doubling each one
+    up to `MAX_POLL_INTERVAL`.
+    """
+    poll_interval = POLL_INTERVAL
+    while True:
+        yield poll_interval
+        poll_interval = min(poll_interval * 2, MAX_POLL_INTERVAL)
+
+
+@contextmanager
+def host_limit(url: str):
+    """
+    Wait for free request slot of the `url` host, then hold it until the end of the block.
+    Limit is best-effort: if the slot can't be acquired in `settings.HOST_LIMIT_MAX_WAIT`
+    seconds, the request is made anyway.
+
+    :param str url: URL to be requested.
+    """
+    host = get_host(url)
+    deadline = time.monotonic() + settings.HOST_LIMIT_MAX_WAIT
+
+    poll_intervals = _iter_poll_intervals()
+
+    slot_key = try_acquire_host_slot(host)
+    while slot_key is None and time.monotonic() < deadline:
+        time.sleep(next(poll_intervals))
+        slot_key = try_acquire_host_slot(host)
+
+    if slot_key is None:
+        logger.warning("Host %s is busy, requesting %s anyway", host, url)
+
+    try:
+        yield
+    finally:
+        if slot_key:
+            release_host_slot(slot_key)
+
+
+@asynccontextmanager
+async def async_host_limit(url: str):
+    """
+    Same as `host_limit()`, for use in `asyncio` event loop.
+
+    :param str url: URL to be requested.
+    """
+    host = get_host(url)
+    deadline = time.monotonic() + settings.HOST_LIMIT_MAX_WAIT
+
+    poll_intervals = _iter_poll_intervals()
+
+    slot_key = await sync_to_async(try_acquire_host_slot)(host)
+    while slot_key is None and time.monotonic() < deadline:
+        await asyncio.sleep(next(poll_intervals))
+        slot_key = await sync_to_async(try_acquire_host_slot)(host)
+
+    if slot_key is None:
+        logger.warning("Host %s is busy, requesting %s anyway", host, url)
+
+    try:
+        yield
+    finally:
+        if slot_key:
+            await sync_to_async(release_host_slot)(slot_key)
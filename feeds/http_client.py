@@ -0,0 +1,123 @@
+import logging
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from feeds.host_limiter import host_limit
+
+logger = logging.getLogger(__name__)
+
+# NB: `User-Agent` must be set, or some feeds will reject us.
+USER_AGENT = "RSS Reader/0.1 (+https://rss.hazadus.ru/)"
+# Default timeout for all outbound requests, in seconds.
+DEFAULT_TIMEOUT = 5.0
+# Server errors worth retrying right away. 429 and 503 are not retried, because
+# these ask the client to slow down.
+RETRY_STATUS_CODES = [500, 502, 504]
+
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """
+    Return HTTP session shared by all threads of the current process. The session keeps
+    per-host pools of keep-alive connections, so repeated requests to the same host
+    don't need new TCP and TLS handshakes.
+
+    New session is created after fork (e.g. in Celery worker processes), because
+    connections can't be shared between processes.
+
+    :return: `requests.Session` instance.
+    """
+    global _session, _session_pid
+
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = _build_session()
+            _session_pid = os.getpid()
+        return _session
+
+
+def http_get(url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """
+    Make GET request to `url` using shared HTTP session, within per-host request limits
+    (see `feeds.host_limiter`). The request slot is released when the response is
+    returned, so use `http_get_stream()` to stream the body instead of `stream=True`.
+
+    :param str url: URL to request.
+    :param float timeout: timeout in seconds.
+    :param kwargs: other keyword arguments for `requests.Session.get()`.
+    :return: `requests.Response` instance.
+    """
+    with host_limit(url):
+        return get_session().get(url, timeout=timeout, **kwargs)
+
+
+@contextmanager
+def http_get_stream(
+    url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs
+) -> Iterator[requests.Response]:
+    """
+    Make streamed GET request to `url` using shared HTTP session. The request slot of the
+    host is held, and the response is kept open, until the end of the block, so the body
+    download is within per-host request limits too.
+
+    :param str url: URL to request.
+    :param float timeout: timeout in seconds.
+    :param kwargs: other keyword arguments for `requests.Session.get()`.
+    :return: `requests.Response` instance with the body not read yet.
+    """
+    with host_limit(url):
+        with get_session().get(url, timeout=timeout, stream=True, **kwargs) as response:
+            yield response
+
+
+def http_head(
+    url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs
+) -> requests.Response:
+    """
+    Make HEAD request to `url` using shared HTTP session, following redirects, within
+    per-host request limits.
+
+    :param str url: URL to request.
+    :param float timeout: timeout in seconds.
+    :param kwargs: other keyword arguments for `requests.Session.head()`.
+    :return: `requests.Response` instance.
+    """
+    kwargs.setdefault("allow_redirects", True)
+    with host_limit(url):
+        return get_session().head(url, timeout=timeout, **kwargs)
+
+
+def _build_session() -> requests.Session:
+    """
+    Create HTTP session with connection pools and retry policy configured in settings.
+    """
+    retry = Retry(
+        total=settings.HTTP_RETRIES,
+        backoff_factor=settings.HTTP_RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=["GET", "HEAD"],
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=settings.HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    logger.debug("Created HTTP session for process %s", os.getpid())
+    return session
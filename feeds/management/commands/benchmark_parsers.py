@@ -0,0 +1,155 @@
+import logging
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from django.core.management.base import BaseCommand, CommandError
+
+from feeds.exceptions import CantGetFeedFromURL, CantParseFeed
+from feeds.models import FeedSource
+from feeds.parsers import (
+    UnsupportedFeed,
+    parse_feed_entries_fast,
+    parse_feed_entries_feedparser,
+)
+from feeds.services import get_feed_from_url
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Compare the fast feed parser with `feedparser` on a corpus of recorded feeds.
+    Fast parser time is measured both without sanitizing HTML (as it's done on update,
+    when most of the entries are already saved), and with sanitizing HTML of all entries.
+    """
+
+    help = """
+    Compare the fast feed parser with `feedparser` on a corpus of recorded feeds.
+    Use --record to save current content of all feeds in the database to the corpus first.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "corpus",
+            help="Directory with recorded feeds.",
+        )
+        parser.add_argument(
+            "--record",
+            action="store_true",
+            help="Download all feeds in the database to the corpus directory first.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of times each feed is parsed (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handles the flow of the command.
+        """
+        corpus_dir = Path(options["corpus"])
+
+        if options["record"]:
+            self.record_corpus(corpus_dir)
+
+        paths = sorted(path for path in corpus_dir.glob("*") if path.is_file())
+        if not paths:
+            raise CommandError(f"No recorded feeds in {corpus_dir}")
+
+        totals = {"feedparser": 0.0, "fast": 0.0, "fast+sanitize": 0.0}
+        for path in paths:
+            for name, time_spent in self.benchmark_feed(
+                path, options["repeat"]
+            ).items():
+                totals[name] += time_spent
+
+        logger.info("Feeds: %s, repeats: %s", len(paths), options["repeat"])
+        self.log_totals(totals)
+
+    def log_totals(self, totals: dict[str, float]) -> None:
+        """
+        Log total time spent by each parser, compared to `feedparser`.
+        """
+        for name, time_spent in totals.items():
+            logger.info(
+                "%-14s %8.3f seconds, %.1fx faster than feedparser",
+                name,
+                time_spent,
+                totals["feedparser"] / time_spent if time_spent else 0,
+            )
+
+    def record_corpus(self, corpus_dir: Path) -> None:
+        """
+        Save content of all feeds in the database to `corpus_dir`, one file per feed.
+        """
+        corpus_dir.mkdir(parents=True, exist_ok=True)
+        feed_urls = FeedSource.objects.values_list("url", flat=True)
+
+        for index, feed_url in enumerate(feed_urls):
+            try:
+                fetch_result = get_feed_from_url(feed_url)
+            except CantGetFeedFromURL:
+                continue
+            if fetch_result.is_success:
+                (corpus_dir / f"feed_{index:04}.xml").write_bytes(fetch_result.content)
+                logger.info("Recorded %s", feed_url)
+
+    def benchmark_feed(self, path: Path, repeat: int) -> dict[str, float]:
+        """
+        Parse feed from `path` with both parsers `repeat` times, and check that the results
+        are the same.
+
+        :return: dict with time spent by each parser, in seconds.
+        """
+        content = path.read_bytes()
+        try:
+            feedparser_entries = parse_feed_entries_feedparser(content)
+            fast_entries = parse_feed_entries_fast(content)
+        except (CantParseFeed, UnsupportedFeed) as ex:
+            logger.info("%s: skipped, %s", path.name, ex)
+            return {}
+
+        links = [entry.link for entry in fast_entries]
+        if links != [entry.link for entry in feedparser_entries]:
+            logger.warning("%s: parsed entries differ", path.name)
+
+        results = {
+            name: time_parser(parse, content, repeat)
+            for name, parse in [
+                ("feedparser", parse_feed_entries_feedparser),
+                ("fast", parse_feed_entries_fast),
+                ("fast+sanitize", parse_and_sanitize_feed_entries),
+            ]
+        }
+
+        logger.info(
+            "%s: %s entries, feedparser %.3f s, fast %.3f s",
+            path.name,
+            len(fast_entries),
+            results["feedparser"],
+            results["fast"],
+        )
+        return results
+
+
+def time_parser(parse: Callable[[bytes], Any], content: bytes, repeat: int) -> float:
+    """
+    Parse feed `content` with `parse` function `repeat` times.
+
+    :return: time spent, in seconds.
+    """
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        parse(content)
+    return time.perf_counter() - start_time
+
+
+def parse_and_sanitize_feed_entries(content: bytes) -> None:
+    """
+    Parse feed `content` with the fast parser, and sanitize HTML of all the entries.
+    """
+    for entry in parse_feed_entries_fast(content):
+        entry.sanitize()
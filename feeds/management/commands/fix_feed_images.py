@@ -4,7 +4,8 @@ import time
 from django.core.management.base import BaseCommand
 
 from feeds.models import Feed
-from feeds.utils import parse_page_info_from_url
+from feeds.services import site_metadata_get
+from feeds.utils import CantGetPageInfoFromURL
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,7 @@ class Command(BaseCommand):
     """
     Find and set image URLs for Feeds without those.
     Use favicon, if there's one, otherwise image from page meta.
+    Site metadata is cached per host, so feeds from the same site are resolved once.
     """
 
     help = """
@@ -30,9 +32,13 @@ class Command(BaseCommand):
         total_feeds = 0
         for feed in feeds:
             logger.info("Feed '%s' has no image", feed)
-            info = parse_page_info_from_url(url=feed.site_url)
+            try:
+                site_metadata = site_metadata_get(url=feed.site_url)
+            except CantGetPageInfoFromURL:
+                logger.warning("Can't get page info for URL %s", feed.site_url)
+                continue
             # Use favicon first, or meta image otherwise
-            image_url = info.get("favicon_url") or info.get("image_url") or None
+            image_url = site_metadata.favicon_url or site_metadata.image_url or None
             if image_url:
                 feed.image_url = image_url
                 feed.save()
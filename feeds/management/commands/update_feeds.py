@@ -3,7 +3,7 @@ import time
 
 from django.core.management.base import BaseCommand
 
-from feeds.services import update_all_feeds
+from feeds.services import FEED_UPDATE_ENGINES, update_all_feeds, update_due_feeds
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +17,26 @@ class Command(BaseCommand):
     Fetch entries and create new `Entry` instances for all feeds in the database.
     """
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--engine",
+            choices=FEED_UPDATE_ENGINES,
+            default=None,
+            help="Feed fetch engine to use (default: settings.FEED_UPDATE_ENGINE).",
+        )
+        parser.add_argument(
+            "--due",
+            action="store_true",
+            help="Update only feeds which are due according to their schedule.",
+        )
+
     def handle(self, *args, **options):
         """
         Fetch entries and create new `Entry` instances for all feeds in the database.
         """
         start_time = time.time()
-        update_all_feeds()
+        if options["due"]:
+            update_due_feeds(engine=options["engine"])
+        else:
+            update_all_feeds(engine=options["engine"])
         logger.info("--- Completed in: %s seconds ---" % (time.time() - start_time))
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0004_alter_entry_pub_date"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feed",
+            name="etag",
+            field=models.CharField(
+                blank=True, max_length=256, null=True, verbose_name="ETag"
+            ),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="last_modified",
+            field=models.CharField(
+                blank=True, max_length=64, null=True, verbose_name="Last-Modified"
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:52
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def delete_duplicate_entries(apps, schema_editor):
+    """
+    Delete duplicate entries with the same URL in the same feed, keeping the oldest one.
+    """
+    Entry = apps.get_model("feeds", "Entry")
+    duplicates = (
+        Entry.objects.order_by()
+        .values("feed_id", "url")
+        .annotate(count=Count("id"), min_id=Min("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        Entry.objects.filter(
+            feed_id=duplicate["feed_id"], url=duplicate["url"]
+        ).exclude(id=duplicate["min_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0005_feed_etag_feed_last_modified"),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_entries, migrations.RunPython.noop),
+    ]
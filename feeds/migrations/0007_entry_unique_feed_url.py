@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0006_delete_duplicate_entries"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="entry",
+            constraint=models.UniqueConstraint(
+                fields=("feed", "url"), name="unique_entry_feed_url"
+            ),
+        ),
+    ]
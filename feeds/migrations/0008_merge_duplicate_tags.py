@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:58
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """
+    Merge tags with the same title into the oldest one, moving all entries to it.
+    """
+    Tag = apps.get_model("feeds", "Tag")
+    EntryTag = apps.get_model("feeds", "Entry").tags.through
+    duplicates = (
+        Tag.objects.order_by()
+        .values("title")
+        .annotate(count=Count("id"), min_id=Min("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates:
+        duplicate_tags = Tag.objects.filter(title=duplicate["title"]).exclude(
+            id=duplicate["min_id"]
+        )
+        entry_ids = EntryTag.objects.filter(tag__in=duplicate_tags).values_list(
+            "entry_id", flat=True
+        )
+        EntryTag.objects.bulk_create(
+            [
+                EntryTag(entry_id=entry_id, tag_id=duplicate["min_id"])
+                for entry_id in set(entry_ids)
+            ],
+            ignore_conflicts=True,
+        )
+        duplicate_tags.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0007_entry_unique_feed_url"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+    ]
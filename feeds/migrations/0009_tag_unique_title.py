@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 18:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0008_merge_duplicate_tags"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="tag",
+            name="title",
+            field=models.CharField(max_length=256, unique=True, verbose_name="title"),
+        ),
+    ]
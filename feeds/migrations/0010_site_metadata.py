@@ -0,0 +1,60 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0009_tag_unique_title"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SiteMetadata",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "host",
+                    models.CharField(max_length=256, unique=True, verbose_name="host"),
+                ),
+                (
+                    "title",
+                    models.CharField(blank=True, max_length=512, verbose_name="title"),
+                ),
+                (
+                    "description",
+                    models.TextField(blank=True, verbose_name="description"),
+                ),
+                (
+                    "image_url",
+                    models.URLField(
+                        blank=True, max_length=1024, null=True, verbose_name="image URL"
+                    ),
+                ),
+                (
+                    "favicon_url",
+                    models.URLField(
+                        blank=True,
+                        max_length=1024,
+                        null=True,
+                        verbose_name="favicon URL",
+                    ),
+                ),
+                ("fetched", models.DateTimeField(verbose_name="fetched at")),
+            ],
+            options={
+                "verbose_name": "site metadata",
+                "verbose_name_plural": "site metadata",
+                "ordering": ["host"],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0010_site_metadata"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feed",
+            name="next_fetch_at",
+            field=models.DateTimeField(
+                blank=True, db_index=True, null=True, verbose_name="next fetch at"
+            ),
+        ),
+    ]
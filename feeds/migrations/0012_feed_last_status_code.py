@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0011_feed_next_fetch_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feed",
+            name="last_status_code",
+            field=models.PositiveSmallIntegerField(
+                blank=True, null=True, verbose_name="last status code"
+            ),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0012_feed_last_status_code"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feed",
+            name="consecutive_failures",
+            field=models.PositiveIntegerField(
+                default=0, verbose_name="consecutive failures"
+            ),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="last_fetch_error",
+            field=models.CharField(
+                blank=True, default="", max_length=256, verbose_name="last fetch error"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0013_feed_consecutive_failures"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feed",
+            name="content_hash",
+            field=models.CharField(
+                blank=True, max_length=64, null=True, verbose_name="content hash"
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:36
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def set_entry_guids(apps, schema_editor):
+    """
+    Use URLs of existing entries as their GUIDs. Real GUIDs are set when the entries are
+    fetched again, as the entries are also matched by URL.
+    """
+    Entry = apps.get_model("feeds", "Entry")
+    Entry.objects.filter(guid=None).update(guid=F("url"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0014_feed_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entry",
+            name="fingerprint",
+            field=models.CharField(
+                blank=True, default="", max_length=64, verbose_name="fingerprint"
+            ),
+        ),
+        migrations.AddField(
+            model_name="entry",
+            name="guid",
+            field=models.CharField(
+                blank=True, max_length=1024, null=True, verbose_name="GUID"
+            ),
+        ),
+        migrations.RunPython(set_entry_guids, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="entry",
+            constraint=models.UniqueConstraint(
+                fields=("feed", "guid"), name="unique_entry_feed_guid"
+            ),
+        ),
+    ]
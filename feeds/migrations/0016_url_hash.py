@@ -0,0 +1,96 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:39
+
+import hashlib
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# Copy of URL normalization from `feeds.utils` at the time of this migration, so the
+# hashes don't depend on later changes of it.
+TRACKING_QUERY_PARAMS = ["fbclid", "gclid", "yclid", "mc_cid", "mc_eid", "_openstat"]
+TRACKING_QUERY_PARAM_PREFIX = "utm_"
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url):
+    parsed_url = urlparse(url.strip())
+    scheme = parsed_url.scheme.lower()
+    netloc = parsed_url.netloc.lower()
+    if netloc.endswith(f":{DEFAULT_PORTS.get(scheme)}"):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    query = urlencode(
+        [
+            (name, value)
+            for name, value in parse_qsl(parsed_url.query, keep_blank_values=True)
+            if name not in TRACKING_QUERY_PARAMS
+            and not name.startswith(TRACKING_QUERY_PARAM_PREFIX)
+        ]
+    )
+    return urlunparse(
+        parsed_url._replace(
+            scheme=scheme, netloc=netloc, path=parsed_url.path or "/", query=query
+        )
+    )
+
+
+def get_url_hash(url):
+    digest = hashlib.blake2b(normalize_url(url).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def set_url_hashes(apps, schema_editor):
+    """
+    Set URL hashes of existing feeds and entries, in batches.
+    """
+    for model_name in ["Feed", "Entry"]:
+        model = apps.get_model("feeds", model_name)
+        batch = []
+        for instance in model.objects.only("pk", "url").iterator(chunk_size=BATCH_SIZE):
+            instance.url_hash = get_url_hash(instance.url)
+            batch.append(instance)
+            if len(batch) == BATCH_SIZE:
+                model.objects.bulk_update(batch, ["url_hash"])
+                batch = []
+        model.objects.bulk_update(batch, ["url_hash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0015_entry_guid_fingerprint"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="entry",
+            name="url_hash",
+            field=models.BigIntegerField(
+                blank=True, editable=False, null=True, verbose_name="URL hash"
+            ),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="url_hash",
+            field=models.BigIntegerField(
+                blank=True, editable=False, null=True, verbose_name="URL hash"
+            ),
+        ),
+        migrations.RunPython(set_url_hashes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(
+                fields=["feed", "url_hash"], name="entry_feed_url_hash_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="feed",
+            index=models.Index(
+                fields=["url_hash", "user"], name="feed_url_hash_user_idx"
+            ),
+        ),
+    ]
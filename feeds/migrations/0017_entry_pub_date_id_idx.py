@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0016_url_hash"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="entry",
+            options={
+                "ordering": ["-pub_date", "-id"],
+                "verbose_name": "entry",
+                "verbose_name_plural": "entries",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(
+                fields=["feed", "-pub_date", "-id"], name="entry_feed_pub_date_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,95 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:47
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+BATCH_SIZE = 1000
+
+
+def set_entry_counters(apps, schema_editor):
+    """
+    Set entry counters of existing feeds, in batches, then of the folders.
+    """
+    Feed = apps.get_model("feeds", "Feed")
+    Folder = apps.get_model("feeds", "Folder")
+    counter_fields = [
+        "total_entry_count",
+        "unread_entry_count",
+        "latest_entry_pub_date",
+    ]
+
+    feeds = Feed.objects.annotate(
+        entry_count=Count("entries"),
+        unread_count=Count("entries", filter=Q(entries__is_read=False)),
+        latest_pub_date=Max("entries__pub_date"),
+    ).order_by("pk")
+    batch = []
+    for feed in feeds.iterator(chunk_size=BATCH_SIZE):
+        feed.total_entry_count = feed.entry_count
+        feed.unread_entry_count = feed.unread_count
+        feed.latest_entry_pub_date = feed.latest_pub_date
+        batch.append(feed)
+        if len(batch) == BATCH_SIZE:
+            Feed.objects.bulk_update(batch, counter_fields)
+            batch = []
+    Feed.objects.bulk_update(batch, counter_fields)
+
+    folders = Folder.objects.annotate(
+        entry_count=Sum("feeds__total_entry_count"),
+        unread_count=Sum("feeds__unread_entry_count"),
+    )
+    for folder in folders:
+        folder.total_entry_count = folder.entry_count or 0
+        folder.unread_entry_count = folder.unread_count or 0
+    Folder.objects.bulk_update(
+        folders, ["total_entry_count", "unread_entry_count"], batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0017_entry_pub_date_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="feed",
+            name="latest_entry_pub_date",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="latest entry publication date",
+            ),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="total_entry_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="total entry count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="unread_entry_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="unread entry count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="folder",
+            name="total_entry_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="total entry count"
+            ),
+        ),
+        migrations.AddField(
+            model_name="folder",
+            name="unread_entry_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="unread entry count"
+            ),
+        ),
+        migrations.RunPython(set_entry_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0018_entry_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(
+                fields=["pub_date", "feed"], name="entry_pub_date_feed_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:05
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    """
+    Create tables of database caches, e.g. the one with per-host request limits
+    (see `feeds.host_limiter`). Existing tables are left as is.
+    """
+    call_command(
+        "createcachetable", database=schema_editor.connection.alias, verbosity=0
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0019_entry_pub_date_feed_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
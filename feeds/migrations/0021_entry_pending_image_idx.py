@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0020_create_cache_tables"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(
+                condition=models.Q(("image_url__isnull", True)),
+                fields=["created"],
+                name="entry_pending_image_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,177 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0021_entry_pending_image_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedSource",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.URLField(max_length=1024, verbose_name="Feed URL")),
+                (
+                    "url_hash",
+                    models.BigIntegerField(
+                        blank=True,
+                        editable=False,
+                        null=True,
+                        unique=True,
+                        verbose_name="URL hash",
+                    ),
+                ),
+                (
+                    "etag",
+                    models.CharField(
+                        blank=True, max_length=256, null=True, verbose_name="ETag"
+                    ),
+                ),
+                (
+                    "last_modified",
+                    models.CharField(
+                        blank=True,
+                        max_length=64,
+                        null=True,
+                        verbose_name="Last-Modified",
+                    ),
+                ),
+                (
+                    "content_hash",
+                    models.CharField(
+                        blank=True,
+                        max_length=64,
+                        null=True,
+                        verbose_name="content hash",
+                    ),
+                ),
+                (
+                    "next_fetch_at",
+                    models.DateTimeField(
+                        blank=True,
+                        db_index=True,
+                        null=True,
+                        verbose_name="next fetch at",
+                    ),
+                ),
+                (
+                    "last_status_code",
+                    models.PositiveSmallIntegerField(
+                        blank=True, null=True, verbose_name="last status code"
+                    ),
+                ),
+                (
+                    "consecutive_failures",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="consecutive failures"
+                    ),
+                ),
+                (
+                    "last_fetch_error",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        max_length=256,
+                        verbose_name="last fetch error",
+                    ),
+                ),
+                (
+                    "created",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created at"),
+                ),
+                (
+                    "updated",
+                    models.DateTimeField(auto_now=True, verbose_name="updated at"),
+                ),
+            ],
+            options={
+                "verbose_name": "feed source",
+                "verbose_name_plural": "feed sources",
+                "ordering": ["-created"],
+            },
+        ),
+        migrations.CreateModel(
+            name="EntryState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("is_read", models.BooleanField(default=False, verbose_name="read")),
+                (
+                    "is_favorite",
+                    models.BooleanField(
+                        default=False, verbose_name="favorite (starred)"
+                    ),
+                ),
+                (
+                    "entry",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="states",
+                        to="feeds.entry",
+                        verbose_name="entry",
+                    ),
+                ),
+                (
+                    "feed",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="entry_states",
+                        to="feeds.feed",
+                        verbose_name="feed",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "entry state",
+                "verbose_name_plural": "entry states",
+            },
+        ),
+        migrations.AddField(
+            model_name="entry",
+            name="source",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="entries",
+                to="feeds.feedsource",
+                verbose_name="feed source",
+            ),
+        ),
+        migrations.AddField(
+            model_name="feed",
+            name="source",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="feeds",
+                to="feeds.feedsource",
+                verbose_name="feed source",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="entrystate",
+            constraint=models.UniqueConstraint(
+                fields=("entry", "feed"), name="unique_entry_state_entry_feed"
+            ),
+        ),
+    ]
@@ -0,0 +1,222 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:06
+
+from django.db import migrations
+from django.db.models import Count, DateTimeField, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+# Fields of the feed fetch state, moved from the feeds to their sources.
+FETCH_STATE_FIELDS = [
+    "etag",
+    "last_modified",
+    "content_hash",
+    "next_fetch_at",
+    "last_status_code",
+    "consecutive_failures",
+    "last_fetch_error",
+]
+
+
+def fold_feed_sources(apps, schema_editor):
+    """
+    Create one source for each unique feed URL, with the fetch state of the oldest feed,
+    then fold duplicate entries of its feeds into the shared entries of the source.
+    """
+    Feed = apps.get_model("feeds", "Feed")
+    FeedSource = apps.get_model("feeds", "FeedSource")
+
+    sources_by_url_hash = {}
+    batch = []
+    for feed in Feed.objects.order_by("created", "pk").iterator(chunk_size=BATCH_SIZE):
+        if feed.url_hash not in sources_by_url_hash:
+            sources_by_url_hash[feed.url_hash] = FeedSource.objects.create(
+                url=feed.url,
+                url_hash=feed.url_hash,
+                **{field: getattr(feed, field) for field in FETCH_STATE_FIELDS},
+            )
+        feed.source = sources_by_url_hash[feed.url_hash]
+        batch.append(feed)
+        if len(batch) == BATCH_SIZE:
+            Feed.objects.bulk_update(batch, ["source"])
+            batch = []
+    Feed.objects.bulk_update(batch, ["source"])
+
+    for source in sources_by_url_hash.values():
+        fold_source_entries(apps, source)
+
+    set_entry_counters(apps)
+
+
+def fold_source_entries(apps, source):
+    """
+    Keep the oldest entry with each URL or GUID in the `source`, and move read and
+    favorite marks of the entries to the entry states of the subscribers. Duplicate
+    subscriptions of the same user are folded into the oldest one.
+    """
+    Entry = apps.get_model("feeds", "Entry")
+    EntryState = apps.get_model("feeds", "EntryState")
+    Feed = apps.get_model("feeds", "Feed")
+
+    kept_feed_pks = get_kept_feed_pks(Feed, source)
+    kept_entry_pks, duplicate_of, states = get_kept_entries_and_states(
+        Entry, source, kept_feed_pks
+    )
+
+    move_duplicate_entry_tags(apps, duplicate_of)
+
+    # Kept entries are moved to the oldest feed, so duplicate feeds can be deleted.
+    first_feed_pk = next(iter(kept_feed_pks))
+    for batch_start in range(0, len(kept_entry_pks), BATCH_SIZE):
+        batch_end = batch_start + BATCH_SIZE
+        Entry.objects.filter(pk__in=kept_entry_pks[batch_start:batch_end]).update(
+            source=source, feed_id=first_feed_pk
+        )
+
+    EntryState.objects.bulk_create(
+        [
+            EntryState(
+                feed_id=feed_pk,
+                entry_id=entry_pk,
+                is_read=is_read,
+                is_favorite=is_favorite,
+            )
+            for (feed_pk, entry_pk), (is_read, is_favorite) in states.items()
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    Feed.objects.filter(pk__in=kept_feed_pks.keys()).exclude(
+        pk__in=kept_feed_pks.values()
+    ).delete()
+
+
+def get_kept_feed_pks(Feed, source):
+    """
+    Return primary keys of the subscriptions kept for each feed of the `source`,
+    which is the oldest feed of the same user, ordered from the oldest feed.
+    """
+    kept_feed_pks = {}
+    kept_feed_pks_by_user = {}
+    for feed_pk, user_pk in (
+        Feed.objects.filter(source=source)
+        .order_by("created", "pk")
+        .values_list("pk", "user_id")
+    ):
+        kept_feed_pks[feed_pk] = kept_feed_pks_by_user.setdefault(user_pk, feed_pk)
+    return kept_feed_pks
+
+
+def get_kept_entries_and_states(Entry, source, kept_feed_pks):
+    """
+    Find the oldest entries with each URL or GUID in the feeds of the `source`, and
+    merge read and favorite marks of all their copies by kept subscription.
+
+    :return: tuple of the list of kept entry primary keys, dict with primary keys of
+             the kept entries by primary keys of duplicates, and dict with
+             `[is_read, is_favorite]` by (feed, entry) primary keys.
+    """
+    kept_pks_by_url, kept_pks_by_guid = {}, {}
+    duplicate_of = {}
+    states = {}
+    entries = (
+        Entry.objects.filter(feed__source=source)
+        .order_by("pk")
+        .values_list("pk", "feed_id", "url", "guid", "is_read", "is_favorite")
+    )
+    for pk, feed_pk, url, guid, is_read, is_favorite in entries.iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        kept_pk = kept_pks_by_guid.get(guid) or kept_pks_by_url.get(url)
+        if kept_pk is None:
+            kept_pk = kept_pks_by_url[url] = pk
+            if guid:
+                kept_pks_by_guid[guid] = pk
+        else:
+            duplicate_of[pk] = kept_pk
+
+        if is_read or is_favorite:
+            state = states.setdefault((kept_feed_pks[feed_pk], kept_pk), [False, False])
+            state[0] = state[0] or is_read
+            state[1] = state[1] or is_favorite
+
+    return list(kept_pks_by_url.values()), duplicate_of, states
+
+
+def move_duplicate_entry_tags(apps, duplicate_of):
+    """
+    Add tags of the duplicate entries to the kept ones, then delete duplicates.
+
+    :param dict duplicate_of: primary keys of the kept entries by primary keys of duplicates.
+    """
+    Entry = apps.get_model("feeds", "Entry")
+    EntryTag = Entry.tags.through
+
+    duplicate_pks = list(duplicate_of.keys())
+    for batch_start in range(0, len(duplicate_pks), BATCH_SIZE):
+        batch_end = batch_start + BATCH_SIZE
+        batch = duplicate_pks[batch_start:batch_end]
+        EntryTag.objects.bulk_create(
+            [
+                EntryTag(entry_id=duplicate_of[entry_pk], tag_id=tag_pk)
+                for entry_pk, tag_pk in EntryTag.objects.filter(
+                    entry_id__in=batch
+                ).values_list("entry_id", "tag_id")
+            ],
+            ignore_conflicts=True,
+        )
+        Entry.objects.filter(pk__in=batch).delete()
+
+
+def set_entry_counters(apps):
+    """
+    Set entry counters of the feeds from the entries of their sources and entry states,
+    then of the folders.
+    """
+    Entry = apps.get_model("feeds", "Entry")
+    EntryState = apps.get_model("feeds", "EntryState")
+    Feed = apps.get_model("feeds", "Feed")
+    Folder = apps.get_model("feeds", "Folder")
+
+    source_entries = Entry.objects.filter(source=OuterRef("source")).order_by()
+    total_count = Subquery(
+        source_entries.values("source").annotate(count=Count("pk")).values("count"),
+        output_field=IntegerField(),
+    )
+    read_count = Subquery(
+        EntryState.objects.filter(feed=OuterRef("pk"), is_read=True)
+        .order_by()
+        .values("feed")
+        .annotate(count=Count("pk"))
+        .values("count"),
+        output_field=IntegerField(),
+    )
+    Feed.objects.update(
+        total_entry_count=Coalesce(total_count, 0),
+        unread_entry_count=Coalesce(total_count, 0) - Coalesce(read_count, 0),
+        latest_entry_pub_date=Subquery(
+            source_entries.order_by("-pub_date").values("pub_date")[:1],
+            output_field=DateTimeField(),
+        ),
+    )
+
+    folders = Folder.objects.annotate(
+        entry_count=Sum("feeds__total_entry_count"),
+        unread_count=Sum("feeds__unread_entry_count"),
+    )
+    for folder in folders:
+        folder.total_entry_count = folder.entry_count or 0
+        folder.unread_entry_count = folder.unread_count or 0
+    Folder.objects.bulk_update(
+        folders, ["total_entry_count", "unread_entry_count"], batch_size=BATCH_SIZE
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0022_feed_source"),
+    ]
+
+    operations = [
+        migrations.RunPython(fold_feed_sources, migrations.RunPython.noop),
+    ]
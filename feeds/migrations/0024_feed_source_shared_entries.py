@@ -0,0 +1,145 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feeds", "0023_fold_feed_sources"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="entry",
+            name="unique_entry_feed_url",
+        ),
+        migrations.RemoveConstraint(
+            model_name="entry",
+            name="unique_entry_feed_guid",
+        ),
+        migrations.RemoveIndex(
+            model_name="entry",
+            name="entry_feed_url_hash_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="entry",
+            name="entry_feed_pub_date_id_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="entry",
+            name="entry_pub_date_feed_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="feed",
+            name="feed_url_hash_user_idx",
+        ),
+        migrations.RemoveField(
+            model_name="entry",
+            name="feed",
+        ),
+        migrations.RemoveField(
+            model_name="entry",
+            name="is_favorite",
+        ),
+        migrations.RemoveField(
+            model_name="entry",
+            name="is_read",
+        ),
+        migrations.RemoveField(
+            model_name="feed",
+            name="consecutive_failures",
+        ),
+        migrations.RemoveField(
+            model_name="feed",
+            name="content_hash",
+        ),
+        migrations.RemoveField(
+            model_name="feed",
+            name="etag",
+        ),
+        migrations.RemoveField(
+            model_name="feed",
+            name="last_fetch_error",
+        ),
+        migrations.RemoveField(
+            model_name="feed",
+            name="last_modified",
+        ),
+        migrations.RemoveField(
+            model_name="feed",
+            name="last_status_code",
+        ),
+        migrations.RemoveField(
+            model_name="feed",
+            name="next_fetch_at",
+        ),
+        migrations.RemoveField(
+            model_name="feed",
+            name="url",
+        ),
+        migrations.RemoveField(
+            model_name="feed",
+            name="url_hash",
+        ),
+        migrations.AlterField(
+            model_name="entry",
+            name="source",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="entries",
+                to="feeds.feedsource",
+                verbose_name="feed source",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="feed",
+            name="source",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="feeds",
+                to="feeds.feedsource",
+                verbose_name="feed source",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(
+                fields=["source", "url_hash"], name="entry_source_url_hash_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(
+                fields=["pub_date", "source"], name="entry_pub_date_source_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="entry",
+            index=models.Index(
+                fields=["source", "-pub_date", "-id"],
+                name="entry_source_pub_date_id_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="entry",
+            constraint=models.UniqueConstraint(
+                fields=("source", "url"), name="unique_entry_source_url"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="entry",
+            constraint=models.UniqueConstraint(
+                fields=("source", "guid"), name="unique_entry_source_guid"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="feed",
+            constraint=models.UniqueConstraint(
+                fields=("user", "source"), name="unique_feed_user_source"
+            ),
+        ),
+    ]
@@ -1,7 +1,9 @@
 from datetime import datetime
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 
 class Tag(models.Model):
@@ -12,6 +14,7 @@ class Tag(models.Model):
     title = models.CharField(
         verbose_name="title",
         max_length=256,
+        unique=True,
     )
 
     class Meta:
@@ -23,6 +26,57 @@ class Tag(models.Model):
         return self.title
 
 
+class SiteMetadata(models.Model):
+    """
+    Cached metadata (title, images, favicon) of the web site, shared by all feeds
+    hosted on the same site.
+    """
+
+    host = models.CharField(
+        verbose_name="host",
+        max_length=256,
+        unique=True,
+    )
+    title = models.CharField(
+        verbose_name="title",
+        max_length=512,
+        blank=True,
+    )
+    description = models.TextField(
+        verbose_name="description",
+        blank=True,
+    )
+    image_url = models.URLField(
+        verbose_name="image URL",
+        max_length=1024,
+        blank=True,
+        null=True,
+    )
+    favicon_url = models.URLField(
+        verbose_name="favicon URL",
+        max_length=1024,
+        blank=True,
+        null=True,
+    )
+    fetched = models.DateTimeField(verbose_name="fetched at")
+
+    class Meta:
+        ordering = ["host"]
+        verbose_name = "site metadata"
+        verbose_name_plural = "site metadata"
+
+    def __str__(self):
+        return self.host
+
+    @property
+    def is_fresh(self) -> bool:
+        """
+        Metadata was fetched less than `settings.SITE_METADATA_TTL` seconds ago.
+        """
+        age = timezone.now() - self.fetched
+        return age.total_seconds() < settings.SITE_METADATA_TTL
+
+
 class Folder(models.Model):
     """
     Represents user-created folder containing some Feeds.
@@ -38,6 +92,17 @@ class Folder(models.Model):
         verbose_name="title",
         max_length=256,
     )
+    # Sums of entry counters of the feeds in the folder, maintained by `services`.
+    total_entry_count = models.PositiveIntegerField(
+        verbose_name="total entry count",
+        default=0,
+        editable=False,
+    )
+    unread_entry_count = models.PositiveIntegerField(
+        verbose_name="unread entry count",
+        default=0,
+        editable=False,
+    )
     created = models.DateTimeField(verbose_name="created at", auto_now_add=True)
     updated = models.DateTimeField(verbose_name="updated at", auto_now=True)
 
@@ -49,16 +114,100 @@ class Folder(models.Model):
     def __str__(self):
         return self.title
 
-    def get_unread_entry_count(self):
+    def get_unread_entry_count(self) -> int:
         """
-        Number of unread entries in the Folder.
+        Number of unread entries in the Folder, from the counter.
         """
-        return Entry.objects.filter(feed__folder_id=self.pk, is_read=False).count()
+        return self.unread_entry_count
+
+
+class FeedSource(models.Model):
+    """
+    Represents an RSS feed URL, which is fetched and stored once for all users
+    subscribed to it.
+    """
+
+    url = models.URLField(
+        verbose_name="Feed URL",
+        max_length=1024,
+    )
+    # Hash of the normalized URL, set on save, so equivalent URLs share the same source.
+    url_hash = models.BigIntegerField(
+        verbose_name="URL hash",
+        blank=True,
+        null=True,
+        unique=True,
+        editable=False,
+    )
+    # HTTP validators from the last successful fetch, sent back with
+    # `If-None-Match` / `If-Modified-Since` to make conditional requests.
+    etag = models.CharField(
+        verbose_name="ETag",
+        max_length=256,
+        blank=True,
+        null=True,
+    )
+    last_modified = models.CharField(
+        verbose_name="Last-Modified",
+        max_length=64,
+        blank=True,
+        null=True,
+    )
+    # SHA-256 of the last parsed feed body, to skip parsing when it has not changed.
+    content_hash = models.CharField(
+        verbose_name="content hash",
+        max_length=64,
+        blank=True,
+        null=True,
+    )
+    # When the feed should be fetched next, based on its publishing cadence.
+    # Null means the feed was never fetched and is due right away.
+    next_fetch_at = models.DateTimeField(
+        verbose_name="next fetch at",
+        blank=True,
+        null=True,
+        db_index=True,
+    )
+    # HTTP status code of the last response from the feed server.
+    last_status_code = models.PositiveSmallIntegerField(
+        verbose_name="last status code",
+        blank=True,
+        null=True,
+    )
+    # Number of failed fetches in a row, and the reason of the last failure.
+    consecutive_failures = models.PositiveIntegerField(
+        verbose_name="consecutive failures",
+        default=0,
+    )
+    last_fetch_error = models.CharField(
+        verbose_name="last fetch error",
+        max_length=256,
+        blank=True,
+        default="",
+    )
+    created = models.DateTimeField(verbose_name="created at", auto_now_add=True)
+    updated = models.DateTimeField(verbose_name="updated at", auto_now=True)
+
+    class Meta:
+        ordering = ["-created"]
+        verbose_name = "feed source"
+        verbose_name_plural = "feed sources"
+
+    def __str__(self):
+        return self.url
+
+    @property
+    def is_dormant(self) -> bool:
+        """
+        Feed has failed too many times in a row, and is fetched rarely.
+        """
+        return self.consecutive_failures >= settings.FEED_DORMANT_FAILURES
 
 
 class Feed(models.Model):
     """
-    Represents an RSS feed subscription of the user.
+    Represents an RSS feed subscription of the user. Title, images and folder of the feed
+    are set per user, while entries and fetch state are stored in the shared `FeedSource`.
     """
 
     user = models.ForeignKey(
@@ -67,14 +216,16 @@ class Feed(models.Model):
         on_delete=models.CASCADE,
         related_name="feeds",
     )
+    source = models.ForeignKey(
+        verbose_name="feed source",
+        to=FeedSource,
+        on_delete=models.CASCADE,
+        related_name="feeds",
+    )
     title = models.CharField(
         verbose_name="title",
         max_length=256,
     )
-    url = models.URLField(
-        verbose_name="Feed URL",
-        max_length=1024,
-    )
     site_url = models.URLField(
         verbose_name="Site URL",
         max_length=1024,
@@ -93,6 +244,24 @@ class Feed(models.Model):
         blank=True,
         null=True,
     )
+    # Entry counters, maintained by `services` when entries are created or marked as read,
+    # so lists of feeds don't have to count entries.
+    total_entry_count = models.PositiveIntegerField(
+        verbose_name="total entry count",
+        default=0,
+        editable=False,
+    )
+    unread_entry_count = models.PositiveIntegerField(
+        verbose_name="unread entry count",
+        default=0,
+        editable=False,
+    )
+    latest_entry_pub_date = models.DateTimeField(
+        verbose_name="latest entry publication date",
+        blank=True,
+        null=True,
+        editable=False,
+    )
     created = models.DateTimeField(verbose_name="created at", auto_now_add=True)
     updated = models.DateTimeField(verbose_name="updated at", auto_now=True)
 
@@ -100,34 +269,45 @@ class Feed(models.Model):
         ordering = ["-created"]
         verbose_name = "feed"
         verbose_name_plural = "feeds"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "source"],
+                name="unique_feed_user_source",
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
     def get_unread_entry_count(self) -> int:
         """
-        Number of unread entries in the Feed.
+        Number of unread entries in the Feed, from the counter.
         """
-        return self.entries.filter(is_read=False).count()
+        return self.unread_entry_count
+
+    @property
+    def url(self) -> str:
+        """
+        Return URL of the feed source.
+        """
+        return self.source.url
 
     @property
     def last_updated(self) -> datetime | None:
         """
         Return newest entry pub_date, or None if there's no entries.
         """
-        if newest_entry := self.entries.order_by("-pub_date").first():
-            return newest_entry.pub_date
-        return None
+        return self.latest_entry_pub_date
 
 
 class Entry(models.Model):
     """
-    Represents an entry of the RSS feed.
+    Represents an entry of the RSS feed, shared by all users subscribed to it.
     """
 
-    feed = models.ForeignKey(
-        verbose_name="Feed",
-        to=Feed,
+    source = models.ForeignKey(
+        verbose_name="feed source",
+        to=FeedSource,
         on_delete=models.CASCADE,
         related_name="entries",
     )
@@ -145,6 +325,28 @@ class Entry(models.Model):
         verbose_name="Entry URL",
         max_length=1024,
     )
+    # Hash of the normalized URL, set on save, to look up entries by URL with compact index.
+    url_hash = models.BigIntegerField(
+        verbose_name="URL hash",
+        blank=True,
+        null=True,
+        editable=False,
+    )
+    # Unique ID of the entry in the feed (RSS `<guid>` or Atom `<id>`, or the URL),
+    # so entries are recognized when their URL changes.
+    guid = models.CharField(
+        verbose_name="GUID",
+        max_length=1024,
+        blank=True,
+        null=True,
+    )
+    # SHA-256 of the entry data from the feed, to update entries when they are changed.
+    fingerprint = models.CharField(
+        verbose_name="fingerprint",
+        max_length=64,
+        blank=True,
+        default="",
+    )
     image_url = models.URLField(
         verbose_name="Entry image URL",
         max_length=1024,
@@ -174,14 +376,6 @@ class Entry(models.Model):
         blank=True,
         null=True,
     )
-    is_read = models.BooleanField(
-        verbose_name="read",
-        default=False,
-    )
-    is_favorite = models.BooleanField(
-        verbose_name="favorite (starred)",
-        default=False,
-    )
     tags = models.ManyToManyField(
         verbose_name="tags",
         to=Tag,
@@ -192,9 +386,76 @@ class Entry(models.Model):
     updated = models.DateTimeField(verbose_name="updated at", auto_now=True)
 
     class Meta:
-        ordering = ["-pub_date"]
+        ordering = ["-pub_date", "-id"]
         verbose_name = "entry"
         verbose_name_plural = "entries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "url"],
+                name="unique_entry_source_url",
+            ),
+            models.UniqueConstraint(
+                fields=["source", "guid"],
+                name="unique_entry_source_guid",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["source", "url_hash"], name="entry_source_url_hash_idx"
+            ),
+            # Serves "Today" smart feed: range of `pub_date` for feeds of the user.
+            models.Index(
+                fields=["pub_date", "source"], name="entry_pub_date_source_idx"
+            ),
+            # Serves the lookup of recent entries with pending images.
+            models.Index(
+                fields=["created"],
+                condition=models.Q(image_url__isnull=True),
+                name="entry_pending_image_idx",
+            ),
+            models.Index(
+                fields=["source", "-pub_date", "-id"],
+                name="entry_source_pub_date_id_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.title
+
+
+class EntryState(models.Model):
+    """
+    Read and favorite marks of the entry, set by the user subscribed to its feed.
+    Entries without state are unread, so states are only stored for marked entries.
+    """
+
+    feed = models.ForeignKey(
+        verbose_name="feed",
+        to=Feed,
+        on_delete=models.CASCADE,
+        related_name="entry_states",
+    )
+    entry = models.ForeignKey(
+        verbose_name="entry",
+        to=Entry,
+        on_delete=models.CASCADE,
+        related_name="states",
+    )
+    is_read = models.BooleanField(
+        verbose_name="read",
+        default=False,
+    )
+    is_favorite = models.BooleanField(
+        verbose_name="favorite (starred)",
+        default=False,
+    )
+
+    class Meta:
+        verbose_name = "entry state"
+        verbose_name_plural = "entry states"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entry", "feed"],
+                name="unique_entry_state_entry_feed",
+            ),
+        ]
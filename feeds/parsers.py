@@ -0,0 +1,464 @@
+import hashlib
+import logging
+import re
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+from xml.etree.ElementTree import Element, ParseError
+
+import feedparser
+from dateutil import parser as date_parser
+from defusedxml import DefusedXmlException
+from defusedxml.ElementTree import iterparse
+from django.utils import timezone
+
+# NB: private function of `feedparser`, which has no public API to sanitize HTML. The version
+# of `feedparser` is pinned in requirements.txt, and the function is checked by the tests
+# (`test_parsers.ParsersTest.test_sanitize_html`), so an update which removes it is noticed.
+from feedparser.sanitizer import _sanitize_html
+
+from feeds.exceptions import CantParseFeed
+
+logger = logging.getLogger(__name__)
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+CONTENT_NS = "{http://purl.org/rss/1.0/modules/content/}"
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+MEDIA_NS = "{http://search.yahoo.com/mrss/}"
+
+# Tags of the entry elements, by tag of the root element of the feed.
+ENTRY_TAGS = {
+    "rss": "item",
+    f"{ATOM_NS}feed": f"{ATOM_NS}entry",
+}
+
+# Entry child elements with plain text values, and `ParsedEntry` fields they are stored in.
+TEXT_FIELDS = {
+    "title": "title",
+    "link": "link",
+    "author": "author",
+    "pubDate": "published",
+    f"{DC_NS}creator": "author",
+    f"{DC_NS}date": "updated",
+    f"{ATOM_NS}id": "guid",
+    f"{ATOM_NS}published": "published",
+    f"{ATOM_NS}issued": "published",
+    f"{ATOM_NS}updated": "updated",
+    f"{ATOM_NS}modified": "updated",
+}
+
+# Tags of the entry child elements with tag titles in text.
+TAG_TEXT_TAGS = ["category", f"{DC_NS}subject"]
+
+# Values of Atom `type` attribute, and corresponding content types.
+ATOM_CONTENT_TYPES = {
+    "text": "text/plain",
+    "text/plain": "text/plain",
+    "html": "text/html",
+    "text/html": "text/html",
+}
+
+# "Z" time zone designator at the end of ISO 8601 date.
+ISO_UTC_SUFFIX_RE = re.compile(r"[Zz]$")
+
+
+class UnsupportedFeed(Exception):
+    """Feed can't be parsed by the fast parser, and should be parsed with `feedparser`."""
+
+    pass
+
+
+class ParsedEntry:
+    """
+    Compact record with the entry data used to create Entry instances.
+    HTML of entries parsed by the fast parser is sanitized on demand with `sanitize()`,
+    so it's only done for new entries, not for every entry on every update.
+    """
+
+    __slots__ = (
+        "guid",
+        "title",
+        "link",
+        "author",
+        "summary",
+        "summary_type",
+        "content",
+        "published",
+        "updated",
+        "published_parsed",
+        "updated_parsed",
+        "tags",
+        "image_urls",
+        "is_sanitized",
+        "_fingerprint",
+    )
+
+    def __init__(self, is_sanitized: bool = False):
+        # Unique ID of the entry in the feed: RSS `<guid>` or Atom `<id>`, or the link.
+        self.guid: str | None = None
+        self.title: str | None = None
+        self.link: str | None = None
+        self.author: str | None = None
+        self.summary: str | None = None
+        # Content type of the summary: "text/html" or "text/plain".
+        self.summary_type: str = "text/html"
+        # HTML content of the entry.
+        self.content: str | None = None
+        # Raw date strings, as they are in the feed.
+        self.published: str | None = None
+        self.updated: str | None = None
+        # Dates in UTC, pre-parsed by `feedparser`.
+        self.published_parsed: time.struct_time | None = None
+        self.updated_parsed: time.struct_time | None = None
+        self.tags: list[str] = []
+        # Image URLs from `media:thumbnail`, `media:content` and enclosures, in that order.
+        self.image_urls: list[str] = []
+        self.is_sanitized = is_sanitized
+        self._fingerprint: str | None = None
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        SHA-256 hex digest of the entry data, to find out if the entry has been changed
+        since the last fetch. It's calculated before sanitizing, and kept afterwards.
+        """
+        if self._fingerprint is None:
+            data = "\0".join(
+                value or ""
+                for value in [
+                    self.title,
+                    self.link,
+                    self.author,
+                    self.summary,
+                    self.content,
+                    self.published,
+                    self.updated,
+                ]
+            )
+            self._fingerprint = hashlib.sha256(data.encode()).hexdigest()
+        return self._fingerprint
+
+    @classmethod
+    def from_feedparser(cls, entry_data: dict) -> "ParsedEntry":
+        """
+        Build `ParsedEntry` from entry data parsed (and sanitized) by `feedparser`.
+        """
+        entry = cls(is_sanitized=True)
+        entry.title = entry_data.get("title")
+        entry.link = entry_data.get("link")
+        entry.guid = entry_data.get("id") or entry.link
+        entry.author = entry_data.get("author")
+        entry.summary = entry_data.get("summary")
+        entry.summary_type = (entry_data.get("summary_detail") or {}).get(
+            "type", "text/html"
+        )
+        entry.content = next(
+            (
+                item.get("value")
+                for item in entry_data.get("content") or []
+                if item.get("type") == "text/html"
+            ),
+            None,
+        )
+        entry.published = entry_data.get("published")
+        # `feedparser` falls back to published date, if there's no updated date.
+        entry.updated = entry_data.get("updated")
+        entry.published_parsed = entry_data.get("published_parsed")
+        entry.updated_parsed = entry_data.get("updated_parsed")
+        entry.tags = [item.get("term") for item in entry_data.get("tags") or []]
+        entry.image_urls = [
+            item.get("url") for item in entry_data.get("media_thumbnail") or []
+        ]
+        entry.image_urls += [
+            item.get("url")
+            for item in entry_data.get("media_content") or []
+            if item.get("medium") == "image"
+            or item.get("type", "").startswith("image/")
+        ]
+        entry.image_urls += [
+            item.get("href")
+            for item in entry_data.get("enclosures") or []
+            if item.get("type", "").startswith("image/")
+        ]
+        return entry
+
+    def sanitize(self) -> None:
+        """
+        Remove unsafe markup (scripts, event handlers, etc.) from the HTML fields the same
+        way `feedparser` does, as these are rendered on the pages as is.
+        """
+        if self.is_sanitized:
+            return
+
+        # Fingerprint is calculated from the data as it is in the feed.
+        self.fingerprint
+        if self.summary and self.summary_type == "text/html":
+            self.summary = sanitize_html(self.summary)
+        if self.content:
+            self.content = sanitize_html(self.content)
+        self.is_sanitized = True
+
+
+def parse_date(
+    value: str | None, parsed: time.struct_time | None = None
+) -> datetime | None:
+    """
+    Parse entry date as aware datetime. Time tuple pre-parsed by `feedparser` is used,
+    if present. Otherwise RFC 822 (RSS) and ISO 8601 (Atom) formats are tried first,
+    and only then slow fuzzy `dateutil` parser. Dates without time zone are considered
+    to be in `settings.TIME_ZONE`.
+
+    :param str value: date string from the feed.
+    :param time.struct_time parsed: date in UTC, parsed by `feedparser`.
+    :return: aware datetime, or None if the date is missing or can't be parsed.
+    """
+    if parsed:
+        return datetime(*parsed[:6], tzinfo=dt_timezone.utc)
+
+    if not value:
+        return None
+
+    date = _parse_date_strict(value) or _parse_date_fuzzy(value)
+    if date and timezone.is_naive(date):
+        # Default time zone is cached by Django, so it's not looked up for every date.
+        date = timezone.make_aware(date)
+    return date
+
+
+def _parse_date_strict(value: str) -> datetime | None:
+    """
+    Parse date in RFC 822 or ISO 8601 format.
+    """
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        pass
+    else:
+        # Same as `feedparser` does, RFC 822 dates without time zone are in UTC.
+        return date if date.tzinfo else date.replace(tzinfo=dt_timezone.utc)
+
+    try:
+        # `fromisoformat()` accepts "Z" suffix only since Python 3.11
+        return datetime.fromisoformat(ISO_UTC_SUFFIX_RE.sub("+00:00", value))
+    except ValueError:
+        return None
+
+
+def _parse_date_fuzzy(value: str) -> datetime | None:
+    """
+    Parse date in any format known to `dateutil`.
+    """
+    try:
+        return date_parser.parse(value)
+    except (ValueError, OverflowError):
+        logger.warning("Can't parse date %s", value)
+        return None
+
+
+def sanitize_html(html: str) -> str:
+    """
+    Sanitize `html` with the `feedparser` sanitizer.
+    """
+    return _sanitize_html(html, "utf-8", "text/html")
+
+
+def parse_feed_entries(content: bytes) -> list[ParsedEntry]:
+    """
+    Parse entries from feed `content`. Well-formed RSS 2.0 and Atom feeds are parsed with
+    the fast streaming parser, anything else is passed to `feedparser`.
+
+    :param bytes content: feed content.
+    :return: list of parsed entries.
+    :raises CantParseFeed: if `content` is not RSS or Atom feed (e.g. HTML page).
+    """
+    try:
+        return parse_feed_entries_fast(content)
+    except UnsupportedFeed as ex:
+        logger.debug("Falling back to feedparser: %s", ex)
+
+    return parse_feed_entries_feedparser(content)
+
+
+def parse_feed_entries_feedparser(content: bytes) -> list[ParsedEntry]:
+    """
+    Parse entries from feed `content` using `feedparser`.
+
+    :raises CantParseFeed: if `content` is not RSS or Atom feed.
+    """
+    feed_content = feedparser.parse(BytesIO(content))
+
+    if not feed_content.get("version") and not feed_content.entries:
+        reason = feed_content.get("bozo_exception") or "unknown feed format"
+        raise CantParseFeed(f"Not a valid feed: {reason}")
+
+    return [ParsedEntry.from_feedparser(entry) for entry in feed_content.entries]
+
+
+def parse_feed_entries_fast(content: bytes) -> list[ParsedEntry]:
+    """
+    Parse entries from RSS 2.0 or Atom feed `content` with `iterparse()`, clearing each
+    entry element once it's parsed. Feeds with DTDs, `xml:base` or XHTML content
+    are not supported, as well as malformed XML.
+
+    :raises UnsupportedFeed: if `content` can't be parsed with the fast parser.
+    """
+    # Relative URLs would have to be resolved against `xml:base`.
+    if b"xml:base" in content:
+        raise UnsupportedFeed("xml:base is not supported")
+
+    root_tag, entries_by_tag = _iterparse_entries(content)
+
+    if root_tag not in ENTRY_TAGS:
+        raise UnsupportedFeed(f"Unknown root element {root_tag}")
+
+    return entries_by_tag[ENTRY_TAGS[root_tag]]
+
+
+def _iterparse_entries(content: bytes) -> tuple[str, dict[str, list[ParsedEntry]]]:
+    """
+    Parse RSS and Atom entry elements from `content`, without checking type of the feed.
+
+    :return: tuple of the root element tag, and dict with lists of parsed entries
+             by entry element tag.
+    :raises UnsupportedFeed: if `content` is malformed, or has DTD.
+    """
+    entries_by_tag: dict[str, list[ParsedEntry]] = {
+        tag: [] for tag in ENTRY_TAGS.values()
+    }
+    try:
+        context = iterparse(BytesIO(content), events=("end",), forbid_dtd=True)
+        for _, element in context:
+            if element.tag in entries_by_tag:
+                entries_by_tag[element.tag].append(_parse_entry_element(element))
+                element.clear()
+    except (ParseError, DefusedXmlException) as ex:
+        raise UnsupportedFeed(ex)
+
+    return context.root.tag, entries_by_tag
+
+
+def _parse_entry_element(element: Element) -> ParsedEntry:  # noqa: C901
+    """
+    Build `ParsedEntry` from RSS `<item>` or Atom `<entry>` element.
+    """
+    entry = ParsedEntry()
+    thumbnail_urls, media_image_urls, enclosure_urls = [], [], []
+    guid = content = None
+
+    for child in element:
+        tag = child.tag
+        if tag in TEXT_FIELDS:
+            setattr(entry, TEXT_FIELDS[tag], _get_text(child))
+        elif tag == "description" or tag == f"{ATOM_NS}summary":
+            entry.summary_type = _get_content_type(child)
+            entry.summary = _get_text(child)
+        elif tag == f"{CONTENT_NS}encoded" or tag == f"{ATOM_NS}content":
+            content = (_get_text(child), _get_content_type(child))
+        elif tag == f"{ATOM_NS}title":
+            # Raises for XHTML titles, which are parsed by `feedparser` only.
+            _get_content_type(child)
+            entry.title = _get_text(child)
+        elif tag == f"{ATOM_NS}link":
+            _parse_atom_link(entry, child, enclosure_urls)
+        elif tag == f"{ATOM_NS}author":
+            entry.author = _get_atom_author(child)
+        elif tag in TAG_TEXT_TAGS:
+            entry.tags.append(_get_text(child))
+        elif tag == f"{ATOM_NS}category":
+            entry.tags.append(child.get("term"))
+        elif tag == "guid":
+            guid = child
+        elif tag == "enclosure":
+            if child.get("type", "").startswith("image/"):
+                enclosure_urls.append(child.get("url"))
+        elif tag.startswith(MEDIA_NS):
+            _parse_media_element(child, thumbnail_urls, media_image_urls)
+
+    # Same as `feedparser` does, content is used as summary if there's no summary.
+    if content:
+        entry.content = content[0] if content[1] == "text/html" else None
+        if entry.summary is None:
+            entry.summary, entry.summary_type = content
+
+    if guid is not None:
+        entry.guid = _get_text(guid)
+        # Permanent link may be set in `<guid>` only.
+        if not entry.link and guid.get("isPermaLink") != "false":
+            entry.link = entry.guid
+
+    entry.guid = entry.guid or entry.link
+
+    # Same as `feedparser` does.
+    entry.updated = entry.updated or entry.published
+    entry.image_urls = thumbnail_urls + media_image_urls + enclosure_urls
+    return entry
+
+
+def _parse_atom_link(
+    entry: ParsedEntry, element: Element, enclosure_urls: list
+) -> None:
+    """
+    Set entry link from the first alternate Atom `<link>`, or collect enclosure with image.
+    """
+    rel = element.get("rel", "alternate")
+    if rel == "alternate" and not entry.link:
+        entry.link = element.get("href")
+    elif rel == "enclosure" and element.get("type", "").startswith("image/"):
+        enclosure_urls.append(element.get("href"))
+
+
+def _get_atom_author(element: Element) -> str | None:
+    """
+    Get author from Atom `<author>` element as "Name (email)", same as `feedparser` does.
+    """
+    name = _get_text(element.find(f"{ATOM_NS}name"))
+    email = _get_text(element.find(f"{ATOM_NS}email"))
+    if name and email:
+        return f"{name} ({email})"
+    return name or email
+
+
+def _parse_media_element(
+    element: Element, thumbnail_urls: list, media_image_urls: list
+) -> None:
+    """
+    Collect image URLs from `media:thumbnail` and `media:content`, including ones nested
+    in `media:group`.
+    """
+    for media in element.iter():
+        if media.tag == f"{MEDIA_NS}thumbnail":
+            thumbnail_urls.append(media.get("url"))
+        elif media.tag == f"{MEDIA_NS}content" and (
+            media.get("medium") == "image" or media.get("type", "").startswith("image/")
+        ):
+            media_image_urls.append(media.get("url"))
+
+
+def _get_content_type(element: Element) -> str:
+    """
+    Get content type of RSS or Atom element from its `type` attribute.
+
+    :raises UnsupportedFeed: if the content is XHTML, or of unknown type.
+    """
+    if not element.tag.startswith(ATOM_NS):
+        return "text/html"
+
+    content_type = element.get("type", "text")
+    if content_type not in ATOM_CONTENT_TYPES:
+        raise UnsupportedFeed(f"Content type {content_type} is not supported")
+    return ATOM_CONTENT_TYPES[content_type]
+
+
+def _get_text(element: Element | None) -> str | None:
+    """
+    Get stripped text of the `element`, or None if there's no element.
+
+    :raises UnsupportedFeed: if the element has child elements (e.g. unescaped HTML).
+    """
+    if element is None:
+        return None
+    if len(element):
+        raise UnsupportedFeed(f"Unexpected markup in {element.tag}")
+    return (element.text or "").strip()
@@ -1,133 +1,252 @@
-from datetime import datetime
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from typing import NamedTuple
 
-from django.db.models import (
-    Case,
-    Count,
-    IntegerField,
-    OuterRef,
-    Q,
-    QuerySet,
-    Subquery,
-    When,
-)
+from django.db.models import Count, Exists, F, OuterRef, Q, QuerySet
+from django.utils import timezone
 
-from feeds.models import Entry, Feed, Folder, Tag
+from feeds.models import Entry, EntryState, Feed, Folder, Tag
 
+# Order of entries in lists. `id` makes it total, so cursors are unambiguous.
+ENTRY_PAGE_ORDERING = ["-pub_date", "-id"]
 
-def get_entry_queryset(user, mode: str) -> QuerySet:
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidCursor(ValueError):
+    """Cursor passed to `get_entry_page()` can't be decoded."""
+
+
+class EntryPage(NamedTuple):
+    """One page of entries, with cursor of the next page (None if it's the last one)."""
+
+    entries: list[Entry]
+    next_cursor: str | None
+
+
+class SmartFeedCounts(NamedTuple):
+    """Number of entries in "Smart Feeds", shown in the "Feeds" column."""
+
+    all: int
+    all_unread: int
+    today: int
+    today_unread: int
+    unread: int
+    read: int
+    favorites: int
+
+
+def get_today_range(user, now: datetime | None = None) -> tuple[datetime, datetime]:
+    """
+    Return start of today and start of tomorrow in `user`'s time zone.
+
+    :param user: `CustomUser` instance
+    :param datetime now: current time, `timezone.now()` by default.
+    :return: tuple of aware datetimes.
+    """
+    user_time_zone = user.get_time_zone()
+    today = (now or timezone.now()).astimezone(user_time_zone).date()
+    return (
+        datetime.combine(today, time.min, tzinfo=user_time_zone),
+        datetime.combine(today + timedelta(days=1), time.min, tzinfo=user_time_zone),
+    )
+
+
+def get_today_filter(user) -> Q:
+    """
+    Return filter for entries published today in `user`'s time zone, as a half-open range
+    of `pub_date`, so the index on it can be used.
+    """
+    today_start, tomorrow_start = get_today_range(user)
+    return Q(pub_date__gte=today_start, pub_date__lt=tomorrow_start)
+
+
+def get_user_entries(
+    user, feed: Feed | None = None, folder: Folder | None = None
+) -> QuerySet:
+    """
+    Return Entry queryset with entries of the feed sources `user` is subscribed to.
+    Entries are annotated with `feed_id`, `feed_title`, `feed_image_url` and `feed_site_url`
+    of the user's feed, and with `is_read` and `is_favorite` marks of the user.
+
+    :param user: `CustomUser` instance
+    :param Feed feed: only return entries of this feed, if passed.
+    :param Folder folder: only return entries of the feeds in this folder, if passed.
+    """
+    # Conditions are passed to one `filter()` call, so they are applied to the same feed.
+    subscription_filter = Q(source__feeds__user=user)
+    if feed:
+        subscription_filter &= Q(source__feeds=feed)
+    if folder:
+        subscription_filter &= Q(source__feeds__folder=folder)
+
+    entry_states = EntryState.objects.filter(
+        feed=OuterRef("feed_id"), entry=OuterRef("pk")
+    )
+    return Entry.objects.filter(subscription_filter).annotate(
+        feed_id=F("source__feeds"),
+        feed_title=F("source__feeds__title"),
+        feed_image_url=F("source__feeds__image_url"),
+        feed_site_url=F("source__feeds__site_url"),
+        is_read=Exists(entry_states.filter(is_read=True)),
+        is_favorite=Exists(entry_states.filter(is_favorite=True)),
+    )
+
+
+def get_entry_queryset(
+    user, mode: str, feed: Feed | None = None, folder: Folder | None = None
+) -> QuerySet:
     """
     Return Entry queryset for `user` and `mode`, where mode is one of "Smart Feed" names,
     i.e. all, today, unread, read, favorites.
 
     :param user: `CustomUser` instance
     :param str mode: all | today | unread | read | favorites
+    :param Feed feed: only return entries of this feed, if passed.
+    :param Folder folder: only return entries of the feeds in this folder, if passed.
     """
-    mode_querysets = {
-        "all": Entry.objects.all(),
-        "today": Entry.objects.filter(
-            pub_date__day=datetime.today().day,
-            pub_date__month=datetime.today().month,
-            pub_date__year=datetime.today().year,
-        ),
-        "unread": Entry.objects.filter(is_read=False),
-        "read": Entry.objects.filter(is_read=True),
-        "favorites": Entry.objects.filter(is_favorite=True),
+    mode_filters = {
+        "all": Q(),
+        "today": get_today_filter(user),
+        "unread": Q(is_read=False),
+        "read": Q(is_read=True),
+        "favorites": Q(is_favorite=True),
     }
 
-    if mode not in mode_querysets.keys():
-        raise KeyError(f"Incorrect mode '{mode}', must be in {mode_querysets.keys()}")
-    return mode_querysets[mode].filter(feed__user=user)
+    if mode not in mode_filters.keys():
+        raise KeyError(f"Incorrect mode '{mode}', must be in {mode_filters.keys()}")
+    return get_user_entries(user, feed=feed, folder=folder).filter(mode_filters[mode])
+
 
+def get_smart_feed_counts(user) -> SmartFeedCounts:
+    """
+    Return number of entries in all "Smart Feeds" of `user`, counted in a single query.
+    """
+    today_filter = get_today_filter(user)
+    unread_filter = Q(is_read=False)
+
+    counts = get_user_entries(user).aggregate(
+        all=Count("pk"),
+        today=Count("pk", filter=today_filter),
+        today_unread=Count("pk", filter=today_filter & unread_filter),
+        unread=Count("pk", filter=unread_filter),
+        read=Count("pk", filter=Q(is_read=True)),
+        favorites=Count("pk", filter=Q(is_favorite=True)),
+    )
+    return SmartFeedCounts(all_unread=counts["unread"], **counts)
 
-def get_total_entry_count(user, mode: str) -> int:
+
+def encode_entry_cursor(entry: Entry) -> str:
     """
-    Return TOTAL number of entries in specified "Smart Feed".
+    Encode position of `entry` in the list as "<pub_date in microseconds since epoch>_<pk>".
     """
-    # NB: `all()` is workaround for queryset caching
-    # Reference: https://docs.djangoproject.com/en/4.2/topics/db/optimization/#understand-cached-attributes
-    return get_entry_queryset(user=user, mode=mode).all().count()
+    timestamp = (entry.pub_date - EPOCH) // timedelta(microseconds=1)
+    return f"{timestamp}_{entry.pk}"
 
 
-def get_unread_entry_count(user, mode: str) -> int:
+def decode_entry_cursor(cursor: str) -> tuple[datetime, int]:
     """
-    Return number of UNREAD entries in specified "Smart Feed".
+    Decode cursor made by `encode_entry_cursor()`.
+
+    :return: tuple of `pub_date` and `pk` of the entry.
+    :raises InvalidCursor: if the cursor is malformed.
     """
-    return get_entry_queryset(user=user, mode=mode).filter(is_read=False).count()
+    try:
+        timestamp, pk = cursor.split("_")
+        pub_date = EPOCH + timedelta(microseconds=int(timestamp))
+        return pub_date, int(pk)
+    except (ValueError, OverflowError):
+        raise InvalidCursor(f"Incorrect cursor '{cursor}'")
 
 
-def get_previous_entry(user, entry: Entry, queryset: QuerySet = Entry.objects.all()):
-    if not queryset or not entry or not entry.pub_date:
-        return None
+def get_entry_page(
+    queryset: QuerySet, cursor: str | None = None, page_size: int = 15
+) -> EntryPage:
+    """
+    Return page of entries from `queryset`, newest first, which follow the entry encoded
+    in `cursor`. Unlike OFFSET pagination, the page stays the same when entries before
+    the cursor are added or no longer match the queryset (e.g. marked as read), and
+    the database doesn't have to skip all the rows of the previous pages.
 
-    queryset = queryset.filter(feed__user=user, pub_date__gt=entry.pub_date)
-    if queryset.exists():
-        return queryset.last()
-    return None
+    :param queryset: Entry queryset.
+    :param str cursor: cursor from the previous page, or None for the first page.
+    :param int page_size: number of entries on the page.
+    :raises InvalidCursor: if the cursor is malformed.
+    """
+    queryset = queryset.order_by(*ENTRY_PAGE_ORDERING)
+    if cursor:
+        pub_date, pk = decode_entry_cursor(cursor)
+        queryset = queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+        )
 
+    # Fetch one more entry to find out if there is a next page, without counting
+    entries = list(queryset[: page_size + 1])
+    if len(entries) > page_size:
+        entries = entries[:page_size]
+        return EntryPage(entries=entries, next_cursor=encode_entry_cursor(entries[-1]))
+    return EntryPage(entries=entries, next_cursor=None)
 
-def get_next_entry(user, entry: Entry, queryset: QuerySet = Entry.objects.all()):
-    if not queryset or not entry or not entry.pub_date:
+
+def get_previous_entry(user, entry: Entry, queryset: QuerySet | None = None):
+    """
+    Return entry which goes before `entry` in `queryset`, i.e. the next newer one,
+    or None if it's the first one. All entries of `user` are used, if `queryset` is not passed.
+    """
+    if not entry or not entry.pub_date:
         return None
 
-    queryset = queryset.filter(feed__user=user, pub_date__lt=entry.pub_date)
-    if queryset.exists():
-        return queryset.first()
-    return None
+    if queryset is None:
+        queryset = get_user_entries(user)
+
+    return (
+        queryset.filter(
+            Q(pub_date__gt=entry.pub_date) | Q(pub_date=entry.pub_date, pk__gt=entry.pk)
+        )
+        .order_by(*ENTRY_PAGE_ORDERING)
+        .last()
+    )
 
 
-def get_all_feeds(user) -> QuerySet:
+def get_next_entry(user, entry: Entry, queryset: QuerySet | None = None):
     """
-    Return all user's Feeds, annotated with:
-    - `unread_entry_count` - number of unread entries in the Feed.
-    - `latest_entry_pub_date` - pub_date of the newest entry in the feed.
-
-    Queryset will be ordered by "-latest_entry_pub_date".
+    Return entry which goes after `entry` in `queryset`, i.e. the next older one,
+    or None if it's the last one. All entries of `user` are used, if `queryset` is not passed.
     """
-    queryset = (
-        Feed.objects.filter(user=user)
-        # .prefetch_related("entries")
-        .annotate(
-            unread_entry_count=Count(
-                Case(
-                    When(entries__is_read=False, then=1),
-                    output_field=IntegerField(),
-                )
-            )
-        ).annotate(total_entry_count=Count("entries"))
-    )
+    if not entry or not entry.pub_date:
+        return None
 
-    latest_entry_pub_date = Subquery(
-        Entry.objects.filter(
-            feed_id=OuterRef("id"),
+    if queryset is None:
+        queryset = get_user_entries(user)
+
+    return (
+        queryset.filter(
+            Q(pub_date__lt=entry.pub_date) | Q(pub_date=entry.pub_date, pk__lt=entry.pk)
         )
-        .order_by("-pub_date")
-        .values("pub_date")[:1]
+        .order_by(*ENTRY_PAGE_ORDERING)
+        .first()
     )
 
-    queryset = queryset.annotate(
-        latest_entry_pub_date=latest_entry_pub_date,
-    ).order_by("-latest_entry_pub_date")
 
-    return queryset
+def get_all_feeds(user) -> QuerySet:
+    """
+    Return all user's Feeds with their Folders, ordered by "-latest_entry_pub_date".
+    Feeds have `unread_entry_count` and `total_entry_count` counters, so entries
+    are not counted here.
+    """
+    return (
+        Feed.objects.filter(user=user)
+        .select_related("folder", "source")
+        .order_by("-latest_entry_pub_date")
+    )
 
 
 def get_all_folders(user) -> QuerySet:
     """
-    Return QuerySet with all user's Folders, annotated with:
-    - `unread_entry_count` - number of unread Entries in Feeds included in this Folder.
+    Return QuerySet with all user's Folders, which have `unread_entry_count`
+    and `total_entry_count` counters of their feeds' entries.
     """
-    queryset = (
-        Folder.objects.filter(user=user)
-        .annotate(
-            unread_entry_count=Count(
-                "feeds__entries",
-                filter=Q(feeds__entries__is_read=False),
-            )
-        )
-        .order_by("title")
-        .prefetch_related("feeds")
-    )
-    return queryset
+    return Folder.objects.filter(user=user).order_by("title").prefetch_related("feeds")
 
 
 def get_feed(pk: int) -> Feed:
@@ -1,25 +1,58 @@
+import hashlib
 import logging
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed
-from datetime import datetime
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from functools import partial
+from html import unescape
 from io import BytesIO
-from typing import NamedTuple
+from typing import Iterable, NamedTuple
+from urllib.parse import urljoin, urlparse
 
 import feedparser
 import requests
-from dateutil import parser as date_parser
-from dateutil import tz
 from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import (
+    Count,
+    DateTimeField,
+    Exists,
+    Expression,
+    F,
+    IntegerField,
+    Model,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
 from feedparser import FeedParserDict
 
 from feeds.exceptions import (
     CantGetFeedFromURL,
     CantGetFeedInfoFromURL,
+    CantParseFeed,
     CantSubscribeToFeed,
     FeedAlreadyExists,
 )
-from feeds.models import Entry, Feed, Folder, Tag
-from feeds.utils import CantGetPageInfoFromURL, parse_page_info_from_url
+from feeds.fetchers import (
+    FeedFetchRequest,
+    FeedFetchResult,
+    build_feed_fetch_result,
+    fetch_feeds_concurrently,
+    get_feed_request_headers,
+    read_response_content,
+)
+from feeds.http_client import http_get_stream
+from feeds.models import Entry, EntryState, Feed, FeedSource, Folder, SiteMetadata, Tag
+from feeds.parsers import ParsedEntry, parse_date, parse_feed_entries
+from feeds.utils import CantGetPageInfoFromURL, get_url_hash, parse_page_info_from_url
 from users.models import CustomUser
 
 
@@ -33,18 +66,160 @@ class FeedInfo(NamedTuple):
     favicon_url: str | None
 
 
-logger = logging.getLogger(__name__)
+class ExistingEntry(NamedTuple):
+    """Data of the saved entry, needed to find out if it has been changed in the feed."""
+
+    pk: int
+    guid: str | None
+    url: str
+    url_hash: int
+    fingerprint: str
+    image_url: str | None
+
 
+logger = logging.getLogger(__name__)
 
-def update_all_feeds() -> None:
+# Matches `src` attribute of the first `<img>` tag in HTML.
+IMG_SRC_RE = re.compile(r"""<img\b[^>]*?\bsrc\s*=\s*["']([^"']+)["']""", re.I)
+
+
+FEED_UPDATE_ENGINES = ["sync", "asyncio"]
+# Number of latest entries used to calculate publishing cadence of the feed.
+FEED_CADENCE_ENTRIES = 10
+FETCH_ERROR_MESSAGE = "Failed to get feed from URL"
+UPDATE_ERROR_MESSAGE = "Failed to update feed"
+# Entry counters of the feed, set from the entries of its source.
+FEED_COUNTER_FIELDS = [
+    "total_entry_count",
+    "unread_entry_count",
+    "latest_entry_pub_date",
+]
+# Number of entry states inserted with one statement.
+ENTRY_STATE_BATCH_SIZE = 1000
+# Fields of the entries updated when they are changed in the feed.
+ENTRY_UPDATE_FIELDS = [
+    "title",
+    "url",
+    "url_hash",
+    "guid",
+    "fingerprint",
+    "author",
+    "image_url",
+    "description",
+    "summary",
+    "content",
+    "upd_date",
+]
+
+
+def update_all_feeds(engine: str | None = None) -> None:
     """
     Fetch new entries for all feeds in the database.
+    Each feed source is fetched and parsed only once, regardless of the number of
+    users subscribed to it.
+
+    :param str engine: "sync" to fetch feeds one by one, or "asyncio" to fetch many feeds
+                       concurrently. Defaults to `settings.FEED_UPDATE_ENGINE`.
+    """
+    _update_feed_sources(_get_subscribed_feed_sources(), engine=engine)
+
+
+def update_due_feeds(engine: str | None = None) -> int:
+    """
+    Fetch new entries for feed sources which are due, i.e. their `next_fetch_at` has passed
+    or was never set.
+
+    :param str engine: "sync" or "asyncio", see `update_all_feeds()`.
+    :return: number of feed sources fetched.
+    """
+    return _update_feed_sources(_claim_due_feed_sources(), engine=engine)
+
+
+def _get_subscribed_feed_sources() -> QuerySet:
+    """
+    Return feed sources which have subscribers. Sources left without subscribers are kept
+    with their entries, but not fetched.
+    """
+    return FeedSource.objects.filter(Exists(Feed.objects.filter(source=OuterRef("pk"))))
+
+
+def _claim_due_feed_sources() -> list[FeedSource]:
+    """
+    Select feed sources which are due, and postpone their next fetch by
+    `settings.FEED_FETCH_CLAIM_TIMEOUT` seconds, so overlapping runs of the scheduler
+    don't fetch them again. Actual time of the next fetch is set after the fetch.
+    Sources locked by the concurrent run are skipped.
+
+    :return: list of claimed feed sources.
+    """
+    now = timezone.now()
+
+    with transaction.atomic():
+        sources = list(
+            _get_subscribed_feed_sources()
+            .filter(Q(next_fetch_at__isnull=True) | Q(next_fetch_at__lte=now))
+            .select_for_update(skip_locked=True)
+        )
+        FeedSource.objects.filter(pk__in=[source.pk for source in sources]).update(
+            next_fetch_at=now + timedelta(seconds=settings.FEED_FETCH_CLAIM_TIMEOUT)
+        )
+
+    return sources
+
+
+def _update_feed_sources(
+    sources: Iterable[FeedSource], engine: str | None = None
+) -> int:
     """
-    feeds = Feed.objects.all()
-    logger.info("Feeds to update: %s", feeds.count())
+    Fetch new entries for feed `sources`, using `engine`.
+
+    :return: number of feed sources fetched.
+    """
+    engine = engine or settings.FEED_UPDATE_ENGINE
+    if engine not in FEED_UPDATE_ENGINES:
+        raise ValueError(
+            f"Incorrect engine '{engine}', must be in {FEED_UPDATE_ENGINES}"
+        )
+
+    sources = list(sources)
+    logger.info("Feed sources to update: %s, engine: %s", len(sources), engine)
+
+    if engine == "asyncio":
+        _update_feed_sources_concurrently(sources)
+    else:
+        [feed_source_update(source) for source in sources]
 
-    # Call feed_update() for each feed
-    [feed_update(feed) for feed in feeds]
+    return len(sources)
+
+
+def _update_feed_sources_concurrently(sources: list[FeedSource]) -> None:
+    """
+    Fetch feed sources concurrently in batches using `asyncio` engine, then create new
+    entries from each fetched feed. Batches keep the number of downloaded feeds held
+    in memory low.
+
+    :param list sources: feed sources to update.
+    """
+    batch_size = settings.FEED_FETCH_CONCURRENCY * 4
+
+    for batch_start in range(0, len(sources), batch_size):
+        batch_end = batch_start + batch_size
+        batch = sources[batch_start:batch_end]
+        fetch_results = fetch_feeds_concurrently(
+            [
+                FeedFetchRequest(source.url, source.etag, source.last_modified)
+                for source in batch
+            ]
+        )
+
+        for source in batch:
+            fetch_result = fetch_results[source.url]
+            if isinstance(fetch_result, CantGetFeedFromURL):
+                # Same as in `feed_source_update()`, the reason of the failure is saved
+                error = str(fetch_result) or FETCH_ERROR_MESSAGE
+                _feed_source_schedule_next_fetch(source, error=error)
+            else:
+                _feed_source_update_and_schedule(source, fetch_result)
 
 
 def feed_subscribe(
@@ -63,8 +238,11 @@ def feed_subscribe(
     if user_subscribed_to_feed(user, feed_url):
         raise CantSubscribeToFeed
 
+    # Other users may be already subscribed to the same URL - no need to fetch it again.
+    feed_info: FeedInfo | None = _get_feed_info_from_existing_feed(feed_url)
+
     try:
-        feed_info: FeedInfo = _get_feed_info_from_url(feed_url)
+        feed_info = feed_info or _get_feed_info_from_url(feed_url)
     except CantGetFeedInfoFromURL:
         logger.error("Can't retrieve mandatory feed info from URL %s", feed_url)
         raise CantSubscribeToFeed
@@ -78,6 +256,32 @@ def feed_subscribe(
     )
 
 
+def _get_feed_info_from_existing_feed(feed_url: str) -> FeedInfo | None:
+    """
+    Get feed info from the feed with the same `feed_url`, created by any user.
+
+    :param feed_url: URL of the feed.
+    :return: `FeedInfo` instance, or None if there's no feed with `feed_url` yet.
+    """
+    feed = (
+        Feed.objects.filter(source__url_hash=get_url_hash(feed_url))
+        .select_related("source")
+        .order_by("created")
+        .first()
+    )
+
+    if not feed:
+        return None
+
+    return FeedInfo(
+        title=feed.title,
+        feed_url=feed.url,
+        site_url=feed.site_url,
+        image_url=feed.image_url,
+        favicon_url=None,
+    )
+
+
 def _get_feed_info_from_url(feed_url: str) -> FeedInfo:  # noqa: C901
     """
     Get data and parse mandatory feed info, required to create Feed instance, from `feed_url`.
@@ -104,8 +308,7 @@ def _get_feed_info_from_url(feed_url: str) -> FeedInfo:  # noqa: C901
     # Try to get favicon from feed's site
     favicon_url = None
     try:
-        page_info = parse_page_info_from_url(url=site_url)
-        favicon_url = page_info["favicon_url"]
+        favicon_url = site_metadata_get(url=site_url).favicon_url
     except CantGetPageInfoFromURL:
         logger.warning("Can't get page info for URL %s", site_url)
 
@@ -118,6 +321,44 @@ def _get_feed_info_from_url(feed_url: str) -> FeedInfo:  # noqa: C901
     )
 
 
+def site_metadata_get(url: str) -> SiteMetadata:
+    """
+    Get metadata (title, description, image and favicon URLs) of the site hosting `url`.
+    Metadata is cached per host for `settings.SITE_METADATA_TTL` seconds, so feeds from
+    the same site don't request the page and check the favicon again.
+
+    :param str url: URL of the page on the site, used to parse metadata when the cache
+                    is missing or stale.
+    :return: `SiteMetadata` instance.
+    :raises CantGetPageInfoFromURL: if metadata is not cached and can't be parsed from `url`.
+    """
+    host = urlparse(url).netloc.lower()
+    site_metadata = SiteMetadata.objects.filter(host=host).first()
+
+    if site_metadata and site_metadata.is_fresh:
+        return site_metadata
+
+    try:
+        page_info = parse_page_info_from_url(url=url)
+    except CantGetPageInfoFromURL:
+        # Stale metadata is still better than none
+        if site_metadata:
+            return site_metadata
+        raise
+
+    site_metadata, _ = SiteMetadata.objects.update_or_create(
+        host=host,
+        defaults={
+            "title": page_info["title"] or "",
+            "description": page_info["description"] or "",
+            "image_url": page_info["image_url"] or None,
+            "favicon_url": page_info["favicon_url"],
+            "fetched": timezone.now(),
+        },
+    )
+    return site_metadata
+
+
 def feed_create(
     user: CustomUser,
     title: str,
@@ -128,6 +369,8 @@ def feed_create(
 ) -> Feed:
     """
     Create Feed instance for `user`, if there's no feed with `feed_url` for this user already.
+    The feed is subscribed to the shared source with `feed_url`, created if there's none yet.
+    Entries already fetched for other subscribers of the source are unread for the `user`.
 
     :param CustomUser user: user instance to create feed for.
     :param str title: title of the feed.
@@ -138,24 +381,62 @@ def feed_create(
     :return: new `Feed` instance.
     :raises FeedAlreadyExists: if `user` is already subscribed to the `feed_url`.
     """
-    feed_exists = Feed.objects.filter(user=user, url=feed_url).exists()
+    feed_exists = user_subscribed_to_feed(user=user, feed_url=feed_url)
 
     if feed_exists:
         logger.warning("%s already subscribed to %s", user, feed_url)
         raise FeedAlreadyExists
 
-    return Feed.objects.create(
-        user=user,
-        title=title,
-        url=feed_url,
-        site_url=site_url,
-        image_url=image_url,
-        folder=folder,
+    with transaction.atomic():
+        feed = Feed.objects.create(
+            user=user,
+            source=_feed_source_get_or_create(feed_url),
+            title=title,
+            site_url=site_url,
+            image_url=image_url,
+            folder=folder,
+        )
+        _feeds_set_entry_counters(Feed.objects.filter(pk=feed.pk))
+        folders_update_entry_counters([feed.folder_id])
+
+    feed.refresh_from_db(fields=FEED_COUNTER_FIELDS)
+    return feed
+
+
+def feed_change_url(feed: Feed, feed_url: str) -> None:
+    """
+    Move the `feed` to the shared source with `feed_url`, created if there's none yet.
+    Read and favorite marks of the entries of the previous source are deleted, and entry
+    counters are set from the entries of the new source.
+
+    :param Feed feed: feed to change URL of.
+    :param str feed_url: new URL of the feed.
+    """
+    with transaction.atomic():
+        feed.source = _feed_source_get_or_create(feed_url)
+        Feed.objects.filter(pk=feed.pk).update(source=feed.source)
+        feed.entry_states.all().delete()
+        _feeds_set_entry_counters(Feed.objects.filter(pk=feed.pk))
+        folders_update_entry_counters([feed.folder_id])
+
+    feed.refresh_from_db(fields=FEED_COUNTER_FIELDS)
+
+
+def _feed_source_get_or_create(feed_url: str) -> FeedSource:
+    """
+    Get the shared source with `feed_url`, or create it.
+
+    :param str feed_url: URL of the feed.
+    :return: `FeedSource` instance.
+    """
+    source, _ = FeedSource.objects.get_or_create(
+        url_hash=get_url_hash(feed_url), defaults={"url": feed_url}
     )
+    return source
 
 
 def entry_create(
-    feed: Feed,
+    source: FeedSource,
     title: str,
     url: str,
     author: str | None,
@@ -167,21 +448,62 @@ def entry_create(
     upd_date: datetime | None,
 ) -> Entry:
     """
-    Create and return Entry instance using passed parameters.
+    Create and return Entry instance in the `source` using passed parameters.
+    The entry is unread for all subscribers of the source.
 
     :return: created Entry instance.
     """
+    entry = _entry_build(
+        source=source,
+        title=title,
+        url=url,
+        author=author,
+        image_url=image_url,
+        description=description,
+        summary=summary,
+        content=content,
+        pub_date=pub_date,
+        upd_date=upd_date,
+    )
+    with transaction.atomic():
+        entry.save()
+        _feeds_add_to_entry_counters(
+            Feed.objects.filter(source=source),
+            total=1,
+            unread=1,
+            pub_date=entry.pub_date,
+        )
+    return entry
+
+
+def _entry_build(
+    source: FeedSource,
+    title: str,
+    url: str,
+    author: str | None,
+    image_url: str | None,
+    description: str | None,
+    summary: str | None,
+    content: str | None,
+    pub_date: datetime | None,
+    upd_date: datetime | None,
+) -> Entry:
+    """
+    Build (but not save) Entry instance using passed parameters.
+
+    :return: unsaved Entry instance.
+    """
 
     # Some feeds will have no `pub_date`, but they usually have `upd_date` instead.
     # Because we heavily use `pub_date` for navigation, ensure that it is not None.
     if not pub_date:
-        app_tz = tz.gettz(settings.TIME_ZONE)
-        pub_date = upd_date if upd_date else datetime.now(tz=app_tz)
+        pub_date = upd_date if upd_date else timezone.now()
 
-    return Entry.objects.create(
-        feed=feed,
+    return Entry(
+        source=source,
         title=title,
         url=url,
+        url_hash=get_url_hash(url),
         author=author,
         image_url=image_url,
         description=description,
@@ -192,27 +514,64 @@ def entry_create(
     )
 
 
-def mark_entry_as_read(pk: int) -> None:
+def mark_entry_as_read(user: CustomUser, pk: int) -> None:
     """
-    Mark entry as read and save it.
+    Mark entry as read by the `user`, if they are subscribed to its source.
 
+    :param CustomUser user: user who has read the entry.
     :param int pk: primary key of the entry to mark as read.
     """
-    Entry.objects.filter(pk=pk).update(is_read=True)
-
+    feed_pk = _get_user_entry_feed_pk(user, pk)
+    if not feed_pk:
+        return
 
-def toggle_entry_is_favorite(pk: int) -> None:
+    with transaction.atomic():
+        # Counters are changed only if the entry was unread, even when it's marked
+        # as read by concurrent requests.
+        marked = EntryState.objects.filter(
+            feed_id=feed_pk, entry_id=pk, is_read=False
+        ).update(is_read=True)
+        if not marked:
+            _, marked = EntryState.objects.get_or_create(
+                feed_id=feed_pk, entry_id=pk, defaults={"is_read": True}
+            )
+        if marked:
+            _feeds_add_to_entry_counters(Feed.objects.filter(pk=feed_pk), unread=-1)
+
+
+def toggle_entry_is_favorite(user: CustomUser, pk: int) -> None:
     """
-    Toggle entry's favorite status and save it.
+    Toggle entry's favorite status for the `user`, if they are subscribed to its source.
 
+    :param CustomUser user: user who toggles favorite status.
     :param int pk: primary key of the entry to toggle favorite status.
     """
-    entry = Entry.objects.get(pk=pk)
-    Entry.objects.filter(pk=pk).update(is_favorite=not entry.is_favorite)
+    feed_pk = _get_user_entry_feed_pk(user, pk)
+    if not feed_pk:
+        return
+
+    state, created = EntryState.objects.get_or_create(
+        feed_id=feed_pk, entry_id=pk, defaults={"is_favorite": True}
+    )
+    if not created:
+        EntryState.objects.filter(pk=state.pk).update(is_favorite=not state.is_favorite)
+
+
+def _get_user_entry_feed_pk(user: CustomUser, entry_pk: int) -> int | None:
+    """
+    Return primary key of the `user`'s feed subscribed to the source of the entry.
+
+    :return: primary key of the feed, or None if `user` is not subscribed to it.
+    """
+    return (
+        Feed.objects.filter(user=user, source__entries=entry_pk)
+        .values_list("pk", flat=True)
+        .first()
+    )
 
 
-def entry_exists(feed: Feed, url: str) -> bool:
-    return Entry.objects.filter(feed=feed, url=url).exists()
+def entry_exists(source: FeedSource, url: str) -> bool:
+    return Entry.objects.filter(source=source, url_hash=get_url_hash(url)).exists()
 
 
 def user_subscribed_to_feed(user: CustomUser, feed_url: str) -> bool:
@@ -223,7 +582,9 @@ def user_subscribed_to_feed(user: CustomUser, feed_url: str) -> bool:
     :param feed_url: feed URL to check for subscription.
     :return: True if `user` is already subscribed to `feed_url`, False otherwise.
     """
-    return Feed.objects.filter(user=user, url=feed_url).exists()
+    return Feed.objects.filter(
+        user=user, source__url_hash=get_url_hash(feed_url)
+    ).exists()
 
 
 def mark_feed_as_read(feed_pk: int) -> None:
@@ -232,153 +593,931 @@ def mark_feed_as_read(feed_pk: int) -> None:
 
     :param int feed_pk: primary key of the feed where to mark all entries as read.
     """
-    Entry.objects.filter(feed_id=feed_pk, is_read=False).update(is_read=True)
+    with transaction.atomic():
+        marked_count = EntryState.objects.filter(feed_id=feed_pk, is_read=False).update(
+            is_read=True
+        )
+        # Entries without state are unread, so read states are created for them.
+        unmarked_entry_pks = (
+            Entry.objects.filter(source__feeds=feed_pk)
+            .exclude(states__feed=feed_pk)
+            .values_list("pk", flat=True)
+        )
+        new_states = EntryState.objects.bulk_create(
+            [
+                EntryState(feed_id=feed_pk, entry_id=entry_pk, is_read=True)
+                for entry_pk in unmarked_entry_pks
+            ],
+            batch_size=ENTRY_STATE_BATCH_SIZE,
+        )
+        marked_count += len(new_states)
+        if marked_count:
+            _feeds_add_to_entry_counters(
+                Feed.objects.filter(pk=feed_pk), unread=-marked_count
+            )
+
+
+def _feeds_add_to_entry_counters(
+    feeds: QuerySet,
+    total: int = 0,
+    unread: int = 0,
+    pub_date: datetime | None = None,
+) -> None:
+    """
+    Add `total` and `unread` (negative to subtract) to the entry counters of the `feeds`
+    and their folders. Should be called in the same transaction as the entries are changed.
+    Counters don't go below zero, even if they have drifted, until they are repaired
+    by `reconcile_entry_counters()`.
+
+    :param QuerySet feeds: feeds to change counters of, e.g. all subscribers of the source.
+    :param int total: change of the number of entries.
+    :param int unread: change of the number of unread entries.
+    :param datetime pub_date: publication date of the latest new entry, if any.
+    """
+    counters = {
+        "total_entry_count": Greatest(F("total_entry_count") + total, Value(0)),
+        "unread_entry_count": Greatest(F("unread_entry_count") + unread, Value(0)),
+    }
+    feed_fields = {}
+    if pub_date:
+        feed_fields["latest_entry_pub_date"] = Greatest(
+            Coalesce("latest_entry_pub_date", Value(pub_date)), Value(pub_date)
+        )
+
+    feeds.update(**counters, **feed_fields)
+    # Sums of the feeds are used, as folders may contain several subscribers of the source.
+    _folders_set_entry_counters(Folder.objects.filter(feeds__in=feeds))
+
+
+def folders_update_entry_counters(folder_pks: Iterable[int | None]) -> None:
+    """
+    Recalculate entry counters of the folders from the counters of their feeds,
+    e.g. when a feed is moved to another folder or deleted.
+
+    :param folder_pks: primary keys of the folders, None values are skipped.
+    """
+    _folders_set_entry_counters(
+        Folder.objects.filter(pk__in=[pk for pk in folder_pks if pk])
+    )
+
+
+def _folders_set_entry_counters(folders: QuerySet) -> None:
+    """
+    Set entry counters of the `folders` to the sums of the counters of their feeds.
+    """
+    feed_counters = (
+        Feed.objects.filter(folder=OuterRef("pk"))
+        .order_by()
+        .values("folder")
+        .annotate(
+            total=Sum("total_entry_count"),
+            unread=Sum("unread_entry_count"),
+        )
+    )
+    folders.update(
+        total_entry_count=Coalesce(Subquery(feed_counters.values("total")), 0),
+        unread_entry_count=Coalesce(Subquery(feed_counters.values("unread")), 0),
+    )
+
+
+def reconcile_entry_counters() -> int:
+    """
+    Find feeds which entry counters differ from the actual number of the entries of their
+    sources, e.g. after entries were inserted by concurrent updates or changed in the admin,
+    and recalculate their counters, and counters of all folders.
+
+    :return: number of feeds with fixed counters.
+    """
+    actual_counters = _get_entry_counter_expressions()
+    feed_counters = Feed.objects.annotate(
+        actual_total=actual_counters["total_entry_count"],
+        actual_unread=actual_counters["unread_entry_count"],
+        actual_latest_pub_date=actual_counters["latest_entry_pub_date"],
+    ).values_list(
+        "pk",
+        "total_entry_count",
+        "unread_entry_count",
+        "latest_entry_pub_date",
+        "actual_total",
+        "actual_unread",
+        "actual_latest_pub_date",
+    )
+    drifted_feed_pks = [
+        pk for pk, *counters in feed_counters if counters[:3] != counters[3:]
+    ]
+
+    if drifted_feed_pks:
+        logger.warning("Fixing entry counters of %s feeds", len(drifted_feed_pks))
+        _feeds_set_entry_counters(Feed.objects.filter(pk__in=drifted_feed_pks))
+
+    folders_update_entry_counters(Folder.objects.values_list("pk", flat=True))
+    return len(drifted_feed_pks)
+
+
+def _feeds_set_entry_counters(feeds: QuerySet) -> None:
+    """
+    Set entry counters of the `feeds` from the entries of their sources and the read marks.
+    Counted in the same statement, so entries changed meanwhile are not missed.
+    """
+    feeds.update(**_get_entry_counter_expressions())
+
+
+def _get_entry_counter_expressions() -> dict[str, Expression]:
+    """
+    Return expressions counting entries of the feed from the outer query: all entries of its
+    source, the unread ones (without read mark), and publication date of the latest entry.
+
+    :return: dict with expressions by names of the counter fields of the feed.
+    """
+    source_entries = Entry.objects.filter(source=OuterRef("source"))
+    total_count = _get_count_subquery(source_entries, "source")
+    read_count = _get_count_subquery(
+        EntryState.objects.filter(feed=OuterRef("pk"), is_read=True), "feed"
+    )
+    return {
+        "total_entry_count": total_count,
+        "unread_entry_count": total_count - read_count,
+        "latest_entry_pub_date": Subquery(
+            source_entries.order_by("-pub_date").values("pub_date")[:1],
+            output_field=DateTimeField(),
+        ),
+    }
+
+
+def _get_count_subquery(queryset: QuerySet, group_by: str) -> Coalesce:
+    """
+    Return expression counting rows of the `queryset`, filtered by the outer query.
+
+    :param QuerySet queryset: rows to count.
+    :param str group_by: field referencing the outer query.
+    """
+    count = (
+        queryset.order_by().values(group_by).annotate(count=Count("pk")).values("count")
+    )
+    return Coalesce(Subquery(count, output_field=IntegerField()), 0)
 
 
-def feed_update(feed: Feed) -> None:  # noqa: C901
+def feed_update(feed: Feed) -> None:
     """
-    Fetch entries for the feed using `feedparser`, then create new Entry instance for each fetched entry
-    if there's no entry with the same link already.
+    Fetch and parse entries for the feed, then create new Entry instance for each fetched entry
+    if there's no entry with the same link already. Entries are created in the shared source
+    of the feed, so they appear for all its subscribers.
 
     :param Feed feed: feed to update.
     """
-    logger.info("Updating feed: %s", feed)
+    feed_source_update(feed.source)
+
+
+def feed_source_update(source: FeedSource) -> None:
+    """
+    Fetch and parse entries of the feed source once for all its subscribers, then create new
+    Entry instances, if there's no entry with the same link already.
+
+    :param FeedSource source: feed source to update.
+    """
+    logger.info("Updating feed: %s", source)
 
     try:
-        feed_content = _get_parsed_feed_from_url(feed.url)
+        fetch_result = get_feed_from_url(
+            source.url, etag=source.etag, last_modified=source.last_modified
+        )
     except CantGetFeedFromURL as ex:
         logger.exception(
             "An error has occured while trying to get parsed feed from URL %s",
-            feed.url,
+            source.url,
             exc_info=ex,
         )
+        _feed_source_schedule_next_fetch(source, error=str(ex) or FETCH_ERROR_MESSAGE)
+        return
+
+    _feed_source_update_and_schedule(source, fetch_result)
+
+
+def _feed_source_update_and_schedule(
+    source: FeedSource, fetch_result: FeedFetchResult
+) -> None:
+    """
+    Create new entries in the `source` from the fetch result, then schedule the next fetch.
+    Error responses and content which is not a feed count as failed fetch.
+
+    :param FeedSource source: feed source to update.
+    :param FeedFetchResult fetch_result: result of the feed fetch.
+    """
+    error = None
+
+    try:
+        _feed_source_update_from_fetch_result(source, fetch_result)
+    except (CantGetFeedFromURL, CantParseFeed) as ex:
+        logger.warning("Can't update feed from URL %s: %s", source.url, ex)
+        error = str(ex)
+    except Exception as ex:
+        # Unexpected errors must not stop updating of the other feeds
+        logger.exception(
+            "An error has occured while updating feed from URL %s",
+            source.url,
+            exc_info=ex,
+        )
+        error = UPDATE_ERROR_MESSAGE
+
+    _feed_source_schedule_next_fetch(source, fetch_result, error)
+
+
+def _feed_source_schedule_next_fetch(
+    source: FeedSource,
+    fetch_result: FeedFetchResult | None = None,
+    error: str | None = None,
+) -> None:
+    """
+    Set `next_fetch_at` of the `source`, according to its publishing cadence and caching
+    headers of the response. Save response status code, if there's one, and count
+    consecutive failed fetches.
+
+    :param FeedSource source: feed source to schedule.
+    :param FeedFetchResult fetch_result: result of the feed fetch, if the server has responded.
+    :param str error: description of the error, if the fetch has failed.
+    """
+    failures = source.consecutive_failures + 1 if error else 0
+    fields = {
+        "next_fetch_at": timezone.now()
+        + _get_next_fetch_interval(source, fetch_result, failures),
+        "consecutive_failures": failures,
+        "last_fetch_error": (error or "")[:256],
+    }
+    if fetch_result:
+        fields["last_status_code"] = fetch_result.status_code
+    if failures == settings.FEED_DORMANT_FAILURES:
+        logger.warning(" - Feed is dormant after %s failed fetches", failures)
+
+    FeedSource.objects.filter(pk=source.pk).update(**fields)
+    for field, value in fields.items():
+        setattr(source, field, value)
+    logger.info(" - Next fetch at: %s", fields["next_fetch_at"])
+
+
+def _get_next_fetch_interval(
+    source: FeedSource, fetch_result: FeedFetchResult | None = None, failures: int = 0
+) -> timedelta:
+    """
+    Calculate interval until the next fetch of the feed `source`. Publishing cadence of
+    the feed is extended by server's `max-age` (up to `settings.FEED_FETCH_MAX_INTERVAL`),
+    throttled feeds wait for `Retry-After` (or `settings.FEED_THROTTLE_INTERVAL`), and
+    failing feeds back off exponentially.
+
+    :param FeedSource source: feed source to calculate fetch interval for.
+    :param FeedFetchResult fetch_result: result of the last feed fetch, if there's one.
+    :param int failures: number of consecutive failed fetches, including the last one.
+    :return: interval between fetches.
+    """
+    interval = _get_feed_fetch_interval(source).total_seconds()
+
+    if fetch_result and fetch_result.max_age:
+        interval = max(
+            interval, min(fetch_result.max_age, settings.FEED_FETCH_MAX_INTERVAL)
+        )
+
+    if fetch_result and fetch_result.is_throttled:
+        retry_after = fetch_result.retry_after or settings.FEED_THROTTLE_INTERVAL
+        interval = max(interval, retry_after)
+
+    if failures:
+        interval = max(interval, _get_failure_backoff_interval(failures))
+
+    return timedelta(seconds=interval)
+
+
+def _get_failure_backoff_interval(failures: int) -> int:
+    """
+    Calculate interval before the next fetch of the feed which has failed `failures` times
+    in a row, in seconds. Interval doubles with each failure, starting from
+    `settings.FEED_FETCH_MIN_INTERVAL`, up to `settings.FEED_FETCH_MAX_INTERVAL`.
+    After `settings.FEED_DORMANT_FAILURES` failures the feed is dormant, and is fetched
+    once per `settings.FEED_DORMANT_INTERVAL`.
+    """
+    if failures >= settings.FEED_DORMANT_FAILURES:
+        return settings.FEED_DORMANT_INTERVAL
+
+    return min(
+        settings.FEED_FETCH_MIN_INTERVAL * 2**failures, settings.FEED_FETCH_MAX_INTERVAL
+    )
+
+
+def _get_feed_fetch_interval(source: FeedSource) -> timedelta:
+    """
+    Calculate how often the feed `source` should be fetched, based on the publication dates
+    of its latest entries. Time since the newest entry counts too, so feeds which stopped
+    publishing are fetched less and less often.
+
+    The feed is fetched twice per average interval between its entries, but not more often
+    than `settings.FEED_FETCH_MIN_INTERVAL` and not less often than
+    `settings.FEED_FETCH_MAX_INTERVAL`.
+
+    :param FeedSource source: feed source to calculate fetch interval for.
+    :return: interval between fetches.
+    """
+    pub_dates = list(
+        source.entries.order_by("-pub_date").values_list("pub_date", flat=True)[
+            :FEED_CADENCE_ENTRIES
+        ]
+    )
+
+    if not pub_dates:
+        return timedelta(seconds=settings.FEED_FETCH_MAX_INTERVAL)
+
+    average_interval = (timezone.now() - pub_dates[-1]).total_seconds() / len(pub_dates)
+    interval = min(
+        max(average_interval / 2, settings.FEED_FETCH_MIN_INTERVAL),
+        settings.FEED_FETCH_MAX_INTERVAL,
+    )
+    return timedelta(seconds=interval)
+
+
+def _feed_source_update_from_fetch_result(
+    source: FeedSource, fetch_result: FeedFetchResult
+) -> None:
+    """
+    Parse fetched feed content, then create new Entry instances in the `source`.
+
+    :param FeedSource source: feed source to update.
+    :param FeedFetchResult fetch_result: result of the feed fetch.
+    """
+    if not _is_fetch_result_parseable(source.url, fetch_result):
+        return
+
+    # Content which has already been parsed has nothing new.
+    if source.content_hash == fetch_result.content_hash:
+        logger.info(" - Content not changed since last fetch: %s", source.url)
+        _feed_source_set_validators(source, fetch_result)
         return
 
-    entries = feed_content.entries if feed_content else None
+    entries = parse_feed_entries(fetch_result.content)
 
     if not entries:
-        logger.warning("No 'entries' fetched from %s", feed.url)
+        logger.warning("No 'entries' fetched from %s", source.url)
+        _feed_source_set_validators(source, fetch_result)
         return
 
     logger.info(" - Number of entries: %s", len(entries))
 
-    # For each entry in feed_content.entries, try to get Entry from the database by `url`
-    # If not exists, create one.
-    with ThreadPoolExecutor(max_workers=settings.FEED_UPDATE_MAX_WORKERS) as executor:
-        tasks: list[Future] = []
-        future_to_url: dict[Future, str] = {}
-        task = partial(_entry_create_from_data_if_not_exists, feed)
-
-        for entry_data in entries:
-            future = executor.submit(task, entry_data)
-            tasks.append(future)
-            future_to_url[future] = entry_data.get("link")
-
-        new_entry_count = 0
-        for future in as_completed(tasks):
-            try:
-                res = future.result()
-                new_entry_count = new_entry_count + 1 if res else new_entry_count
-            except Exception as ex:
-                logger.exception(
-                    "An error has occured while trying to create entry fron link=%s",
-                    future_to_url[future],
-                    exc_info=ex,
-                )
-
-        logger.info(" -- Created %s new Entries in %s", new_entry_count, feed.title)
+    new_entry_pks_by_url = _feed_source_create_entries(source, entries)
+
+    _feed_source_set_validators(source, fetch_result)
+    _enqueue_entries_images_enrichment(
+        [[entry_pk] for entry_pk in new_entry_pks_by_url.values()]
+    )
+    logger.info(" - Page requests for entry images: %s", len(new_entry_pks_by_url))
+
+
+def _is_fetch_result_parseable(feed_url: str, fetch_result: FeedFetchResult) -> bool:
+    """
+    Check that fetch result has new feed content. "304 Not Modified" has no content, and
+    error pages or throttling responses should not be parsed.
+
+    :raises CantGetFeedFromURL: if the server has responded with error.
+    """
+    if fetch_result.not_modified:
+        logger.info(" - Not modified since last fetch: %s", feed_url)
+        return False
+
+    if fetch_result.is_throttled:
+        logger.warning(" - Throttled by server: %s", feed_url)
+        return False
+
+    if not fetch_result.is_success:
+        raise CantGetFeedFromURL(f"Unexpected status code {fetch_result.status_code}")
+
+    return True
+
+
+def _feed_source_create_entries(
+    source: FeedSource, entries: list[ParsedEntry]
+) -> dict[str, int]:
+    """
+    Create new Entry instances in the `source` from the parsed `entries`, and update
+    existing ones which have been changed. Existing entries are loaded with one query,
+    all new entries are inserted with one statement, and all changed entries are
+    updated with another one. Images of new entries are taken from the feed data,
+    if present, otherwise left pending, to be found later by `entries_enrich_images()`.
+
+    :param FeedSource source: feed source to create entries in.
+    :param list[ParsedEntry] entries: entries parsed from the feed.
+    :return: dict with URLs of new entries with pending images as keys and their
+             primary keys as values.
+    """
+    new_entries_data, changed_entries = _get_new_and_changed_entries_data(
+        source, entries
+    )
+    # New and changed entries may have the same tags, so each tag is looked up only once.
+    tags_by_title: dict[str, Tag] = {}
+
+    if changed_entries:
+        _feed_source_update_entries(source, changed_entries, tags_by_title)
+
+    if not new_entries_data:
+        logger.info(" -- No new Entries in %s", source)
+        return {}
+
+    new_entries = [
+        _entry_build_from_data(source, entry_data) for entry_data in new_entries_data
+    ]
+
+    # Entries inserted by concurrent workers in the meantime are skipped
+    # thanks to unique (source, url) and (source, guid) constraints. Counters may drift
+    # in that case, which is repaired by `reconcile_entry_counters()`.
+    with transaction.atomic():
+        Entry.objects.bulk_create(new_entries, ignore_conflicts=True)
+        _feeds_add_to_entry_counters(
+            Feed.objects.filter(source=source),
+            total=len(new_entries),
+            unread=len(new_entries),
+            pub_date=max(entry.pub_date for entry in new_entries),
+        )
+
+    entry_pks_by_url = dict(
+        Entry.objects.filter(
+            source=source, url_hash__in=[entry.url_hash for entry in new_entries]
+        ).values_list("url", "pk")
+    )
+    _entries_add_tags_from_data(entry_pks_by_url, new_entries_data, tags_by_title)
+
+    pending_image_urls = {entry.url for entry in new_entries if entry.image_url is None}
+    logger.info(" -- Created %s new Entries in %s", len(new_entries), source)
+    logger.info(
+        " -- Images found in feed data for %s new Entries, page requests avoided",
+        len(new_entries) - len(pending_image_urls),
+    )
+    return {
+        url: entry_pk
+        for url, entry_pk in entry_pks_by_url.items()
+        if url in pending_image_urls
+    }
+
+
+def _get_new_and_changed_entries_data(
+    source: FeedSource, entries: list[ParsedEntry]
+) -> tuple[list[ParsedEntry], list[tuple[ExistingEntry, ParsedEntry]]]:
+    """
+    Split the `entries` into ones which are not yet present in the `source`, and ones which
+    have been changed since they were saved. Entries are matched by GUID, then by hash
+    of the normalized URL, as entries saved before their GUIDs were known have URLs
+    as GUIDs.
+
+    :param FeedSource source: feed source to check entries for.
+    :param list[ParsedEntry] entries: entries parsed from the feed.
+    :return: tuple of the list of new entries, and the list of changed entries along with
+             the data of their existing instances.
+    """
+    entries_data_by_url_hash = _get_unique_entries_data(entries)
+    existing_entries = [
+        ExistingEntry._make(row)
+        for row in Entry.objects.filter(source=source)
+        .filter(
+            Q(guid__in=[entry.guid for entry in entries_data_by_url_hash.values()])
+            | Q(url_hash__in=entries_data_by_url_hash.keys())
+        )
+        .values_list(*ExistingEntry._fields)
+    ]
+    existing_by_guid = {entry.guid: entry for entry in existing_entries}
+    existing_by_url_hash = {entry.url_hash: entry for entry in existing_entries}
+
+    new_entries_data, changed_entries = [], []
+    for url_hash, entry_data in entries_data_by_url_hash.items():
+        existing_entry = existing_by_guid.get(
+            entry_data.guid
+        ) or existing_by_url_hash.get(url_hash)
+        if existing_entry is None:
+            new_entries_data.append(entry_data)
+        elif _is_entry_changed(
+            existing_entry, entry_data, existing_by_url_hash.get(url_hash)
+        ):
+            changed_entries.append((existing_entry, entry_data))
+    return new_entries_data, changed_entries
+
+
+def _get_unique_entries_data(entries: list[ParsedEntry]) -> dict[int, ParsedEntry]:
+    """
+    Return the `entries` with title and link, by hash of the link. Entries with duplicate
+    GUIDs or equivalent links are skipped, as well as entries with links which don't fit
+    into the database. GUIDs which don't fit are replaced with their hashes.
+    """
+    entries_data_by_url_hash = {}
+    guids = set()
+    for entry_data in entries:
+        if not _is_entry_data_storable(entry_data):
+            continue
+        entry_data.guid = _get_storable_guid(entry_data.guid)
+        if entry_data.guid in guids:
+            continue
+        url_hash = get_url_hash(entry_data.link)
+        if url_hash not in entries_data_by_url_hash:
+            entries_data_by_url_hash[url_hash] = entry_data
+            guids.add(entry_data.guid)
+    return entries_data_by_url_hash
+
+
+def _is_entry_data_storable(entry_data: ParsedEntry) -> bool:
+    """
+    Check that the parsed entry has title and link, and the link fits into the database.
+    """
+    if not (entry_data.title and entry_data.link):
+        return False
+    if len(entry_data.link) > _get_max_length(Entry, "url"):
+        logger.warning(" -- Entry link is too long: %s...", entry_data.link[:100])
+        return False
+    return True
+
+
+def _get_storable_guid(guid: str | None) -> str | None:
+    """
+    Return `guid`, or its SHA-256 hex digest if it doesn't fit into the database.
+    """
+    if guid and len(guid) > _get_max_length(Entry, "guid"):
+        return hashlib.sha256(guid.encode()).hexdigest()
+    return guid
+
+
+def _is_entry_changed(
+    existing_entry: ExistingEntry,
+    entry_data: ParsedEntry,
+    entry_with_same_url: ExistingEntry | None,
+) -> bool:
+    """
+    Check if the entry has been changed in the feed since the `existing_entry` was saved.
+    Entries are not updated if their new link belongs to another existing entry,
+    as links must be unique in the feed.
+    """
+    if (existing_entry.guid, existing_entry.fingerprint) == (
+        entry_data.guid,
+        entry_data.fingerprint,
+    ):
+        return False
+
+    return entry_with_same_url is None or entry_with_same_url.pk == existing_entry.pk
+
+
+def _feed_source_update_entries(
+    source: FeedSource,
+    changed_entries: list[tuple[ExistingEntry, ParsedEntry]],
+    tags_by_title: dict[str, Tag],
+) -> None:
+    """
+    Update the entries of the `source` which have been changed in the feed, with one
+    statement. Publication dates are kept, as well as images found for the entries earlier.
+    Read and favorite marks of the subscribers are stored separately and are kept too.
+    New tags are added to the entries.
+
+    :param FeedSource source: feed source to update entries in.
+    :param list changed_entries: changed entries along with the data of their
+                                 existing instances.
+    :param dict tags_by_title: cache of tags by normalized title.
+    """
+    entries = []
+    for existing_entry, entry_data in changed_entries:
+        entry = _entry_build_from_data(source, entry_data)
+        entry.pk = existing_entry.pk
+        entry.image_url = entry.image_url or existing_entry.image_url
+        entries.append(entry)
+
+    Entry.objects.bulk_update(entries, fields=ENTRY_UPDATE_FIELDS)
+    _entries_add_tags_from_data(
+        {entry.url: entry.pk for entry in entries},
+        [entry_data for _, entry_data in changed_entries],
+        tags_by_title,
+    )
+    logger.info(" -- Updated %s changed Entries in %s", len(entries), source)
+
+
+def _feed_source_set_validators(
+    source: FeedSource, fetch_result: FeedFetchResult
+) -> None:
+    """
+    Save HTTP validators (`ETag` and `Last-Modified`) and content hash from successful fetch,
+    so the next update of the `source` can be made as conditional request, and unchanged
+    content is not parsed again. The source is not updated if it already has the same values.
+
+    :param FeedSource source: feed source to save validators for.
+    :param FeedFetchResult fetch_result: result of the fetch.
+    """
+    validators = {
+        "etag": fetch_result.etag,
+        "last_modified": fetch_result.last_modified,
+        "content_hash": fetch_result.content_hash,
+    }
+
+    if all(getattr(source, field) == value for field, value in validators.items()):
+        return
+
+    for field, value in validators.items():
+        setattr(source, field, value)
+
+    FeedSource.objects.filter(pk=source.pk).update(**validators)
 
 
 def _get_parsed_feed_from_url(url: str) -> FeedParserDict:
     """
-    Read feed data using `requests` with timeout, then parse content from it
-    using `feedparser`.
+    Read feed data from `url`, then parse content from it using `feedparser`.
 
     :param str url: url to parse feed from.
     :return: parsed feed as `FeedParserDict` or `None`.
     :raises CantGetFeedFromURL: in case of any error.
     """
+    fetch_result = get_feed_from_url(url)
+
+    if not fetch_result.is_success:
+        logger.warning(
+            "Unexpected status code %s from %s", fetch_result.status_code, url
+        )
+        raise CantGetFeedFromURL
+
+    # Put it to memory stream object
+    content = BytesIO(fetch_result.content)
+
+    # Return parsed content
+    return feedparser.parse(content)
+
+
+def get_feed_from_url(
+    url: str,
+    etag: str | None = None,
+    last_modified: str | None = None,
+) -> FeedFetchResult:
+    """
+    Read feed data using shared HTTP session with timeout. If `etag` or `last_modified` are
+    passed, make conditional request, so the server can respond with "304 Not Modified"
+    and empty body if the feed has not changed.
+    Response body is streamed, up to `settings.FEED_MAX_SIZE` bytes, and must be downloaded
+    within `settings.FEED_FETCH_DEADLINE` seconds after the response headers have arrived.
+
+    :param str url: url to read feed from.
+    :param str etag: `ETag` header value from the previous response.
+    :param str last_modified: `Last-Modified` header value from the previous response.
+    :return: `FeedFetchResult` with response status code, content and validators.
+    :raises CantGetFeedFromURL: in case of any error.
+    """
+    headers = get_feed_request_headers(etag=etag, last_modified=last_modified)
+
     try:
-        # NB: `User-Agent` must be set, or some feeds will reject us.
-        headers = {"User-Agent": "RSS Reader/0.1 (+https://rss.hazadus.ru/)"}
-        response = requests.get(url, timeout=5.0, headers=headers)
+        with http_get_stream(url, headers=headers) as response:
+            # Waiting for the host slot and retries don't count towards the deadline
+            deadline = time.monotonic() + settings.FEED_FETCH_DEADLINE
+            content = read_response_content(response, deadline)
     except requests.exceptions.ConnectTimeout:
         logger.warning("Timeout when connecting to %s", url)
-        raise CantGetFeedFromURL
+        raise CantGetFeedFromURL("Timeout when connecting")
     except requests.exceptions.ReadTimeout:
         logger.warning("Timeout when reading RSS %s", url)
-        raise CantGetFeedFromURL
-    except requests.exceptions.ConnectionError:
-        logger.warning("Failed to resolve %s", url)
-        raise CantGetFeedFromURL
+        raise CantGetFeedFromURL("Timeout when reading")
+    except requests.exceptions.RequestException:
+        # Includes `ConnectionError` raised when retries are exhausted
+        logger.warning("Failed to get %s", url)
+        raise CantGetFeedFromURL(FETCH_ERROR_MESSAGE)
+
+    return build_feed_fetch_result(
+        status_code=response.status_code,
+        content=content,
+        headers=response.headers,
+    )
 
-    # Put it to memory stream object
-    content = BytesIO(response.content)
 
-    # Return parsed content
-    return feedparser.parse(content)
+def _get_image_url_from_entry_data(entry_data: ParsedEntry) -> str | None:
+    """
+    Retrieve image URL from the parsed entry. Look for `media:thumbnail`, `media:content`
+    and enclosures with images, then for the first `<img>` in the content or summary.
+
+    :return: absolute image URL, if found, else None.
+    """
+    candidates = list(entry_data.image_urls)
+    for html in [entry_data.content, entry_data.summary]:
+        if html and (match := IMG_SRC_RE.search(html)):
+            candidates.append(unescape(match.group(1)))
+
+    image_urls = [
+        urljoin(entry_data.link or "", image_url.strip())
+        for image_url in candidates
+        if image_url and not image_url.startswith("data:")
+    ]
+    max_length = _get_max_length(Entry, "image_url")
+    return next(
+        (image_url for image_url in image_urls if len(image_url) <= max_length), None
+    )
 
 
-def _get_content_from_entry_data(entry_data: dict) -> str | None:
+def _entry_build_from_data(source: FeedSource, entry_data: ParsedEntry) -> Entry:
     """
-    Retrieve `text/html` content from entry data parsed by `feedparser` from feed url.
+    Build (but not save) Entry instance from the parsed entry. HTML of the entry
+    is sanitized first, if it's not yet.
+
+    :param FeedSource source: feed source to build entry in.
+    :param ParsedEntry entry_data: entry parsed from the feed.
+    :return: unsaved `Entry` instance.
+    """
+    entry_data.sanitize()
+    pub_date = parse_date(entry_data.published, entry_data.published_parsed)
+    upd_date = parse_date(entry_data.updated, entry_data.updated_parsed)
+    entry = _entry_build(
+        source=source,
+        title=_truncate(entry_data.title, _get_max_length(Entry, "title")),
+        url=entry_data.link,
+        author=_truncate(entry_data.author, _get_max_length(Entry, "author")),
+        image_url=_get_image_url_from_entry_data(entry_data),
+        description=entry_data.summary,
+        summary=entry_data.summary,
+        content=entry_data.content,
+        pub_date=pub_date,
+        upd_date=upd_date,
+    )
+    entry.guid = entry_data.guid
+    entry.fingerprint = entry_data.fingerprint
+    return entry
+
 
-    :return: text/html content, if found, else None.
+def _get_max_length(model: type[Model], field_name: str) -> int:
     """
-    content = None
+    Return `max_length` of the model's text field.
+    """
+    return model._meta.get_field(field_name).max_length
 
-    if content_list := entry_data.get("content", None):
-        for item in content_list:
-            if item.get("type", None) == "text/html":
-                content = item.get("value", None)
-                break
 
-    return content
+def _truncate(value: str | None, max_length: int) -> str | None:
+    """
+    Cut `value` to `max_length` characters, ending it with ellipsis if it's cut.
+    """
+    if value and len(value) > max_length:
+        return value[: max_length - 1] + "…"
+    return value
 
 
-def _entry_create_from_data_if_not_exists(feed: Feed, entry_data: dict) -> Entry | None:
+def _entries_add_tags_from_data(
+    entry_pks_by_url: dict[str, int],
+    entries_data: list[ParsedEntry],
+    tags_by_title: dict[str, Tag],
+) -> None:
     """
-    Create Entry instance from data parsed by `feedparser`. Add all tags (if present) for the Entry.
-    Tags will be created, if necessary.
+    Add all tags (if present) from the parsed entries to the entries.
+    Tags will be created, if necessary. All the tags are resolved with a couple of queries,
+    and all links between entries and tags are inserted with one statement.
 
-    :return: created `Entry` or `None`
+    :param dict entry_pks_by_url: primary keys of the entries by URL.
+    :param list[ParsedEntry] entries_data: entries parsed from the feed.
+    :param dict tags_by_title: cache of tags by normalized title.
     """
-    entry_instance = None
-    title = entry_data.get("title")
-    link = entry_data.get("link")
-    if title and link and not entry_exists(feed=feed, url=link):
-        logger.info(" -- Adding new Entry: %s", title)
-        pub_date = (
-            date_parser.parse(entry_data.get("published"))
-            if entry_data.get("published")
-            else None
+    titles_by_link = {
+        entry_data.link: _get_tag_titles_from_entry_data(entry_data)
+        for entry_data in entries_data
+    }
+    titles_by_link = {link: titles for link, titles in titles_by_link.items() if titles}
+
+    if not titles_by_link:
+        return
+
+    tags_by_title.update(
+        _tags_get_or_create(
+            set().union(*titles_by_link.values()) - tags_by_title.keys()
         )
-        upd_date = (
-            date_parser.parse(entry_data.get("updated"))
-            if entry_data.get("updated")
-            else None
+    )
+    EntryTag = Entry.tags.through
+    EntryTag.objects.bulk_create(
+        [
+            EntryTag(entry_id=entry_pks_by_url[url], tag_id=tags_by_title[title].pk)
+            for url, titles in titles_by_link.items()
+            if url in entry_pks_by_url
+            for title in titles
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def _get_tag_titles_from_entry_data(entry_data: ParsedEntry) -> set[str]:
+    """
+    Return set of normalized tag titles from the parsed entry.
+    """
+    titles = set()
+    for tag_title in entry_data.tags:
+        if title := _normalize_tag_title(tag_title or ""):
+            titles.add(title)
+    return titles
+
+
+def _enqueue_entries_images_enrichment(entry_pk_groups: list[list[int]]) -> None:
+    """
+    Schedule `tasks.enrich_entry_images` for the new entries in batches, after the current
+    transaction is committed.
+
+    :param list entry_pk_groups: groups of primary keys of entries with the same URL. Each group
+                                 is put into a single batch, so the page is requested only once.
+    """
+    batch: list[int] = []
+    for entry_pks in entry_pk_groups:
+        batch.extend(entry_pks)
+        if len(batch) >= settings.ENTRY_IMAGE_BATCH_SIZE:
+            transaction.on_commit(partial(_enqueue_entry_images_batch, batch))
+            batch = []
+
+    if batch:
+        transaction.on_commit(partial(_enqueue_entry_images_batch, batch))
+
+
+def _enqueue_entry_images_batch(entry_pks: list[int]) -> None:
+    """
+    Send `tasks.enrich_entry_images` for the batch of entries to the broker. Errors are
+    logged, not raised into the update of the feeds. Entries which were not enqueued
+    are picked up by `entries_enqueue_pending_images()`.
+    """
+    # NB: imported here to avoid circular import, because tasks depend on services.
+    from feeds.tasks import enrich_entry_images
+
+    try:
+        enrich_entry_images.delay(entry_pks)
+    except Exception as ex:
+        logger.exception(
+            "Can't schedule image enrichment of %s entries", len(entry_pks), exc_info=ex
         )
-        page_info = parse_page_info_from_url(url=link)
-        entry_instance = entry_create(
-            feed=feed,
-            title=title,
-            url=link,
-            author=entry_data.get("author", None),
-            image_url=page_info["image_url"] if page_info else None,
-            description=entry_data.get("description", None),
-            summary=entry_data.get("summary", None),
-            content=_get_content_from_entry_data(entry_data=entry_data),
-            pub_date=pub_date,
-            upd_date=upd_date,
+
+
+def entries_enqueue_pending_images() -> int:
+    """
+    Schedule image enrichment of the entries which images are still pending (`image_url`
+    is NULL), e.g. because the task could not be enqueued. Only entries created between
+    `settings.ENTRY_IMAGE_PENDING_MAX_AGE` and `settings.ENTRY_IMAGE_PENDING_MIN_AGE`
+    seconds ago are taken, so entries with tasks still in the queue are not scheduled twice.
+
+    :return: number of entries scheduled.
+    """
+    now = timezone.now()
+    entries = Entry.objects.filter(
+        image_url__isnull=True,
+        created__gte=now - timedelta(seconds=settings.ENTRY_IMAGE_PENDING_MAX_AGE),
+        created__lt=now - timedelta(seconds=settings.ENTRY_IMAGE_PENDING_MIN_AGE),
+    )
+    entry_pks_by_url = defaultdict(list)
+    for url, entry_pk in entries.values_list("url", "pk"):
+        entry_pks_by_url[url].append(entry_pk)
+
+    _enqueue_entries_images_enrichment(list(entry_pks_by_url.values()))
+
+    entry_count = sum(len(entry_pks) for entry_pks in entry_pks_by_url.values())
+    if entry_count:
+        logger.warning("Scheduled pending images of %s entries", entry_count)
+    return entry_count
+
+
+def entries_enrich_images(entry_pks: list[int]) -> int:
+    """
+    Find images for the entries with pending image (`image_url` is NULL) using `og:image`
+    meta tag of the entry page. Page of each unique URL is requested only once.
+    If there's no image, `image_url` is set to empty string, so the entry won't be processed again.
+
+    :param list[int] entry_pks: primary keys of the entries.
+    :return: number of entries with image found.
+    """
+    entries = Entry.objects.filter(pk__in=entry_pks, image_url__isnull=True)
+    entry_pks_by_url = defaultdict(list)
+    for url, entry_pk in entries.values_list("url", "pk"):
+        entry_pks_by_url[url].append(entry_pk)
+
+    # Requesting page info is the slowest part, so it is done in multiple threads.
+    with ThreadPoolExecutor(max_workers=settings.FEED_UPDATE_MAX_WORKERS) as executor:
+        image_urls = executor.map(_get_page_image_url, entry_pks_by_url.keys())
+
+    enriched_entry_count = 0
+    for entry_pks_with_url, image_url in zip(entry_pks_by_url.values(), image_urls):
+        Entry.objects.filter(pk__in=entry_pks_with_url).update(image_url=image_url)
+        enriched_entry_count += len(entry_pks_with_url) if image_url else 0
+
+    logger.info(
+        "Found images for %s of %s entries", enriched_entry_count, len(entry_pks)
+    )
+    return enriched_entry_count
+
+
+def _get_page_image_url(url: str) -> str:
+    """
+    Return URL of the image from meta tags of the page at `url`, or empty string if there's
+    no image or in case of any error.
+    Called in the worker thread, so DB connections opened by the host limiter in this
+    thread are closed afterwards.
+    """
+    try:
+        page_info = parse_page_info_from_url(url=url, with_favicon=False)
+    except Exception as ex:
+        logger.exception(
+            "An error has occured while trying to get page info from link=%s",
+            url,
+            exc_info=ex,
         )
+        return ""
+    finally:
+        connections.close_all()
+    image_url = page_info["image_url"] or ""
+    return image_url if len(image_url) <= _get_max_length(Entry, "image_url") else ""
 
-        # Add tags to entry instance
-        if tags := entry_data.get("tags"):
-            for tag_item in tags:
-                if term := tag_item["term"]:
-                    entry_instance.tags.add(_tag_get_or_create(term))
 
-    return entry_instance
+def _normalize_tag_title(title: str) -> str:
+    """
+    Capitalize tag `title`, trimming spaces and removing commas. Too long titles are cut
+    to fit into the database.
+    """
+    title = title.replace(",", "").lstrip().rstrip().capitalize()
+    return _truncate(title, _get_max_length(Tag, "title"))
 
 
 def _tag_get_or_create(title: str) -> Tag:
@@ -388,9 +1527,30 @@ def _tag_get_or_create(title: str) -> Tag:
     :param str title: title of the tag.
     :return: Tag instance.
     """
-    title = title.replace(",", "").lstrip().rstrip().capitalize()
-    queryset = Tag.objects.filter(title=title)
-    if queryset.exists():
-        return queryset.first()
-    else:
-        return Tag.objects.create(title=title)
+    title = _normalize_tag_title(title)
+    return _tags_get_or_create({title})[title]
+
+
+def _tags_get_or_create(titles: set[str]) -> dict[str, Tag]:
+    """
+    Get or create Tags with (already normalized) `titles`. Existing tags are fetched with
+    one query, missing ones are inserted with one statement. Tags created by concurrent
+    workers in the meantime are skipped thanks to unique index on title.
+
+    :param set[str] titles: normalized titles of the tags.
+    :return: dict with titles as keys and Tag instances as values.
+    """
+    if not titles:
+        return {}
+
+    tags_by_title = {tag.title: tag for tag in Tag.objects.filter(title__in=titles)}
+
+    if missing_titles := titles - tags_by_title.keys():
+        Tag.objects.bulk_create(
+            [Tag(title=title) for title in missing_titles], ignore_conflicts=True
+        )
+        tags_by_title.update(
+            {tag.title: tag for tag in Tag.objects.filter(title__in=missing_titles)}
+        )
+
+    return tags_by_title
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import receiver
+
+from feeds.models import Entry, Feed, FeedSource
+from feeds.services import folders_update_entry_counters
+from feeds.utils import get_url_hash
+
+
+@receiver(pre_save, sender=FeedSource)
+@receiver(pre_save, sender=Entry)
+def set_url_hash(sender, instance: FeedSource | Entry, **kwargs) -> None:
+    """
+    Keep `url_hash` of the feed source or entry in sync with its URL. Entries created with
+    `bulk_create()` don't send signals, so their hashes are set when they are built.
+    """
+    instance.url_hash = get_url_hash(instance.url)
+
+
+@receiver(post_delete, sender=Feed)
+def update_folder_entry_counters(sender, instance: Feed, **kwargs) -> None:
+    """
+    Subtract entries of the deleted feed from the counters of its folder.
+    """
+    folders_update_entry_counters([instance.folder_id])
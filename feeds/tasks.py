@@ -1,8 +1,17 @@
 from celery import shared_task
+from django.conf import settings
 
 from feeds.models import Feed
-from feeds.services import feed_update
-from feeds.utils import parse_page_info_from_url
+from feeds.services import (
+    entries_enqueue_pending_images,
+    entries_enrich_images,
+    feed_update,
+    reconcile_entry_counters,
+    site_metadata_get,
+    update_all_feeds,
+    update_due_feeds,
+)
+from feeds.utils import CantGetPageInfoFromURL
 
 
 @shared_task
@@ -16,10 +25,14 @@ def parse_and_set_image_for_feed(feed_pk: int):
     if not feed or feed.image_url:
         return
 
-    if page_info := parse_page_info_from_url(url=feed.site_url):
-        feed.image_url = page_info["favicon_url"] or page_info["image_url"] or None
-        feed.save()
-        print(f"Set image_url for '{feed}': {feed.image_url}")
+    try:
+        site_metadata = site_metadata_get(url=feed.site_url)
+    except CantGetPageInfoFromURL:
+        return
+
+    feed.image_url = site_metadata.favicon_url or site_metadata.image_url or None
+    feed.save()
+    print(f"Set image_url for '{feed}': {feed.image_url}")
 
 
 @shared_task
@@ -29,3 +42,44 @@ def update_feed(feed_pk: int):
     """
     if feed := Feed.objects.filter(pk=feed_pk).first():
         feed_update(feed=feed)
+
+
+@shared_task
+def update_feeds(engine: str | None = None):
+    """
+    Fetch new entries for all feeds, using `engine` ("sync" or "asyncio").
+    """
+    update_all_feeds(engine=engine)
+
+
+@shared_task
+def update_scheduled_feeds(engine: str | None = None):
+    """
+    Fetch new entries for feeds which are due. Run periodically by Celery beat.
+    """
+    update_due_feeds(engine=engine)
+
+
+@shared_task(rate_limit=settings.ENTRY_IMAGE_RATE_LIMIT)
+def enrich_entry_images(entry_pks: list[int]):
+    """
+    Find and set images for the batch of new entries.
+    """
+    entries_enrich_images(entry_pks=entry_pks)
+
+
+@shared_task
+def enqueue_pending_entry_images():
+    """
+    Schedule image enrichment of entries which images are still pending.
+    Run periodically by Celery beat.
+    """
+    entries_enqueue_pending_images()
+
+
+@shared_task
+def reconcile_feed_entry_counters():
+    """
+    Repair entry counters of feeds and folders. Run periodically by Celery beat.
+    """
+    reconcile_entry_counters()
@@ -3,8 +3,10 @@ from datetime import datetime
 from dateutil import tz
 from django.conf import settings
 from django.test import TestCase
+from django.utils import timezone
 
-from feeds.models import Entry
+from feeds.models import Entry, EntryState
+from feeds.services import reconcile_entry_counters
 from users.models import CustomUser
 
 
@@ -22,40 +24,40 @@ class BaseFeedsViewsTestCase(TestCase):
     fixtures = [
         "users/tests/fixtures/users.json",
         "feeds/tests/fixtures/tags.json",
+        "feeds/tests/fixtures/feed_sources.json",
         "feeds/tests/fixtures/feeds.json",
         "feeds/tests/fixtures/entries.json",
+        "feeds/tests/fixtures/entry_states.json",
     ]
 
     @classmethod
     def setUpTestData(cls):
         cls.user = CustomUser.objects.get(email=cls.email)
 
+        user_entries = Entry.objects.filter(source__feeds__user=cls.user)
+        read_entry_pks = EntryState.objects.filter(
+            feed__user=cls.user, is_read=True
+        ).values("entry")
+        favorite_entry_pks = EntryState.objects.filter(
+            feed__user=cls.user, is_favorite=True
+        ).values("entry")
+
         cls.MODE_QUERYSETS = {
-            "all": Entry.objects.filter(
-                feed__user=cls.user,
-            ),
-            "today": Entry.objects.filter(
-                feed__user=cls.user,
-                pub_date__day=datetime.today().day,
-                pub_date__month=datetime.today().month,
-                pub_date__year=datetime.today().year,
-            ),
-            "unread": Entry.objects.filter(
-                feed__user=cls.user,
-                is_read=False,
-            ),
-            "read": Entry.objects.filter(
-                feed__user=cls.user,
-                is_read=True,
-            ),
-            "favorites": Entry.objects.filter(
-                feed__user=cls.user,
-                is_favorite=True,
+            "all": user_entries,
+            # Date in `settings.TIME_ZONE`, as the user has no time zone set
+            "today": user_entries.filter(
+                pub_date__date=timezone.localdate(),
             ),
+            "unread": user_entries.exclude(pk__in=read_entry_pks),
+            "read": user_entries.filter(pk__in=read_entry_pks),
+            "favorites": user_entries.filter(pk__in=favorite_entry_pks),
         }
 
         # Change date for some entries - we need it so "Today" smart feed have some entries in it
-        entries = Entry.objects.filter(feed__user=cls.user)
+        entries = Entry.objects.filter(source__feeds__user=cls.user)
         for entry in entries[10:]:
             entry.pub_date = datetime.now(tz=tz.gettz(settings.TIME_ZONE))
             entry.save()
+
+        # Fixtures don't have entry counters of the feeds and folders
+        reconcile_entry_counters()
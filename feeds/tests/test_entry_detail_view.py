@@ -1,6 +1,6 @@
 from django.urls import reverse
 
-from feeds.models import Entry, Feed
+from feeds.models import Entry, EntryState, Feed
 
 from .base_test_case import BaseFeedsViewsTestCase
 
@@ -21,15 +21,35 @@ class EntryDetailViewTest(BaseFeedsViewsTestCase):
         )
 
         # Do the actual test
-        entry = Entry.objects.all().first()
-        entry.is_read = False
-        entry.save()
+        entry = self.MODE_QUERYSETS["unread"].first()
         entry_pk = entry.pk
 
         url = reverse("feeds:entry_detail", kwargs={"mode": "all", "pk": entry_pk})
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(Entry.objects.get(pk=entry_pk).is_read, True)
+        self.assertTrue(self.MODE_QUERYSETS["read"].filter(pk=entry_pk).exists())
+        self.assertTrue(response.context["entry"].is_read)
+
+    def test_entry_detail_view_not_subscribed(self):
+        """
+        Test that entries of the feeds user is not subscribed to are not shown,
+        and are not marked as read.
+        """
+        # Login
+        url = reverse("account_login")
+        self.client.post(
+            url, {"login": self.email, "password": self.password}, follow=True
+        )
+
+        # Do the actual test
+        entry = Entry.objects.exclude(source__feeds__user=self.user).first()
+
+        url = reverse("feeds:entry_detail", kwargs={"mode": "all", "pk": entry.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(
+            EntryState.objects.filter(entry=entry, feed__user=self.user).exists()
+        )
 
     def test_entry_detail_view_context_data_in_smart_feeds(self):
         """
@@ -97,8 +117,8 @@ class EntryDetailViewTest(BaseFeedsViewsTestCase):
         )
 
         # Do the actual test: request detail view for each entry in each feed (non-"Smart" feed!)
-        for feed in Feed.objects.all():
-            for entry in feed.entries.filter(feed=feed):
+        for feed in Feed.objects.filter(user=self.user):
+            for entry in feed.source.entries.all():
                 with self.subTest(feed=feed, entry=entry):
                     url = (
                         reverse(
@@ -113,7 +133,7 @@ class EntryDetailViewTest(BaseFeedsViewsTestCase):
                     # Number of entries in the feed to which entry belongs:
                     self.assertEqual(
                         response.context["entry_count"],
-                        self.MODE_QUERYSETS[mode].filter(feed=feed).count(),
+                        self.MODE_QUERYSETS[mode].filter(source__feeds=feed).count(),
                     )
                     self.assertEqual(
                         len(response.context["feeds"]),
@@ -1,6 +1,7 @@
 from django.urls import reverse
 
 from feeds.models import Feed
+from feeds.services import mark_entry_as_read
 
 from .base_test_case import BaseFeedsViewsTestCase
 
@@ -70,7 +71,7 @@ class EntryListViewTest(BaseFeedsViewsTestCase):
         self.assertEqual(response.context["mode"], "today")
         self.assertEqual(
             response.context["entry_count"],
-            self.MODE_QUERYSETS["today"].filter(feed__user=self.user).count(),
+            self.MODE_QUERYSETS["today"].count(),
         )
         self.assertEqual(
             len(response.context["feeds"]), Feed.objects.filter(user=self.user).count()
@@ -252,9 +253,12 @@ class EntryListViewTest(BaseFeedsViewsTestCase):
                 self.assertEqual(response.context["mode"], mode)
                 self.assertEqual(response.context["in_feed"], str(feed.pk))
                 self.assertEqual(response.context["feed"], feed)
+                # Entries of other users' feeds are not listed
                 self.assertEqual(
                     response.context["entry_count"],
-                    self.MODE_QUERYSETS[mode].filter(feed=feed).count(),
+                    self.MODE_QUERYSETS[mode]
+                    .filter(source__feeds=feed, source__feeds__user=self.user)
+                    .count(),
                 )
                 self.assertEqual(
                     len(response.context["feeds"]),
@@ -280,3 +284,83 @@ class EntryListViewTest(BaseFeedsViewsTestCase):
                     response.context["favorites_entries_count"],
                     self.MODE_QUERYSETS["favorites"].count(),
                 )
+
+    def test_entry_list_cursor_pagination(self):
+        """
+        Test that "Load more" links go through all entries of the list exactly once.
+        """
+        # Login
+        url = reverse("account_login")
+        response = self.client.post(
+            url, {"login": self.email, "password": self.password}, follow=True
+        )
+
+        # Do the actual test
+        url = reverse("feeds:entry_list", kwargs={"mode": "all"})
+        entry_pks = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.context["entries"]), 15)
+            entry_pks += [entry.pk for entry in response.context["entries"]]
+            if next_page_url := response.context.get("next_page_url"):
+                url = (
+                    reverse("feeds:entry_list", kwargs={"mode": "all"}) + next_page_url
+                )
+            else:
+                url = None
+
+        self.assertEqual(
+            entry_pks,
+            list(
+                self.MODE_QUERYSETS["all"]
+                .order_by("-pub_date", "-id")
+                .values_list("pk", flat=True)
+            ),
+        )
+
+    def test_entry_list_cursor_pagination_unread(self):
+        """
+        Test that entries aren't skipped in "Unread" mode, when entries of the previous
+        page are marked as read.
+        """
+        # Login
+        url = reverse("account_login")
+        response = self.client.post(
+            url, {"login": self.email, "password": self.password}, follow=True
+        )
+
+        # Do the actual test
+        url = reverse("feeds:entry_list", kwargs={"mode": "unread"})
+        unread_pks = list(
+            self.MODE_QUERYSETS["unread"]
+            .order_by("-pub_date", "-id")
+            .values_list("pk", flat=True)
+        )
+        response = self.client.get(url)
+        first_page_pks = [entry.pk for entry in response.context["entries"]]
+        self.assertEqual(first_page_pks, unread_pks[:15])
+
+        for entry_pk in first_page_pks:
+            mark_entry_as_read(user=self.user, pk=entry_pk)
+        response = self.client.get(url + response.context["next_page_url"])
+
+        self.assertEqual(
+            [entry.pk for entry in response.context["entries"]], unread_pks[15:30]
+        )
+        self.assertEqual(response.context["first_page_url"], "?")
+
+    def test_entry_list_invalid_cursor(self):
+        """
+        Test that malformed cursor gives 404.
+        """
+        # Login
+        url = reverse("account_login")
+        response = self.client.post(
+            url, {"login": self.email, "password": self.password}, follow=True
+        )
+
+        # Do the actual test
+        url = reverse("feeds:entry_list", kwargs={"mode": "all"})
+        response = self.client.get(url + "?cursor=abc")
+        self.assertEqual(response.status_code, 404)
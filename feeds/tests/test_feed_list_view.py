@@ -46,11 +46,13 @@ class FeedListViewTest(BaseFeedsViewsTestCase):
         )
         self.assertEqual(
             response.context["all_unread_count"],
-            self.MODE_QUERYSETS["all"].filter(is_read=False).count(),
+            self.MODE_QUERYSETS["unread"].count(),
         )
         self.assertEqual(
             response.context["today_unread_count"],
-            self.MODE_QUERYSETS["today"].filter(is_read=False).count(),
+            self.MODE_QUERYSETS["today"]
+            .filter(pk__in=self.MODE_QUERYSETS["unread"])
+            .count(),
         )
         self.assertEqual(
             response.context["unread_entries_count"],
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import reverse
 
 from feeds.models import Feed, Folder
@@ -57,7 +58,7 @@ class FeedsSettingsViewTest(BaseFeedsViewsTestCase):
         )
         self.assertEqual(response.status_code, 200)
 
-        new_feed = Feed.objects.get(user=self.user, url=feed_url)
+        new_feed = Feed.objects.get(user=self.user, source__url=feed_url)
         self.assertEqual(new_feed.title, title)
         self.assertEqual(new_feed.url, feed_url)
         self.assertEqual(new_feed.site_url, site_url)
@@ -86,7 +87,9 @@ class FeedsSettingsViewTest(BaseFeedsViewsTestCase):
         )
         self.assertEqual(response.status_code, 200)
         self.assertContains(response, "You already have subscription")
-        self.assertEqual(Feed.objects.filter(user=self.user, url=feed.url).count(), 1)
+        self.assertEqual(
+            Feed.objects.filter(user=self.user, source=feed.source).count(), 1
+        )
 
     def test_settings_feeds_manage_feeds(self):
         """
@@ -105,3 +108,27 @@ class FeedsSettingsViewTest(BaseFeedsViewsTestCase):
                 url = reverse("feeds:settings_feeds")
                 response = self.client.get(url)
                 self.assertContains(response, feed.title)
+
+    def test_settings_feeds_manage_feeds_status(self):
+        """
+        Test that status of failing and dormant feeds is shown in "Manage Feeds" section.
+        """
+        # Login
+        url = reverse("account_login")
+        self.client.post(
+            url, {"login": self.email, "password": self.password}, follow=True
+        )
+
+        failing_feed, dormant_feed = Feed.objects.filter(user=self.user)[:2]
+        failing_feed.source.consecutive_failures = 2
+        failing_feed.source.last_fetch_error = "Timeout when reading"
+        failing_feed.source.save()
+        dormant_feed.source.consecutive_failures = settings.FEED_DORMANT_FAILURES
+        dormant_feed.source.save()
+
+        url = reverse("feeds:settings_feeds")
+        response = self.client.get(url)
+
+        self.assertContains(response, "Failing (2)")
+        self.assertContains(response, 'title="Timeout when reading"')
+        self.assertContains(response, "Dormant")
@@ -0,0 +1,162 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+from requests.structures import CaseInsensitiveDict
+
+from feeds.exceptions import CantGetFeedFromURL
+from feeds.fetchers import (
+    FeedFetchRequest,
+    build_feed_fetch_result,
+    fetch_feeds_concurrently,
+    read_response_content,
+)
+
+RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Feed</title><link>https://example.com</link></channel></rss>
+"""
+
+
+def build_mock_client(handler) -> httpx.AsyncClient:
+    """
+    Build async HTTP client which uses `handler` to respond to all requests.
+    """
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@override_settings(HOST_LIMIT_CACHE="default", HOST_MIN_REQUEST_INTERVAL=0)
+class FetchersTest(SimpleTestCase):
+    def test_fetch_feeds_concurrently(self):
+        """
+        Test that `fetch_feeds_concurrently()` fetches all the URLs, sends validators and
+        returns the error for failed requests.
+        """
+        requested_headers = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requested_headers[str(request.url)] = request.headers
+            if request.url.host == "down.example.com":
+                raise httpx.ConnectError("Connection refused")
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, content=RSS, headers={"ETag": '"v1"'})
+
+        with patch(
+            "feeds.fetchers._build_async_client",
+            lambda: build_mock_client(handler),
+        ):
+            results = fetch_feeds_concurrently(
+                [
+                    FeedFetchRequest("https://example.com/rss.xml"),
+                    FeedFetchRequest("https://example.com/atom.xml", etag='"v1"'),
+                    FeedFetchRequest("https://down.example.com/rss.xml"),
+                ]
+            )
+
+        self.assertEqual(len(requested_headers), 3)
+        self.assertNotIn(
+            "If-None-Match", requested_headers["https://example.com/rss.xml"]
+        )
+
+        self.assertEqual(results["https://example.com/rss.xml"].status_code, 200)
+        self.assertEqual(results["https://example.com/rss.xml"].content, RSS)
+        self.assertEqual(results["https://example.com/rss.xml"].etag, '"v1"')
+        self.assertTrue(results["https://example.com/atom.xml"].not_modified)
+        self.assertIsInstance(
+            results["https://down.example.com/rss.xml"], CantGetFeedFromURL
+        )
+
+    def test_build_feed_fetch_result(self):
+        """
+        Ensure that caching and throttling headers are parsed to number of seconds.
+        """
+        date = "Tue, 10 Oct 2023 10:00:00 GMT"
+        cases = [
+            ({}, None, None),
+            ({"Cache-Control": "public, max-age=1800"}, 1800, None),
+            (
+                {
+                    "Cache-Control": "max-age=60",
+                    "Expires": "Tue, 10 Oct 2023 11:00:00 GMT",
+                },
+                60,
+                None,
+            ),
+            ({"Date": date, "Expires": "Tue, 10 Oct 2023 11:00:00 GMT"}, 3600, None),
+            ({"Date": date, "Expires": "0"}, 0, None),
+            ({"Retry-After": "120"}, None, 120),
+            ({"Retry-After": "Tue, 10 Oct 2000 11:00:00 GMT"}, None, 0),
+            ({"Retry-After": "soon"}, None, None),
+        ]
+
+        for headers, max_age, retry_after in cases:
+            with self.subTest(headers=headers):
+                result = build_feed_fetch_result(
+                    status_code=200, content=b"", headers=CaseInsensitiveDict(headers)
+                )
+                self.assertEqual(result.max_age, max_age)
+                self.assertEqual(result.retry_after, retry_after)
+
+    @override_settings(FEED_MAX_SIZE=len(RSS))
+    def test_fetch_feeds_concurrently_max_size(self):
+        """
+        Ensure that feeds larger than `FEED_MAX_SIZE` are rejected, with or without
+        `Content-Length` header.
+        """
+
+        async def stream_content():
+            yield RSS
+            yield b"<!-- more -->"
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/streamed.xml":
+                return httpx.Response(200, content=stream_content())
+            return httpx.Response(200, content=RSS + b" ")
+
+        with patch(
+            "feeds.fetchers._build_async_client",
+            lambda: build_mock_client(handler),
+        ):
+            results = fetch_feeds_concurrently(
+                [
+                    FeedFetchRequest("https://example.com/rss.xml"),
+                    FeedFetchRequest("https://example.com/streamed.xml"),
+                ]
+            )
+
+        self.assertEqual(
+            results.keys(),
+            {"https://example.com/rss.xml", "https://example.com/streamed.xml"},
+        )
+        for result in results.values():
+            self.assertIsInstance(result, CantGetFeedFromURL)
+            self.assertEqual(str(result), f"Feed is larger than {len(RSS)} bytes")
+
+    @override_settings(FEED_MAX_SIZE=1024)
+    def test_read_response_content(self):
+        """
+        Ensure that `read_response_content()` reads content of the streamed response, and
+        aborts download of too large or too slow responses.
+        """
+        response = MagicMock(headers=CaseInsensitiveDict(), raw=None)
+        deadline = time.monotonic() + 10
+
+        response.iter_content.return_value = iter([b"a" * 1000, b"b" * 24])
+        self.assertEqual(
+            read_response_content(response, deadline), b"a" * 1000 + b"b" * 24
+        )
+
+        response.iter_content.return_value = iter([b"a" * 1000, b"b" * 25])
+        with self.assertRaisesMessage(CantGetFeedFromURL, "larger than 1024 bytes"):
+            read_response_content(response, deadline)
+
+        response.headers["Content-Length"] = "2048"
+        response.iter_content.return_value = iter([])
+        with self.assertRaisesMessage(CantGetFeedFromURL, "larger than 1024 bytes"):
+            read_response_content(response, deadline)
+
+        response.headers.clear()
+        response.iter_content.return_value = iter([b"a"])
+        with self.assertRaisesMessage(CantGetFeedFromURL, "took longer than"):
+            read_response_content(response, time.monotonic() - 1)
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.db import DatabaseError
+from django.test import SimpleTestCase, override_settings
+
+from feeds.host_limiter import (
+    _local_cache,
+    async_host_limit,
+    get_host,
+    host_limit,
+    release_host_slot,
+    try_acquire_host_slot,
+)
+
+
+@override_settings(
+    HOST_LIMIT_CACHE="default",
+    HOST_MAX_CONCURRENT_REQUESTS=2,
+    HOST_MIN_REQUEST_INTERVAL=0,
+    HOST_LIMIT_MAX_WAIT=0,
+)
+class HostLimiterTest(SimpleTestCase):
+    def setUp(self):
+        caches["default"].clear()
+        _local_cache.clear()
+
+    def test_get_host(self):
+        """
+        Ensure that host is parsed from URL in lower case.
+        """
+        self.assertEqual(get_host("https://3DNews.ru/news/rss/"), "3dnews.ru")
+
+    def test_try_acquire_host_slot(self):
+        """
+        Ensure that no more than `HOST_MAX_CONCURRENT_REQUESTS` slots are acquired for the host,
+        and that other hosts are not affected.
+        """
+        slot_keys = [try_acquire_host_slot("3dnews.ru") for _ in range(2)]
+
+        self.assertTrue(all(slot_keys))
+        self.assertIsNone(try_acquire_host_slot("3dnews.ru"))
+        self.assertIsNotNone(try_acquire_host_slot("stopgame.ru"))
+
+        release_host_slot(slot_keys[0])
+        self.assertIsNotNone(try_acquire_host_slot("3dnews.ru"))
+
+    @override_settings(HOST_MIN_REQUEST_INTERVAL=60)
+    def test_try_acquire_host_slot_spacing(self):
+        """
+        Ensure that only one request to the host is allowed per time window.
+        """
+        slot_key = try_acquire_host_slot("3dnews.ru")
+        self.assertIsNotNone(slot_key)
+
+        release_host_slot(slot_key)
+        self.assertIsNone(try_acquire_host_slot("3dnews.ru"))
+
+    @override_settings(HOST_MIN_REQUEST_INTERVAL=0.2)
+    def test_try_acquire_host_slot_spacing_since_last_request(self):
+        """
+        Ensure that next request to the host is allowed once the interval has passed since
+        the last one.
+        """
+        release_host_slot(try_acquire_host_slot("3dnews.ru"))
+        self.assertIsNone(try_acquire_host_slot("3dnews.ru"))
+
+        time.sleep(0.25)
+        self.assertIsNotNone(try_acquire_host_slot("3dnews.ru"))
+
+    @patch("feeds.host_limiter.caches")
+    def test_try_acquire_host_slot_cache_unavailable(self, caches_):
+        """
+        Ensure that per-process limits are used when the shared cache fails.
+        """
+        caches_.__getitem__.return_value.add.side_effect = DatabaseError
+        caches_.__getitem__.return_value.delete.side_effect = DatabaseError
+
+        with self.assertLogs("feeds.host_limiter", level="WARNING"):
+            slot_keys = [try_acquire_host_slot("3dnews.ru") for _ in range(3)]
+
+        self.assertTrue(all(slot_keys[:2]))
+        self.assertIsNone(slot_keys[2])
+        release_host_slot(slot_keys[0])
+        self.assertIsNotNone(try_acquire_host_slot("3dnews.ru"))
+
+    def test_host_limit(self):
+        """
+        Ensure that slot is held within the block and released after it, and that busy host
+        is requested anyway after max. wait time.
+        """
+        with host_limit("https://3dnews.ru/news/rss/"):
+            with host_limit("https://3dnews.ru/games/rss/"):
+                self.assertIsNone(try_acquire_host_slot("3dnews.ru"))
+                with self.assertLogs("feeds.host_limiter", level="WARNING"):
+                    with host_limit("https://3dnews.ru/hardware/rss/"):
+                        pass
+
+        self.assertIsNotNone(try_acquire_host_slot("3dnews.ru"))
+
+    def test_async_host_limit(self):
+        """
+        Ensure that `async_host_limit()` holds the slot within the block.
+        """
+
+        async def request():
+            async with async_host_limit("https://3dnews.ru/news/rss/"):
+                return try_acquire_host_slot("3dnews.ru")
+
+        self.assertIsNotNone(asyncio.run(request()))
+        # One slot is still held by `try_acquire_host_slot()` call above
+        self.assertIsNotNone(try_acquire_host_slot("3dnews.ru"))
+        self.assertIsNone(try_acquire_host_slot("3dnews.ru"))
@@ -0,0 +1,55 @@
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from feeds.host_limiter import try_acquire_host_slot
+from feeds.http_client import USER_AGENT, get_session, http_get_stream
+
+
+class HTTPClientTest(SimpleTestCase):
+    def test_get_session_is_shared(self):
+        """
+        Ensure that the same session is returned within the process, and that it is
+        configured with `User-Agent` and connection pools.
+        """
+        session = get_session()
+
+        self.assertIs(get_session(), session)
+        self.assertEqual(session.headers["User-Agent"], USER_AGENT)
+        self.assertIs(
+            session.get_adapter("http://a.com"), session.get_adapter("https://b.com")
+        )
+
+    def test_get_session_after_fork(self):
+        """
+        Ensure that new session is created in the forked process.
+        """
+        session = get_session()
+
+        with patch("feeds.http_client.os.getpid", return_value=-1):
+            self.assertIsNot(get_session(), session)
+
+    @override_settings(
+        HOST_LIMIT_CACHE="default",
+        HOST_MAX_CONCURRENT_REQUESTS=1,
+        HOST_MIN_REQUEST_INTERVAL=0,
+    )
+    @patch("feeds.http_client.get_session")
+    def test_http_get_stream_holds_host_slot(self, get_session):
+        """
+        Ensure that `http_get_stream()` holds the request slot of the host until the end of
+        the block, and closes the response after it.
+        """
+        caches["default"].clear()
+        response = MagicMock()
+        get_session.return_value.get.return_value.__enter__.return_value = response
+
+        with http_get_stream("https://3dnews.ru/news/rss/") as streamed_response:
+            self.assertIs(streamed_response, response)
+            self.assertIsNone(try_acquire_host_slot("3dnews.ru"))
+            get_session.return_value.get.return_value.__exit__.assert_not_called()
+
+        get_session.return_value.get.return_value.__exit__.assert_called_once()
+        self.assertIsNotNone(try_acquire_host_slot("3dnews.ru"))
+        self.assertTrue(get_session.return_value.get.call_args.kwargs["stream"])
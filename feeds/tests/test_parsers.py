@@ -0,0 +1,139 @@
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from feedparser import sanitizer
+
+from feeds.exceptions import CantParseFeed
+from feeds.parsers import (
+    ParsedEntry,
+    UnsupportedFeed,
+    parse_date,
+    parse_feed_entries,
+    parse_feed_entries_fast,
+    parse_feed_entries_feedparser,
+    sanitize_html,
+)
+
+CORPUS_DIR = Path(__file__).parent / "fixtures" / "corpus"
+
+
+def read_corpus_file(name: str) -> bytes:
+    """
+    Read feed content from the test corpus.
+    """
+    return (CORPUS_DIR / name).read_bytes()
+
+
+class ParsersTest(SimpleTestCase):
+    def test_parse_feed_entries_fast_same_as_feedparser(self):
+        """
+        Test that the fast parser gives the same entries as `feedparser` for RSS and Atom feeds.
+        """
+        for name in ["rss.xml", "atom.xml"]:
+            content = read_corpus_file(name)
+            fast_entries = parse_feed_entries_fast(content)
+            feedparser_entries = parse_feed_entries_feedparser(content)
+
+            self.assertEqual(len(fast_entries), len(feedparser_entries))
+            for fast_entry, feedparser_entry in zip(fast_entries, feedparser_entries):
+                fast_entry.sanitize()
+                for field in ParsedEntry.__slots__:
+                    if field.startswith("_") or field.endswith("_parsed"):
+                        continue
+                    with self.subTest(name=name, link=fast_entry.link, field=field):
+                        self.assertEqual(
+                            getattr(fast_entry, field), getattr(feedparser_entry, field)
+                        )
+                self.assertEqual(
+                    parse_date(fast_entry.updated),
+                    parse_date(
+                        feedparser_entry.updated, feedparser_entry.updated_parsed
+                    ),
+                )
+
+    def test_parse_feed_entries_fast_unsupported(self):
+        """
+        Test that the fast parser rejects feeds it can't parse exactly as `feedparser` does.
+        """
+        for name in ["rdf.xml", "entities.xml", "xhtml.xml"]:
+            with self.subTest(name=name):
+                with self.assertRaises(UnsupportedFeed):
+                    parse_feed_entries_fast(read_corpus_file(name))
+
+        with self.assertRaises(UnsupportedFeed):
+            parse_feed_entries_fast(
+                b'<?xml version="1.0"?><!DOCTYPE rss [<!ENTITY a "aaa">]>'
+                b'<rss version="2.0"><channel><item><title>&a;</title></item></channel></rss>'
+            )
+
+    def test_parse_feed_entries_fallback(self):
+        """
+        Test that `parse_feed_entries()` falls back to `feedparser`, and rejects content
+        which is not a feed.
+        """
+        for name in ["rdf.xml", "entities.xml", "xhtml.xml"]:
+            with self.subTest(name=name):
+                entries = parse_feed_entries(read_corpus_file(name))
+                self.assertEqual(entries[0].link, "https://example.com/1")
+                self.assertTrue(entries[0].is_sanitized)
+
+        with self.assertRaises(CantParseFeed):
+            parse_feed_entries(b"<html><head><title>Page</title></head></html>")
+
+    def test_parsed_entry_sanitize(self):
+        """
+        Test that HTML of entries parsed by the fast parser is sanitized on demand.
+        """
+        entry = parse_feed_entries(read_corpus_file("rss.xml"))[0]
+        self.assertFalse(entry.is_sanitized)
+        self.assertIn("<script>", entry.summary)
+
+        entry.sanitize()
+
+        self.assertTrue(entry.is_sanitized)
+        self.assertEqual(entry.summary, '<p>Hi <img src="/a.png" /></p>')
+
+    def test_sanitize_html(self):
+        """
+        Test that private sanitizer function of `feedparser` used by `sanitize_html()` still
+        exists, and removes unsafe markup. Fails if `feedparser` update has changed it.
+        """
+        self.assertTrue(callable(getattr(sanitizer, "_sanitize_html", None)))
+        self.assertEqual(
+            sanitize_html('<p onclick="alert(1)">Hi<script>alert(1)</script></p>'),
+            "<p>Hi</p>",
+        )
+
+    def test_parse_date(self):
+        """
+        Test that `parse_date()` parses common formats without `dateutil`, and returns
+        aware datetimes.
+        """
+        utc_date = datetime(2023, 10, 10, 10, 0, tzinfo=timezone.utc)
+        dates = {
+            "Tue, 10 Oct 2023 10:00:00 GMT": utc_date,
+            "Tue, 10 Oct 2023 13:00:00 +0300": utc_date,
+            "10 Oct 2023 10:00 -0000": utc_date,
+            "2023-10-10T10:00:00Z": utc_date,
+            "2023-10-10T12:00:00.123+02:00": utc_date + timedelta(microseconds=123000),
+        }
+        with patch("feeds.parsers.date_parser.parse") as date_parser_parse:
+            for value, expected_date in dates.items():
+                with self.subTest(value=value):
+                    self.assertEqual(parse_date(value), expected_date)
+            self.assertEqual(
+                parse_date(
+                    "garbage", time.strptime("2023-10-10 10:00", "%Y-%m-%d %H:%M")
+                ),
+                utc_date,
+            )
+        date_parser_parse.assert_not_called()
+
+        self.assertEqual(parse_date("October 10, 2023 10:00 UTC"), utc_date)
+        # Moscow time zone from settings
+        self.assertEqual(parse_date("2023-10-10 13:00"), utc_date)
+        self.assertIsNone(parse_date("not a date"))
+        self.assertIsNone(parse_date(None))
@@ -0,0 +1,89 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from feeds.models import Entry, EntryState, Feed, FeedSource, Folder
+from feeds.services import reconcile_entry_counters
+
+from .base_test_case import BaseFeedsViewsTestCase
+
+# Upper bound of the number of queries made to render any of the pages.
+MAX_PAGE_QUERIES = 20
+
+
+class QueryCountsTest(BaseFeedsViewsTestCase):
+    """
+    Test that pages with lists of feeds are rendered with the same number of queries,
+    regardless of number of feeds.
+    """
+
+    def add_feeds(self, count: int) -> None:
+        """
+        Subscribe user to `count` new feeds in new folders, with some entries in each.
+        """
+        for index in range(count):
+            folder = Folder.objects.create(user=self.user, title=f"Folder {index}")
+            # Sources are shared, so their URLs must be unique across calls
+            source = FeedSource.objects.create(
+                url=f"https://example.com/{folder.pk}/rss.xml"
+            )
+            Feed.objects.create(
+                user=self.user,
+                source=source,
+                folder=folder,
+                title=f"Feed {index}",
+                site_url=f"https://example.com/{index}/",
+            )
+            for entry_index in range(3):
+                Entry.objects.create(
+                    source=source,
+                    title=f"Entry {entry_index}",
+                    url=f"https://example.com/{index}/{entry_index}",
+                    pub_date=timezone.now(),
+                )
+        reconcile_entry_counters()
+
+    def get_query_count(self, url: str) -> int:
+        """
+        Render page at `url`, and return number of queries made.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_pages_query_counts(self):
+        """
+        Test that entry list, entry detail and settings pages are rendered with a fixed,
+        small number of queries.
+        """
+        # Login
+        url = reverse("account_login")
+        self.client.post(
+            url, {"login": self.email, "password": self.password}, follow=True
+        )
+
+        # Do the actual test. Start with one folder, as folders' feeds are prefetched
+        self.add_feeds(1)
+        feed = Feed.objects.filter(user=self.user, folder__isnull=True).first()
+        entry = feed.source.entries.first()
+        EntryState.objects.create(feed=feed, entry=entry, is_read=True)
+        urls = [
+            reverse("feeds:feed_list"),
+            reverse("feeds:entry_list", kwargs={"mode": "all"}),
+            reverse("feeds:entry_list", kwargs={"mode": "unread"})
+            + f"?in_feed={feed.pk}",
+            reverse("feeds:entry_detail", kwargs={"mode": "all", "pk": entry.pk}),
+            reverse("feeds:entry_detail", kwargs={"mode": "all", "pk": entry.pk})
+            + f"?in_feed={feed.pk}",
+            reverse("feeds:settings_feeds"),
+        ]
+        query_counts = [self.get_query_count(url) for url in urls]
+
+        self.add_feeds(10)
+
+        for url, query_count in zip(urls, query_counts):
+            with self.subTest(url=url):
+                self.assertEqual(self.get_query_count(url), query_count)
+                self.assertLessEqual(query_count, MAX_PAGE_QUERIES)
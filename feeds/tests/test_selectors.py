@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+
+from feeds.selectors import get_smart_feed_counts, get_today_range
+
+from .base_test_case import BaseFeedsViewsTestCase
+
+
+class SelectorsTest(BaseFeedsViewsTestCase):
+    def test_get_smart_feed_counts(self):
+        """
+        Test that all "Smart Feed" counts are correct, and counted in a single query.
+        """
+        with self.assertNumQueries(1):
+            counts = get_smart_feed_counts(user=self.user)
+
+        self.assertEqual(counts.all, self.MODE_QUERYSETS["all"].count())
+        self.assertEqual(counts.all_unread, self.MODE_QUERYSETS["unread"].count())
+        self.assertEqual(counts.today, self.MODE_QUERYSETS["today"].count())
+        self.assertEqual(
+            counts.today_unread,
+            self.MODE_QUERYSETS["today"]
+            .filter(pk__in=self.MODE_QUERYSETS["unread"])
+            .count(),
+        )
+        self.assertEqual(counts.unread, self.MODE_QUERYSETS["unread"].count())
+        self.assertEqual(counts.read, self.MODE_QUERYSETS["read"].count())
+        self.assertEqual(counts.favorites, self.MODE_QUERYSETS["favorites"].count())
+        self.assertGreater(counts.today, 0)
+
+    def test_get_today_range(self):
+        """
+        Test that "today" starts at midnight in the user's time zone, or in the default
+        time zone if it's not set.
+        """
+        now = datetime(2024, 1, 10, 22, 30, tzinfo=timezone.utc)
+        expected_ranges = {
+            # Europe/Moscow from settings, 01:30 on January 11
+            "": (
+                datetime(2024, 1, 10, 21, 0, tzinfo=timezone.utc),
+                datetime(2024, 1, 11, 21, 0, tzinfo=timezone.utc),
+            ),
+            "America/New_York": (
+                datetime(2024, 1, 10, 5, 0, tzinfo=timezone.utc),
+                datetime(2024, 1, 11, 5, 0, tzinfo=timezone.utc),
+            ),
+        }
+        for time_zone, expected_range in expected_ranges.items():
+            with self.subTest(time_zone=time_zone):
+                self.user.time_zone = time_zone
+                self.assertEqual(get_today_range(self.user, now=now), expected_range)
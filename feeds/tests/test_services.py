@@ -1,26 +1,114 @@
-from datetime import datetime
+import hashlib
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
 
+import requests
 from dateutil import tz
 from django.conf import settings
+from django.db.models import Count
 from django.test import TestCase
+from django.utils import timezone
+from requests.structures import CaseInsensitiveDict
 
-from feeds.models import Entry, Feed, Folder, Tag
+from feeds.exceptions import CantGetFeedFromURL
+from feeds.fetchers import FeedFetchResult
+from feeds.models import Entry, EntryState, Feed, FeedSource, Folder, SiteMetadata, Tag
+from feeds.parsers import parse_feed_entries
 from feeds.services import (
+    UPDATE_ERROR_MESSAGE,
     FeedAlreadyExists,
+    _get_feed_fetch_interval,
+    _get_image_url_from_entry_data,
     _tag_get_or_create,
+    _tags_get_or_create,
+    entries_enqueue_pending_images,
+    entries_enrich_images,
     entry_create,
     entry_exists,
+    feed_change_url,
     feed_create,
+    feed_subscribe,
+    feed_update,
+    folders_update_entry_counters,
+    get_feed_from_url,
+    mark_entry_as_read,
+    mark_feed_as_read,
+    reconcile_entry_counters,
+    site_metadata_get,
+    toggle_entry_is_favorite,
+    update_all_feeds,
+    update_due_feeds,
 )
+from feeds.utils import CantGetPageInfoFromURL, get_url_hash
 from users.models import CustomUser
 
+EMPTY_RSS = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Empty</title><link>https://example.com</link></channel></rss>
+"""
+
+
+RSS_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Blog</title><link>https://example.com</link>
+{items}
+</channel></rss>
+"""
+RSS_ITEM_TEMPLATE = """<item><title>{title}</title><link>{link}</link>
+<pubDate>Tue, 10 Oct 2023 10:00:00 GMT</pubDate>{extra}</item>"""
+PAGE_INFO = {
+    "title": "Page",
+    "description": "",
+    "image_url": "https://example.com/image.png",
+    "favicon_url": None,
+}
+
+
+def build_rss(items: list[tuple[str, str]], extra: str = "") -> bytes:
+    """
+    Build RSS document with `items` given as (title, link) tuples.
+    """
+    return RSS_TEMPLATE.format(
+        items="".join(
+            RSS_ITEM_TEMPLATE.format(title=title, link=link, extra=extra)
+            for title, link in items
+        )
+    ).encode()
+
+
+def build_rss_with_guids(items: list[tuple[str, str, str]]) -> bytes:
+    """
+    Build RSS document with `items` given as (title, link, guid element) tuples.
+    """
+    return RSS_TEMPLATE.format(
+        items="".join(
+            RSS_ITEM_TEMPLATE.format(title=title, link=link, extra=guid)
+            for title, link, guid in items
+        )
+    ).encode()
+
+
+def mock_response(
+    status_code: int = 200, content: bytes = b"", headers: dict | None = None
+) -> MagicMock:
+    """
+    Build fake streamed `requests.Response` with `status_code`, `content` and `headers`.
+    """
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.status_code = status_code
+    response.content = content
+    response.iter_content.side_effect = lambda chunk_size: iter([content])
+    response.headers = CaseInsensitiveDict(headers or {})
+    return response
+
 
 class ServicesTest(TestCase):
     fixtures = [
         "users/tests/fixtures/users.json",
         "feeds/tests/fixtures/tags.json",
+        "feeds/tests/fixtures/feed_sources.json",
         "feeds/tests/fixtures/feeds.json",
         "feeds/tests/fixtures/entries.json",
+        "feeds/tests/fixtures/entry_states.json",
     ]
 
     def test_feed_create(self):
@@ -66,7 +154,9 @@ class ServicesTest(TestCase):
                 site_url=feed.site_url,
             )
 
-        self.assertEqual(Feed.objects.filter(user=feed.user, url=feed.url).count(), 1)
+        self.assertEqual(
+            Feed.objects.filter(user=feed.user, source=feed.source).count(), 1
+        )
 
     def test_tag_get_or_create_creates(self):
         """
@@ -99,7 +189,17 @@ class ServicesTest(TestCase):
         Test that `entry_exists()` return True if entry with `url` actually exists in the `feed`.
         """
         entry = Entry.objects.first()
-        self.assertTrue(entry_exists(feed=entry.feed, url=entry.url))
+        self.assertTrue(entry_exists(source=entry.source, url=entry.url))
+
+    def test_entry_exists_equivalent_url(self):
+        """
+        Test that `entry_exists()` finds entry by equivalent URL, with tracking parameters.
+        """
+        entry = Entry.objects.first()
+        self.assertEqual(entry.url_hash, get_url_hash(entry.url))
+        self.assertTrue(
+            entry_exists(source=entry.source, url=f"{entry.url}?utm_source=rss")
+        )
 
     def test_entry_exists_return_false(self):
         """
@@ -107,7 +207,7 @@ class ServicesTest(TestCase):
         """
         feed = Feed.objects.first()
         self.assertFalse(
-            entry_exists(feed=feed, url="https://aMadeUpBlogUrl.com/blog/post")
+            entry_exists(source=feed.source, url="https://aMadeUpBlogUrl.com/blog/post")
         )
 
     def test_entry_create(self):
@@ -128,7 +228,7 @@ class ServicesTest(TestCase):
         upd_date = datetime.now(tz=app_tz)
 
         entry = entry_create(
-            feed=feed,
+            source=feed.source,
             title=title,
             url=url,
             author=author,
@@ -140,7 +240,7 @@ class ServicesTest(TestCase):
             upd_date=upd_date,
         )
 
-        self.assertEqual(entry.feed, feed)
+        self.assertEqual(entry.source, feed.source)
         self.assertEqual(entry.title, title)
         self.assertEqual(entry.url, url)
         self.assertEqual(entry.author, author)
@@ -168,7 +268,7 @@ class ServicesTest(TestCase):
         upd_date = None
 
         entry = entry_create(
-            feed=feed,
+            source=feed.source,
             title=title,
             url=url,
             author=author,
@@ -180,7 +280,7 @@ class ServicesTest(TestCase):
             upd_date=upd_date,
         )
 
-        self.assertEqual(entry.feed, feed)
+        self.assertEqual(entry.source, feed.source)
         self.assertEqual(entry.title, title)
         self.assertEqual(entry.url, url)
         self.assertEqual(entry.author, author)
@@ -189,3 +289,1027 @@ class ServicesTest(TestCase):
         self.assertEqual(entry.summary, summary)
         self.assertIsNotNone(entry.pub_date)
         self.assertIsNone(entry.upd_date)
+
+    @patch("feeds.services.http_get_stream")
+    def test_get_feed_from_url_sends_validators(self, http_get_stream):
+        """
+        Test that `get_feed_from_url()` makes conditional request when validators are passed,
+        and returns validators from the response.
+        """
+        http_get_stream.return_value = mock_response(
+            content=EMPTY_RSS,
+            headers={"ETag": '"new"', "Last-Modified": "Tue, 10 Oct 2023 10:00:00 GMT"},
+        )
+
+        result = get_feed_from_url(
+            "https://example.com/rss.xml",
+            etag='"old"',
+            last_modified="Mon, 09 Oct 2023 10:00:00 GMT",
+        )
+
+        headers = http_get_stream.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"old"')
+        self.assertEqual(headers["If-Modified-Since"], "Mon, 09 Oct 2023 10:00:00 GMT")
+        self.assertEqual(result.etag, '"new"')
+        self.assertEqual(result.last_modified, "Tue, 10 Oct 2023 10:00:00 GMT")
+        self.assertFalse(result.not_modified)
+
+    @patch("feeds.services.read_response_content", return_value=EMPTY_RSS)
+    @patch("feeds.services.time")
+    @patch("feeds.services.http_get_stream")
+    def test_get_feed_from_url_deadline(
+        self, http_get_stream, time, read_response_content
+    ):
+        """
+        Test that `get_feed_from_url()` starts the download deadline after the response
+        headers have arrived, so waiting for the busy host doesn't count towards it.
+        """
+        time.monotonic.return_value = 100.0
+
+        def get_response(*args, **kwargs):
+            time.monotonic.return_value += settings.HOST_LIMIT_MAX_WAIT
+            return mock_response(content=EMPTY_RSS)
+
+        http_get_stream.side_effect = get_response
+
+        get_feed_from_url("https://example.com/rss.xml")
+
+        self.assertEqual(
+            read_response_content.call_args.args[1],
+            100.0 + settings.HOST_LIMIT_MAX_WAIT + settings.FEED_FETCH_DEADLINE,
+        )
+
+    @patch("feeds.services.parse_feed_entries")
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_not_modified(self, http_get_stream, parse_entries):
+        """
+        Test that `feed_update()` does not parse the feed when server responds with
+        "304 Not Modified".
+        """
+        feed = Feed.objects.first()
+        feed.source.etag = '"abc"'
+        feed.source.save()
+        entry_count = feed.source.entries.count()
+        http_get_stream.return_value = mock_response(status_code=304)
+
+        feed_update(feed)
+
+        parse_entries.assert_not_called()
+        self.assertEqual(feed.source.entries.count(), entry_count)
+        self.assertEqual(FeedSource.objects.get(pk=feed.source_id).etag, '"abc"')
+
+    @patch("feeds.services.parse_feed_entries")
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_throttled(self, http_get_stream, parse_entries):
+        """
+        Test that `feed_update()` does not parse error responses, records the status code
+        and waits for `Retry-After` before the next fetch.
+        """
+        feed = Feed.objects.first()
+        http_get_stream.return_value = mock_response(
+            status_code=429, content=b"Slow down", headers={"Retry-After": "86400"}
+        )
+
+        feed_update(feed)
+
+        parse_entries.assert_not_called()
+        feed.source.refresh_from_db()
+        self.assertEqual(feed.source.last_status_code, 429)
+        self.assertGreater(
+            feed.source.next_fetch_at, timezone.now() + timedelta(seconds=86400 - 60)
+        )
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_failures_backoff(self, http_get_stream):
+        """
+        Test that failed fetches are counted, each failure doubles the interval before
+        the next fetch, the feed becomes dormant after too many failures, and successful
+        fetch resets the counter.
+        """
+        feed = Feed.objects.first()
+        feed.source.entries.update(pub_date=timezone.now())
+        http_get_stream.side_effect = requests.exceptions.ReadTimeout
+
+        for failures in range(1, 4):
+            feed_update(feed)
+            feed.source.refresh_from_db()
+            self.assertEqual(feed.source.consecutive_failures, failures)
+            self.assertEqual(feed.source.last_fetch_error, "Timeout when reading")
+            self.assertAlmostEqual(
+                (feed.source.next_fetch_at - timezone.now()).total_seconds(),
+                settings.FEED_FETCH_MIN_INTERVAL * 2**failures,
+                delta=60,
+            )
+
+        FeedSource.objects.filter(pk=feed.source_id).update(
+            consecutive_failures=settings.FEED_DORMANT_FAILURES - 1
+        )
+        feed.source.refresh_from_db()
+        feed_update(feed)
+        feed.source.refresh_from_db()
+        self.assertTrue(feed.source.is_dormant)
+        self.assertAlmostEqual(
+            (feed.source.next_fetch_at - timezone.now()).total_seconds(),
+            settings.FEED_DORMANT_INTERVAL,
+            delta=60,
+        )
+
+        http_get_stream.side_effect = None
+        http_get_stream.return_value = mock_response(content=EMPTY_RSS)
+        feed_update(feed)
+        feed.source.refresh_from_db()
+        self.assertEqual(feed.source.consecutive_failures, 0)
+        self.assertEqual(feed.source.last_fetch_error, "")
+        self.assertFalse(feed.source.is_dormant)
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_not_a_feed(self, http_get_stream):
+        """
+        Test that error responses, content which is not a feed and too large feeds
+        count as failed fetch.
+        """
+        feed = Feed.objects.first()
+        responses = [
+            (mock_response(status_code=404), "Unexpected status code 404"),
+            (
+                mock_response(content=b"<html><body><p>Hi!</p></body></html>"),
+                "Not a valid feed",
+            ),
+            (
+                mock_response(
+                    content=EMPTY_RSS,
+                    headers={"Content-Length": str(settings.FEED_MAX_SIZE + 1)},
+                ),
+                "Feed is larger than",
+            ),
+        ]
+
+        for response, error in responses:
+            with self.subTest(error=error):
+                FeedSource.objects.update(consecutive_failures=0)
+                feed.source.refresh_from_db()
+                http_get_stream.return_value = response
+
+                feed_update(feed)
+
+                feed.source.refresh_from_db()
+                self.assertEqual(feed.source.consecutive_failures, 1)
+                self.assertTrue(feed.source.last_fetch_error.startswith(error))
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_respects_max_age(self, http_get_stream):
+        """
+        Test that `feed_update()` does not schedule next fetch earlier than the server's
+        `max-age` allows.
+        """
+        feed = Feed.objects.first()
+        feed.source.entries.update(pub_date=timezone.now())
+        http_get_stream.return_value = mock_response(
+            content=EMPTY_RSS, headers={"Cache-Control": "max-age=7200"}
+        )
+
+        feed_update(feed)
+
+        feed.source.refresh_from_db()
+        self.assertEqual(feed.source.last_status_code, 200)
+        self.assertGreater(
+            feed.source.next_fetch_at, timezone.now() + timedelta(seconds=7200 - 60)
+        )
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_saves_validators(self, http_get_stream):
+        """
+        Test that `feed_update()` saves validators from the successful fetch.
+        """
+        feed = Feed.objects.first()
+        http_get_stream.return_value = mock_response(
+            content=EMPTY_RSS,
+            headers={"ETag": '"v1"', "Last-Modified": "Tue, 10 Oct 2023 10:00:00 GMT"},
+        )
+
+        feed_update(feed)
+
+        feed.source.refresh_from_db()
+        self.assertEqual(feed.source.etag, '"v1"')
+        self.assertEqual(feed.source.last_modified, "Tue, 10 Oct 2023 10:00:00 GMT")
+
+    @patch("feeds.services.http_get_stream")
+    def test_update_all_feeds_fetches_each_url_once(self, http_get_stream):
+        """
+        Test that `update_all_feeds()` fetches each feed source only once, even if
+        multiple users are subscribed to it, and skips sources without subscribers.
+        """
+        http_get_stream.return_value = mock_response(
+            content=EMPTY_RSS, headers={"ETag": '"v1"'}
+        )
+        source_count = FeedSource.objects.count()
+        self.assertLess(source_count, Feed.objects.count())
+        unsubscribed_source = FeedSource.objects.create(
+            url="https://example.com/unsubscribed.xml"
+        )
+
+        update_all_feeds()
+
+        self.assertEqual(http_get_stream.call_count, source_count)
+        self.assertFalse(
+            FeedSource.objects.exclude(pk=unsubscribed_source.pk)
+            .exclude(etag='"v1"')
+            .exists()
+        )
+
+    @patch("feeds.services.http_get_stream")
+    def test_update_due_feeds_equivalent_urls(self, http_get_stream):
+        """
+        Test that `update_due_feeds()` fetches equivalent feed URLs only once, and updates
+        all their subscribers.
+        """
+        http_get_stream.return_value = mock_response(content=EMPTY_RSS)
+        due_feed = Feed.objects.first()
+        user = CustomUser.objects.create_user(username="testuser", password="password")
+        scheme, _, rest = due_feed.url.partition("://")
+        equivalent_feed = feed_create(
+            user=user,
+            title=due_feed.title,
+            feed_url=f"{scheme.upper()}://{rest}?utm_source=rss",
+            site_url=due_feed.site_url,
+        )
+        self.assertEqual(equivalent_feed.source, due_feed.source)
+        FeedSource.objects.exclude(pk=due_feed.source_id).update(
+            next_fetch_at=timezone.now() + timedelta(hours=1)
+        )
+
+        self.assertEqual(update_due_feeds(), 1)
+
+        http_get_stream.assert_called_once()
+        due_feed.source.refresh_from_db()
+        self.assertGreater(due_feed.source.next_fetch_at, timezone.now())
+
+    @patch("feeds.services.http_get_stream")
+    @patch("feeds.services._feed_source_update_from_fetch_result")
+    def test_update_all_feeds_continues_after_error(
+        self, update_from_result, http_get_stream
+    ):
+        """
+        Test that an unexpected error while updating one feed is recorded as failed fetch
+        of that feed, and does not stop updating of the other feeds.
+        """
+        http_get_stream.return_value = mock_response(content=EMPTY_RSS)
+        failed_source = FeedSource.objects.first()
+
+        def update_from_fetch_result(source, fetch_result):
+            if source == failed_source:
+                raise ValueError("Unexpected")
+
+        update_from_result.side_effect = update_from_fetch_result
+
+        update_all_feeds()
+
+        self.assertEqual(update_from_result.call_count, FeedSource.objects.count())
+        failed_source.refresh_from_db()
+        self.assertEqual(failed_source.last_fetch_error, UPDATE_ERROR_MESSAGE)
+        self.assertFalse(
+            FeedSource.objects.exclude(pk=failed_source.pk)
+            .filter(last_fetch_error=UPDATE_ERROR_MESSAGE)
+            .exists()
+        )
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_subscribe_reuses_existing_feed_info(self, http_get_stream):
+        """
+        Test that `feed_subscribe()` does not fetch the feed if another user is already
+        subscribed to the same URL.
+        """
+        user = CustomUser.objects.create_user(username="testuser", password="password")
+        existing_feed = Feed.objects.first()
+
+        feed = feed_subscribe(user=user, feed_url=existing_feed.url)
+
+        http_get_stream.assert_not_called()
+        self.assertEqual(feed.user, user)
+        self.assertEqual(feed.source, existing_feed.source)
+        self.assertEqual(feed.title, existing_feed.title)
+        self.assertEqual(feed.site_url, existing_feed.site_url)
+
+    @patch("feeds.services.fetch_feeds_concurrently")
+    def test_update_all_feeds_asyncio_engine(self, fetch_feeds_concurrently):
+        """
+        Test that `update_all_feeds()` with "asyncio" engine fetches all unique feed URLs
+        in one batch, then processes the results.
+        """
+        fetch_feeds_concurrently.side_effect = lambda fetch_requests: {
+            fetch_request.url: FeedFetchResult(200, EMPTY_RSS, '"v2"', None)
+            for fetch_request in fetch_requests
+        }
+
+        update_all_feeds(engine="asyncio")
+
+        fetch_requests = fetch_feeds_concurrently.call_args.args[0]
+        self.assertEqual(
+            sorted(fetch_request.url for fetch_request in fetch_requests),
+            sorted(FeedSource.objects.values_list("url", flat=True)),
+        )
+        self.assertFalse(FeedSource.objects.exclude(etag='"v2"').exists())
+
+    @patch("feeds.services.fetch_feeds_concurrently")
+    def test_update_all_feeds_asyncio_engine_error(self, fetch_feeds_concurrently):
+        """
+        Test that `update_all_feeds()` with "asyncio" engine saves the reason of failed
+        fetch, the same way as "sync" engine does.
+        """
+        fetch_feeds_concurrently.side_effect = lambda fetch_requests: {
+            fetch_request.url: CantGetFeedFromURL("Feed is larger than 1 bytes")
+            for fetch_request in fetch_requests
+        }
+
+        update_all_feeds(engine="asyncio")
+
+        self.assertFalse(
+            FeedSource.objects.exclude(
+                last_fetch_error="Feed is larger than 1 bytes"
+            ).exists()
+        )
+
+    def test_update_all_feeds_incorrect_engine(self):
+        """
+        Test that `update_all_feeds()` raises ValueError on unknown engine.
+        """
+        with self.assertRaises(ValueError):
+            update_all_feeds(engine="unknown")
+
+    @patch("feeds.tasks.enrich_entry_images.delay")
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_creates_only_new_entries(
+        self, http_get_stream, enrich_entry_images
+    ):
+        """
+        Test that `feed_update()` creates entries only for new links, skipping existing ones
+        and duplicates within the feed itself. Images of new entries must be left pending.
+        """
+        feed = Feed.objects.first()
+        existing_entry = Entry.objects.create(
+            source=feed.source,
+            title="Existing",
+            url="https://example.com/existing",
+            pub_date=datetime.now(tz=tz.gettz(settings.TIME_ZONE)),
+        )
+        entry_count = feed.source.entries.count()
+        http_get_stream.return_value = mock_response(
+            content=build_rss(
+                [
+                    ("Existing", existing_entry.url),
+                    ("First", "https://example.com/first"),
+                    ("Second", "https://example.com/second"),
+                    ("Second again", "https://example.com/second"),
+                ],
+                extra="<category>python</category>",
+            )
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            feed_update(feed)
+
+        self.assertEqual(feed.source.entries.count(), entry_count + 2)
+        new_entry = feed.source.entries.get(url="https://example.com/first")
+        self.assertEqual(new_entry.title, "First")
+        self.assertIsNone(new_entry.image_url)
+        enrich_entry_images.assert_called_once()
+        self.assertIn(new_entry.pk, enrich_entry_images.call_args.args[0])
+        self.assertEqual(
+            list(new_entry.tags.values_list("title", flat=True)), ["Python"]
+        )
+        self.assertEqual(
+            feed.source.entries.get(url="https://example.com/second").title, "Second"
+        )
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_no_new_entries_query_count(self, http_get_stream):
+        """
+        Test that `feed_update()` checks all the fetched entries with one query,
+        if there are no new entries.
+        """
+        feed = Feed.objects.filter(source__entries__isnull=False).first()
+        entries = list(feed.source.entries.all()[:10])
+        http_get_stream.return_value = mock_response(
+            content=build_rss([(entry.title, entry.url) for entry in entries])
+        )
+        # Set fingerprints of the entries, then parse the same content again.
+        feed_update(feed)
+        feed.source.content_hash = None
+
+        # Query existing entries, save validators, then read entry dates
+        # and save next fetch time.
+        with self.assertNumQueries(4):
+            feed_update(feed)
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_updates_changed_entries(self, http_get_stream):
+        """
+        Test that `feed_update()` matches entries by GUID, and updates changed entries
+        in place, keeping their publication dates and read marks of the subscribers.
+        """
+        feed = Feed.objects.first()
+        items = [
+            ("First", "https://example.com/first", "<guid>urn:1</guid>"),
+            ("Second", "https://example.com/second", "<guid>urn:2</guid>"),
+            ("Third", "https://example.com/third", ""),
+        ]
+        http_get_stream.return_value = mock_response(
+            content=build_rss_with_guids(items)
+        )
+        feed_update(feed)
+        entry_count = feed.source.entries.count()
+        mark_entry_as_read(feed.user, feed.source.entries.get(guid="urn:1").pk)
+        pub_date = feed.source.entries.get(guid="urn:1").pub_date
+
+        items[0] = ("First, edited", "https://example.com/first", "<guid>urn:1</guid>")
+        items[1] = ("Second", "https://example.com/second-moved", "<guid>urn:2</guid>")
+        http_get_stream.return_value = mock_response(
+            content=build_rss_with_guids(items)
+        )
+        feed_update(feed)
+
+        self.assertEqual(feed.source.entries.count(), entry_count)
+        first_entry = feed.source.entries.get(guid="urn:1")
+        self.assertEqual(first_entry.title, "First, edited")
+        self.assertEqual(first_entry.pub_date, pub_date)
+        self.assertTrue(first_entry.states.get(feed=feed).is_read)
+        self.assertEqual(
+            feed.source.entries.get(guid="urn:2").url,
+            "https://example.com/second-moved",
+        )
+        self.assertEqual(
+            feed.source.entries.get(url="https://example.com/third").guid,
+            "https://example.com/third",
+        )
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_sets_guids_of_existing_entries(self, http_get_stream):
+        """
+        Test that `feed_update()` matches entries saved without GUID by URL,
+        and sets their GUIDs instead of creating duplicates.
+        """
+        feed = Feed.objects.first()
+        entry = Entry.objects.create(
+            source=feed.source,
+            title="Existing",
+            url="https://example.com/existing",
+            pub_date=timezone.now(),
+        )
+        entry_count = feed.source.entries.count()
+        http_get_stream.return_value = mock_response(
+            content=build_rss_with_guids(
+                [("Existing", entry.url, '<guid isPermaLink="false">urn:1</guid>')]
+            )
+        )
+
+        feed_update(feed)
+
+        self.assertEqual(feed.source.entries.count(), entry_count)
+        entry.refresh_from_db()
+        self.assertEqual(entry.guid, "urn:1")
+        self.assertEqual(len(entry.fingerprint), 64)
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_unchanged_content(self, http_get_stream):
+        """
+        Test that `feed_update()` does not parse the feed again, if the content
+        has not changed since the last fetch.
+        """
+        feed = Feed.objects.first()
+        content = build_rss([("Post", "https://example.com/post")])
+        http_get_stream.return_value = mock_response(content=content)
+        feed_update(feed)
+        self.assertEqual(
+            FeedSource.objects.get(pk=feed.source_id).content_hash,
+            hashlib.sha256(content).hexdigest(),
+        )
+
+        with patch("feeds.services.parse_feed_entries") as parse_entries:
+            # Read entry dates and save next fetch time.
+            with self.assertNumQueries(2):
+                feed_update(feed)
+
+        parse_entries.assert_not_called()
+
+    def test_get_feed_fetch_interval(self):
+        """
+        Test that `_get_feed_fetch_interval()` follows publishing cadence of the feed,
+        within the min/max bounds.
+        """
+        feed = Feed.objects.first()
+        feed.source.entries.all().delete()
+        min_interval = timedelta(seconds=settings.FEED_FETCH_MIN_INTERVAL)
+        max_interval = timedelta(seconds=settings.FEED_FETCH_MAX_INTERVAL)
+
+        self.assertEqual(_get_feed_fetch_interval(feed.source), max_interval)
+
+        # Hourly posts: fetch every 30 minutes
+        now = timezone.now()
+        Entry.objects.bulk_create(
+            Entry(
+                source=feed.source,
+                title="Post",
+                url=f"https://example.com/{hours}",
+                pub_date=now - timedelta(hours=hours),
+            )
+            for hours in range(1, 11)
+        )
+        self.assertAlmostEqual(
+            _get_feed_fetch_interval(feed.source).total_seconds(),
+            timedelta(minutes=30).total_seconds(),
+            delta=1,
+        )
+
+        # Busy feed is limited by min interval, dormant feed by max interval
+        feed.source.entries.update(pub_date=now)
+        self.assertEqual(_get_feed_fetch_interval(feed.source), min_interval)
+        feed.source.entries.update(pub_date=now - timedelta(days=90))
+        self.assertEqual(_get_feed_fetch_interval(feed.source), max_interval)
+
+    @patch("feeds.services.http_get_stream")
+    def test_update_due_feeds(self, http_get_stream):
+        """
+        Test that `update_due_feeds()` fetches only due feed sources, and schedules
+        their next fetch.
+        """
+        http_get_stream.return_value = mock_response(content=EMPTY_RSS)
+        due_source = FeedSource.objects.first()
+        FeedSource.objects.update(next_fetch_at=timezone.now() + timedelta(hours=1))
+        FeedSource.objects.filter(pk=due_source.pk).update(next_fetch_at=None)
+
+        self.assertEqual(update_due_feeds(), 1)
+
+        http_get_stream.assert_called_once()
+        self.assertEqual(http_get_stream.call_args.args[0], due_source.url)
+        due_source.refresh_from_db()
+        self.assertGreater(due_source.next_fetch_at, timezone.now())
+
+        http_get_stream.reset_mock()
+        self.assertEqual(update_due_feeds(), 0)
+        http_get_stream.assert_not_called()
+
+    @patch("feeds.services.http_get_stream")
+    def test_update_due_feeds_claims_feeds(self, http_get_stream):
+        """
+        Test that `update_due_feeds()` postpones the next fetch of due feeds before fetching,
+        so overlapping run doesn't fetch them again.
+        """
+        due_source = FeedSource.objects.first()
+        FeedSource.objects.update(next_fetch_at=timezone.now() + timedelta(hours=1))
+        FeedSource.objects.filter(pk=due_source.pk).update(next_fetch_at=None)
+
+        def get_response(*args, **kwargs):
+            # Another run of the scheduler while the feed is being fetched
+            self.assertEqual(update_due_feeds(), 0)
+            return mock_response(content=EMPTY_RSS)
+
+        http_get_stream.side_effect = get_response
+
+        self.assertEqual(update_due_feeds(), 1)
+        http_get_stream.assert_called_once()
+
+    def test_tags_get_or_create(self):
+        """
+        Test that `_tags_get_or_create()` returns existing tags and creates missing ones
+        with constant number of queries.
+        """
+        existing_tags = list(Tag.objects.all()[:3])
+        titles = {tag.title for tag in existing_tags} | {"New tag", "Another new tag"}
+
+        # Select existing, insert missing, select inserted.
+        with self.assertNumQueries(3):
+            tags_by_title = _tags_get_or_create(titles)
+
+        self.assertEqual(tags_by_title.keys(), titles)
+        for tag in existing_tags:
+            self.assertEqual(tags_by_title[tag.title].pk, tag.pk)
+        self.assertEqual(Tag.objects.filter(title__in=titles).count(), len(titles))
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_too_long_tag_title(self, http_get_stream):
+        """
+        Test that `feed_update()` cuts too long tag titles instead of failing to insert them.
+        """
+        feed = Feed.objects.first()
+        http_get_stream.return_value = mock_response(
+            content=build_rss(
+                [("Tagged", "https://example.com/tagged")],
+                extra=f"<category>{'t' * 300}</category><category>python</category>",
+            )
+        )
+
+        feed_update(feed)
+
+        entry = feed.source.entries.get(url="https://example.com/tagged")
+        tag_titles = sorted(entry.tags.values_list("title", flat=True))
+        max_length = Tag._meta.get_field("title").max_length
+        self.assertEqual(tag_titles, ["Python", "T" + "t" * (max_length - 2) + "…"])
+
+    @patch("feeds.services.parse_page_info_from_url")
+    def test_entries_enrich_images(self, parse_page_info_from_url):
+        """
+        Test that `entries_enrich_images()` requests each unique page once and sets `image_url`
+        of pending entries, or empty string if there's no image.
+        """
+        parse_page_info_from_url.side_effect = lambda url, with_favicon: {
+            **PAGE_INFO,
+            "image_url": PAGE_INFO["image_url"] if "with-image" in url else "",
+        }
+        feeds = Feed.objects.all()[:2]
+        now = datetime.now(tz=tz.gettz(settings.TIME_ZONE))
+        entries = [
+            Entry.objects.create(
+                source=feed.source, title="Post", url=url, pub_date=now, image_url=None
+            )
+            for feed in feeds
+            for url in [
+                "https://example.com/with-image",
+                "https://example.com/no-image",
+            ]
+        ]
+
+        enriched_entry_count = entries_enrich_images([entry.pk for entry in entries])
+
+        self.assertEqual(enriched_entry_count, 2)
+        self.assertEqual(parse_page_info_from_url.call_count, 2)
+        for entry in entries:
+            entry.refresh_from_db()
+            self.assertEqual(
+                entry.image_url,
+                PAGE_INFO["image_url"] if "with-image" in entry.url else "",
+            )
+
+    @patch("feeds.services.parse_page_info_from_url")
+    def test_site_metadata_get(self, parse_page_info_from_url):
+        """
+        Test that `site_metadata_get()` requests the page once per host, and serves
+        other pages of the same host from the cache.
+        """
+        parse_page_info_from_url.return_value = {
+            **PAGE_INFO,
+            "favicon_url": "https://example.com/favicon.ico",
+        }
+
+        site_metadata = site_metadata_get("https://Example.com/blog/")
+        cached_site_metadata = site_metadata_get("https://example.com/news/")
+
+        parse_page_info_from_url.assert_called_once_with(
+            url="https://Example.com/blog/"
+        )
+        self.assertEqual(site_metadata.host, "example.com")
+        self.assertEqual(site_metadata.favicon_url, "https://example.com/favicon.ico")
+        self.assertEqual(site_metadata.image_url, PAGE_INFO["image_url"])
+        self.assertEqual(cached_site_metadata.pk, site_metadata.pk)
+
+    @patch("feeds.services.parse_page_info_from_url")
+    def test_site_metadata_get_stale(self, parse_page_info_from_url):
+        """
+        Test that `site_metadata_get()` refreshes stale metadata, and falls back to stale
+        metadata if the page can't be requested.
+        """
+        SiteMetadata.objects.create(
+            host="example.com",
+            title="Old",
+            fetched=timezone.now() - timedelta(seconds=settings.SITE_METADATA_TTL + 1),
+        )
+        parse_page_info_from_url.side_effect = CantGetPageInfoFromURL
+
+        self.assertEqual(site_metadata_get("https://example.com/").title, "Old")
+
+        parse_page_info_from_url.side_effect = None
+        parse_page_info_from_url.return_value = PAGE_INFO
+
+        self.assertEqual(site_metadata_get("https://example.com/").title, "Page")
+        self.assertEqual(SiteMetadata.objects.count(), 1)
+
+    def test_get_image_url_from_entry_data(self):
+        """
+        Test that `_get_image_url_from_entry_data()` finds images in media elements, enclosures
+        and HTML of the entry, making relative URLs absolute.
+        """
+        entries = parse_feed_entries(b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel>
+<item><title>Thumbnail</title><link>https://example.com/1</link>
+<media:thumbnail url="https://example.com/thumb.jpg"/></item>
+<item><title>Enclosure</title><link>https://example.com/2</link>
+<enclosure url="https://example.com/cover.png" type="image/png" length="1"/></item>
+<item><title>Audio</title><link>https://example.com/3</link>
+<enclosure url="https://example.com/podcast.mp3" type="audio/mpeg" length="1"/></item>
+<item><title>HTML</title><link>https://example.com/blog/4</link>
+<description>&lt;p&gt;Text &lt;img alt="" src="/images/4.jpg"&gt;&lt;/p&gt;</description></item>
+</channel></rss>""")
+        image_urls = [
+            _get_image_url_from_entry_data(entry_data) for entry_data in entries
+        ]
+        self.assertEqual(
+            image_urls,
+            [
+                "https://example.com/thumb.jpg",
+                "https://example.com/cover.png",
+                None,
+                "https://example.com/images/4.jpg",
+            ],
+        )
+
+    @patch("feeds.tasks.enrich_entry_images.delay")
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_uses_images_from_feed(
+        self, http_get_stream, enrich_entry_images
+    ):
+        """
+        Test that `feed_update()` sets images found in the feed data, and does not
+        schedule image enrichment for such entries.
+        """
+        feed = Feed.objects.first()
+        http_get_stream.return_value = mock_response(
+            content=build_rss(
+                [("With image", "https://example.com/with-image")],
+                extra='<enclosure url="https://example.com/a.jpg" type="image/jpeg"/>',
+            )
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            feed_update(feed)
+
+        entry = feed.source.entries.get(url="https://example.com/with-image")
+        self.assertEqual(entry.image_url, "https://example.com/a.jpg")
+        enrich_entry_images.assert_not_called()
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_too_long_values(self, http_get_stream):
+        """
+        Test that `feed_update()` cuts too long titles, hashes too long GUIDs, skips
+        too long image URLs, and skips entries with too long links.
+        """
+        feed = Feed.objects.first()
+        long_guid = "https://example.com/" + "g" * 2000
+        long_image_url = "https://example.com/" + "i" * 2000 + ".jpg"
+        http_get_stream.return_value = mock_response(
+            content=build_rss_with_guids(
+                [
+                    (
+                        "T" * 600,
+                        "https://example.com/long",
+                        f"<guid>{long_guid}</guid>"
+                        f'<enclosure url="{long_image_url}" type="image/jpeg"/>',
+                    ),
+                    ("Long link", "https://example.com/" + "l" * 2000, ""),
+                ]
+            )
+        )
+
+        with self.captureOnCommitCallbacks(execute=False):
+            feed_update(feed)
+
+        entry = feed.source.entries.get(url="https://example.com/long")
+        self.assertEqual(len(entry.title), Entry._meta.get_field("title").max_length)
+        self.assertTrue(entry.title.endswith("…"))
+        self.assertEqual(entry.guid, hashlib.sha256(long_guid.encode()).hexdigest())
+        self.assertIsNone(entry.image_url)
+        self.assertFalse(feed.source.entries.filter(title="Long link").exists())
+
+    @patch("feeds.tasks.enrich_entry_images.delay")
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_broker_unavailable(self, http_get_stream, enrich_entry_images):
+        """
+        Test that `feed_update()` saves new entries and validators, even if image enrichment
+        can't be enqueued.
+        """
+        feed = Feed.objects.first()
+        enrich_entry_images.side_effect = ConnectionRefusedError
+        http_get_stream.return_value = mock_response(
+            content=build_rss([("New", "https://example.com/new")]),
+            headers={"ETag": '"v1"'},
+        )
+
+        with self.assertLogs("feeds.services", level="ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                feed_update(feed)
+
+        enrich_entry_images.assert_called_once()
+        feed.source.refresh_from_db()
+        self.assertEqual(feed.source.etag, '"v1"')
+        self.assertIsNone(
+            feed.source.entries.get(url="https://example.com/new").image_url
+        )
+
+    @patch("feeds.tasks.enrich_entry_images.delay")
+    def test_entries_enqueue_pending_images(self, enrich_entry_images):
+        """
+        Test that `entries_enqueue_pending_images()` schedules image enrichment of recent
+        entries with pending images only, skipping too new and too old ones.
+        """
+        feed = Feed.objects.first()
+        now = timezone.now()
+        entries = [
+            Entry.objects.create(
+                source=feed.source,
+                title=f"Pending {index}",
+                url=f"https://example.com/pending-{index}",
+                pub_date=now,
+            )
+            for index in range(3)
+        ]
+        Entry.objects.filter(image_url__isnull=True).exclude(
+            pk__in=[entry.pk for entry in entries]
+        ).update(image_url="")
+        Entry.objects.filter(pk=entries[0].pk).update(created=now - timedelta(hours=2))
+        Entry.objects.filter(pk=entries[2].pk).update(created=now - timedelta(days=2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(entries_enqueue_pending_images(), 1)
+
+        enrich_entry_images.assert_called_once_with([entries[0].pk])
+
+    @patch("feeds.services.http_get_stream")
+    def test_entry_counters(self, http_get_stream):
+        """
+        Test that entry counters of the feed and its folder are updated when entries
+        are created and marked as read, and when the feed is deleted.
+        """
+        reconcile_entry_counters()
+        feed = Feed.objects.filter(source__entries__isnull=False).first()
+        folder = Folder.objects.create(user=feed.user, title="Folder")
+        feed.folder = folder
+        feed.save()
+        folders_update_entry_counters([folder.pk])
+        total_count = feed.source.entries.count()
+        unread_count = total_count - feed.entry_states.filter(is_read=True).count()
+        http_get_stream.return_value = mock_response(
+            content=build_rss(
+                [
+                    ("First", "https://example.com/first"),
+                    ("Second", "https://example.com/second"),
+                ]
+            )
+        )
+
+        feed_update(feed)
+        first_entry = feed.source.entries.get(url="https://example.com/first")
+        mark_entry_as_read(feed.user, first_entry.pk)
+        # Entries which are already read don't change counters
+        mark_entry_as_read(feed.user, first_entry.pk)
+
+        for instance in [feed, folder]:
+            instance.refresh_from_db()
+            self.assertEqual(instance.total_entry_count, total_count + 2)
+            self.assertEqual(instance.unread_entry_count, unread_count + 1)
+        self.assertEqual(
+            feed.latest_entry_pub_date, feed.source.entries.latest("pub_date").pub_date
+        )
+
+        mark_feed_as_read(feed.pk)
+        folder.refresh_from_db()
+        self.assertEqual(folder.unread_entry_count, 0)
+
+        feed.delete()
+        folder.refresh_from_db()
+        self.assertEqual(folder.total_entry_count, 0)
+        self.assertEqual(reconcile_entry_counters(), 0)
+
+    def test_entry_counters_drifted(self):
+        """
+        Test that marking entries as read doesn't fail when the counters have drifted
+        below the actual number of unread entries, and counters don't go below zero.
+        """
+        feed = Feed.objects.filter(source__entries__isnull=False).first()
+        folder = Folder.objects.create(user=feed.user, title="Folder")
+        feed.folder = folder
+        feed.save()
+        Feed.objects.filter(pk=feed.pk).update(unread_entry_count=0)
+
+        unread_entry = feed.source.entries.exclude(
+            pk__in=feed.entry_states.filter(is_read=True).values("entry")
+        ).first()
+        mark_entry_as_read(feed.user, unread_entry.pk)
+        mark_feed_as_read(feed.pk)
+
+        for instance in [feed, folder]:
+            instance.refresh_from_db()
+            self.assertEqual(instance.unread_entry_count, 0)
+
+    def test_reconcile_entry_counters(self):
+        """
+        Test that `reconcile_entry_counters()` repairs counters which differ from the actual
+        number of entries.
+        """
+        reconcile_entry_counters()
+        feed = Feed.objects.filter(source__entries__isnull=False).first()
+        folder = Folder.objects.create(user=feed.user, title="Folder")
+        Feed.objects.filter(pk=feed.pk).update(
+            folder=folder, total_entry_count=1000, unread_entry_count=1000
+        )
+
+        self.assertEqual(reconcile_entry_counters(), 1)
+
+        feed.refresh_from_db()
+        folder.refresh_from_db()
+        self.assertEqual(feed.total_entry_count, feed.source.entries.count())
+        self.assertEqual(
+            feed.unread_entry_count,
+            feed.source.entries.count()
+            - feed.entry_states.filter(is_read=True).count(),
+        )
+        self.assertEqual(
+            feed.latest_entry_pub_date, feed.source.entries.latest("pub_date").pub_date
+        )
+        self.assertEqual(folder.total_entry_count, feed.total_entry_count)
+        self.assertEqual(folder.unread_entry_count, feed.unread_entry_count)
+        self.assertEqual(reconcile_entry_counters(), 0)
+
+    @patch("feeds.services.http_get_stream")
+    def test_feed_update_shared_source(self, http_get_stream):
+        """
+        Test that entries of the feed source are stored once for all its subscribers,
+        and each subscriber has its own read and favorite marks and counters.
+        """
+        reconcile_entry_counters()
+        source = (
+            FeedSource.objects.annotate(feed_count=Count("feeds"))
+            .filter(feed_count=2)
+            .first()
+        )
+        feed, other_feed = source.feeds.all()
+        self.assertNotEqual(feed.user, other_feed.user)
+        entry_count = Entry.objects.count()
+        http_get_stream.return_value = mock_response(
+            content=build_rss([("New", "https://example.com/new")])
+        )
+
+        feed_update(feed)
+
+        http_get_stream.assert_called_once()
+        self.assertEqual(Entry.objects.count(), entry_count + 1)
+        new_entry = feed.source.entries.get(url="https://example.com/new")
+        other_feed_unread_count = other_feed.unread_entry_count
+        other_feed.refresh_from_db()
+        self.assertEqual(other_feed.unread_entry_count, other_feed_unread_count + 1)
+
+        mark_entry_as_read(feed.user, new_entry.pk)
+        toggle_entry_is_favorite(feed.user, new_entry.pk)
+
+        state = EntryState.objects.get(entry=new_entry)
+        self.assertEqual(state.feed, feed)
+        self.assertTrue(state.is_read)
+        self.assertTrue(state.is_favorite)
+        other_feed.refresh_from_db()
+        self.assertEqual(other_feed.unread_entry_count, other_feed_unread_count + 1)
+
+        toggle_entry_is_favorite(feed.user, new_entry.pk)
+        state.refresh_from_db()
+        self.assertFalse(state.is_favorite)
+
+    def test_feed_create_existing_source(self):
+        """
+        Test that `feed_create()` subscribes new user to the existing feed source,
+        and its entries are unread for the user.
+        """
+        reconcile_entry_counters()
+        user = CustomUser.objects.create_user(username="testuser", password="password")
+        folder = Folder.objects.create(user=user, title="Test Folder")
+        existing_feed = Feed.objects.filter(source__entries__isnull=False).first()
+
+        feed = feed_create(
+            user=user,
+            title=existing_feed.title,
+            feed_url=existing_feed.url,
+            site_url=existing_feed.site_url,
+            folder=folder,
+        )
+
+        entry_count = existing_feed.source.entries.count()
+        self.assertEqual(feed.source, existing_feed.source)
+        self.assertEqual(feed.total_entry_count, entry_count)
+        self.assertEqual(feed.unread_entry_count, entry_count)
+        folder.refresh_from_db()
+        self.assertEqual(folder.unread_entry_count, entry_count)
+        self.assertEqual(reconcile_entry_counters(), 0)
+
+    def test_feed_change_url(self):
+        """
+        Test that `feed_change_url()` moves the feed to the source with the new URL,
+        dropping marks of the entries of the previous source.
+        """
+        reconcile_entry_counters()
+        feed = Feed.objects.filter(entry_states__isnull=False).first()
+        new_source = FeedSource.objects.exclude(feeds__user=feed.user).first()
+
+        feed_change_url(feed, new_source.url)
+
+        self.assertEqual(feed.source, new_source)
+        self.assertFalse(feed.entry_states.exists())
+        self.assertEqual(feed.total_entry_count, new_source.entries.count())
+        self.assertEqual(feed.unread_entry_count, new_source.entries.count())
+        self.assertEqual(reconcile_entry_counters(), 0)
+
+    def test_toggle_entry_is_favorite_not_subscribed(self):
+        """
+        Test that entries of the feeds user is not subscribed to can't be marked.
+        """
+        user = CustomUser.objects.create_user(username="testuser", password="password")
+        entry = Entry.objects.first()
+
+        toggle_entry_is_favorite(user, entry.pk)
+        mark_entry_as_read(user, entry.pk)
+
+        self.assertFalse(EntryState.objects.filter(feed__user=user).exists())
@@ -0,0 +1,147 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.test import SimpleTestCase
+
+from feeds.utils import (
+    check_url_status_code,
+    get_url_hash,
+    normalize_url,
+    parse_page_info_from_url,
+)
+
+PAGE_HEAD = """<!DOCTYPE html>
+<html><head><meta charset="utf-8">
+<title>Hazadus &amp; Co</title>
+<meta property="og:description" content="Blog">
+<meta property="og:image" content="/images/cover.png">
+<link rel="stylesheet" href="/style.css">
+<link rel="icon" href="/favicon-32.png" sizes="32x32">
+<link rel="apple-touch-icon" href="https://hazadus.ru/favicon-192.png" sizes="192x192">
+</head>"""
+
+
+def mock_streamed_response(chunks: list[bytes]) -> MagicMock:
+    """
+    Build mock of streamed `requests.Response` returning `chunks` of the body.
+    """
+    response = MagicMock(headers={"Content-Type": "text/html"})
+    response.__enter__.return_value = response
+    response.iter_content.return_value = iter(chunks)
+    return response
+
+
+class UtilsTest(SimpleTestCase):
+    @patch("feeds.utils.http_get")
+    @patch("feeds.utils.http_head")
+    def test_check_url_status_code(self, http_head, http_get):
+        """
+        Ensure that `check_url_status_code()` uses HEAD request, and GET request only when
+        the server does not support HEAD.
+        """
+        http_head.return_value = MagicMock(status_code=200)
+        self.assertTrue(check_url_status_code("https://example.com/favicon.ico"))
+        http_get.assert_not_called()
+
+        http_head.return_value = MagicMock(status_code=405)
+        http_get.return_value = MagicMock(status_code=404)
+        self.assertFalse(check_url_status_code("https://example.com/favicon.ico"))
+        http_get.assert_called_once()
+
+        http_head.side_effect = requests.exceptions.ConnectionError
+        self.assertFalse(check_url_status_code("https://example.com/favicon.ico"))
+
+    @patch("feeds.utils.check_url_status_code", return_value=True)
+    @patch("feeds.utils.http_get_stream")
+    def test_parse_page_info_from_url(self, http_get_stream, check_url_status_code):
+        """
+        Ensure that `parse_page_info_from_url()` parses meta info and the best favicon from
+        the head of the page, and does not read the page body.
+        """
+        chunks = [PAGE_HEAD[:100].encode(), PAGE_HEAD[100:].encode(), b"<body>"]
+        response = mock_streamed_response(chunks)
+        http_get_stream.return_value = response
+
+        page_info = parse_page_info_from_url("https://hazadus.ru/blog/")
+
+        self.assertEqual(
+            page_info,
+            {
+                "title": "Hazadus & Co",
+                "description": "Blog",
+                "image_url": "https://hazadus.ru/images/cover.png",
+                "favicon_url": "https://hazadus.ru/favicon-192.png",
+            },
+        )
+        http_get_stream.assert_called_once_with("https://hazadus.ru/blog/")
+        # Body chunk was never read
+        self.assertEqual(list(response.iter_content.return_value), [b"<body>"])
+
+    @patch("feeds.utils.http_get_stream")
+    def test_parse_page_info_from_url_without_head(self, http_get_stream):
+        """
+        Ensure that `parse_page_info_from_url()` returns default values for the page
+        without head.
+        """
+        http_get_stream.return_value = mock_streamed_response([b"<p>Hello</p>"])
+
+        self.assertEqual(
+            parse_page_info_from_url("https://hazadus.ru/"),
+            {
+                "title": "Unknown Title",
+                "description": "",
+                "image_url": "",
+                "favicon_url": None,
+            },
+        )
+
+    @patch("feeds.utils.http_get_stream")
+    def test_parse_page_info_from_url_meta_charset(self, http_get_stream):
+        """
+        Ensure that `parse_page_info_from_url()` decodes the page using encoding declared
+        in `<meta>` tag, when there's no charset in `Content-Type` header.
+        """
+        heads = [
+            '<html><head><meta charset="windows-1251"><title>Новости</title></head>',
+            '<html><head><meta http-equiv="Content-Type" content="text/html; '
+            'charset=windows-1251"><title>Новости</title></head>',
+        ]
+        for head in heads:
+            with self.subTest(head=head):
+                content = head.encode("windows-1251")
+                http_get_stream.return_value = mock_streamed_response(
+                    [content[:30], content[30:]]
+                )
+
+                page_info = parse_page_info_from_url(
+                    "https://hazadus.ru/", with_favicon=False
+                )
+
+                self.assertEqual(page_info["title"], "Новости")
+
+    def test_normalize_url(self):
+        """
+        Test that `normalize_url()` makes equivalent URLs equal, removing tracking parameters.
+        """
+        self.assertEqual(
+            normalize_url(
+                " HTTPS://Hazadus.ru:443/posts/1?utm_source=rss&page=2&fbclid=abc#top "
+            ),
+            "https://hazadus.ru/posts/1?page=2#top",
+        )
+        self.assertEqual(normalize_url("http://hazadus.ru"), "http://hazadus.ru/")
+        self.assertEqual(
+            normalize_url("http://hazadus.ru:8080/?a=1&b="),
+            "http://hazadus.ru:8080/?a=1&b=",
+        )
+
+    def test_get_url_hash(self):
+        """
+        Test that `get_url_hash()` gives equal signed 64-bit hashes for equivalent URLs.
+        """
+        url_hash = get_url_hash("https://hazadus.ru/posts/1")
+        self.assertEqual(
+            url_hash, get_url_hash("https://hazadus.ru/posts/1?utm_medium=rss")
+        )
+        self.assertNotEqual(url_hash, get_url_hash("https://hazadus.ru/posts/2"))
+        self.assertTrue(-(2**63) <= url_hash < 2**63)
@@ -1,6 +1,5 @@
 from django.urls import reverse
 
-from feeds.models import Entry
 from feeds.tests.base_test_case import BaseFeedsViewsTestCase
 
 
@@ -20,12 +19,16 @@ class MiscViewTest(BaseFeedsViewsTestCase):
         )
 
         # Do the actual test
-        entry = Entry.objects.filter(is_favorite=False).first()
+        entry = (
+            self.MODE_QUERYSETS["all"]
+            .exclude(pk__in=self.MODE_QUERYSETS["favorites"])
+            .first()
+        )
         entry_pk = entry.pk
         url = reverse("feeds:entry_toggle_is_favorite", kwargs={"entry_pk": entry_pk})
         response = self.client.post(url)
         self.assertEqual(response.status_code, 302)
-        self.assertEqual(Entry.objects.get(pk=entry_pk).is_favorite, True)
+        self.assertTrue(self.MODE_QUERYSETS["favorites"].filter(pk=entry_pk).exists())
 
     def test_feed_mark_as_read_view(self):
         """
@@ -42,4 +45,7 @@ class MiscViewTest(BaseFeedsViewsTestCase):
             with self.subTest(feed=feed):
                 url = reverse("feeds:feed_mark_as_read", kwargs={"feed_pk": feed.pk})
                 self.client.post(url)
-                self.assertEqual(feed.entries.filter(is_read=False).count(), 0)
+                self.assertEqual(
+                    feed.entry_states.filter(is_read=True).count(),
+                    feed.source.entries.count(),
+                )
@@ -1,14 +1,28 @@
+import codecs
+import hashlib
+import itertools
 import logging
 import re
-from urllib.parse import urlparse
+from collections.abc import Iterator
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 import requests
-from bs4 import BeautifulSoup
-from bs4.element import Tag
-from urllib3.exceptions import ReadTimeoutError
+
+from feeds.http_client import http_get, http_get_stream, http_head
 
 logger = logging.getLogger(__name__)
 
+# Stop reading the page after this many bytes, even if `</head>` was not found.
+PAGE_HEAD_MAX_BYTES = 256 * 1024
+PAGE_HEAD_CHUNK_SIZE = 16 * 1024
+# Encoding declared in `<meta charset="...">` or `<meta http-equiv="Content-Type" ...>` tag.
+META_CHARSET_RE = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)[\s"';/>]""", re.IGNORECASE
+)
+# Encoding declared in `<meta>` tag is looked up in this many first bytes of the page.
+CHARSET_SNIFF_BYTES = 1024
+
 
 class CantGetPageInfoFromURL(Exception):
     """Some error has occured while trying to get page meta info and favicon."""
@@ -16,21 +30,76 @@ class CantGetPageInfoFromURL(Exception):
     pass
 
 
+# Query parameters added to URLs for analytics only, removed by `normalize_url()`.
+TRACKING_QUERY_PARAMS = ["fbclid", "gclid", "yclid", "mc_cid", "mc_eid", "_openstat"]
+TRACKING_QUERY_PARAM_PREFIX = "utm_"
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalize `url`, so equivalent URLs are equal: lower case scheme and host, remove
+    default port and tracking query parameters (`utm_*`, `fbclid` etc.).
+
+    :param str url: URL to normalize.
+    :return: normalized URL.
+    """
+    parsed_url = urlparse(url.strip())
+    scheme = parsed_url.scheme.lower()
+    netloc = parsed_url.netloc.lower()
+    if netloc.endswith(f":{DEFAULT_PORTS.get(scheme)}"):
+        netloc = netloc.rsplit(":", 1)[0]
+
+    query = urlencode(
+        [
+            (name, value)
+            for name, value in parse_qsl(parsed_url.query, keep_blank_values=True)
+            if name not in TRACKING_QUERY_PARAMS
+            and not name.startswith(TRACKING_QUERY_PARAM_PREFIX)
+        ]
+    )
+    return urlunparse(
+        parsed_url._replace(
+            scheme=scheme, netloc=netloc, path=parsed_url.path or "/", query=query
+        )
+    )
+
+
+def get_url_hash(url: str) -> int:
+    """
+    Get 8-byte hash of the normalized `url`, as signed integer to fit into `BigIntegerField`.
+    Hashes are stored along with URLs, so lookups by URL use compact fixed-width index.
+
+    :param str url: URL to get hash for.
+    :return: hash of the URL.
+    """
+    digest = hashlib.blake2b(normalize_url(url).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+# Servers respond with these codes when they don't support HEAD requests.
+HEAD_NOT_ALLOWED_STATUS_CODES = [405, 501]
+
+
 def check_url_status_code(
     url: str, status_code: int = 200, timeout: float = 5.0
 ) -> bool:
     """
-    Try to GET page from `url` and check the status code.
+    Make HEAD request to `url` and check the status code. Fall back to GET request if the
+    server does not support HEAD.
 
     :param str url: URL to check status code for
     :param int status_code: expected HTTP status code
-    :param int timeout: timeout to use in `request.get()` call, in seconds
+    :param int timeout: timeout to use in HTTP requests, in seconds
     :return: True if resulting status code is equal to expected, False otherwise (or in case of error)
     """
     try:
-        response = requests.get(url, timeout=timeout)
-    except ReadTimeoutError as exc:
-        logger.exception(f"Failed to request.get from {url}", exc_info=exc)
+        response = http_head(url, timeout=timeout)
+        if response.status_code in HEAD_NOT_ALLOWED_STATUS_CODES:
+            response = http_get(url, timeout=timeout)
+    except requests.exceptions.RequestException as exc:
+        logger.exception(f"Failed to check status code of {url}", exc_info=exc)
         return False
 
     if response.status_code == status_code:
@@ -38,12 +107,69 @@ def check_url_status_code(
     return False
 
 
-def parse_link_tag(link_tag: Tag, host_url: str) -> dict:
+class PageHeadParser(HTMLParser):
+    """
+    Incremental HTML parser collecting `<title>`, `<meta>` and `<link>` tags from the
+    `<head>` of the document. Parsing is done when `</head>` or `<body>` is reached,
+    so the rest of the document does not have to be read at all.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title: str | None = None
+        self.meta: dict[str, str] = {}
+        self.link_tags: list[dict] = []
+        self.done = False
+        self._title_parts: list[str] | None = None
+
+    def handle_starttag(  # noqa: C901
+        self, tag: str, attrs: list[tuple[str, str | None]]
+    ):
+        if self.done:
+            return
+
+        if tag == "body":
+            self.close_head()
+        elif tag == "title" and self.title is None:
+            self._title_parts = []
+        elif tag == "meta":
+            self.handle_meta_tag(dict(attrs))
+        elif tag == "link":
+            self.link_tags.append(dict(attrs))
+
+    def handle_endtag(self, tag: str):
+        if tag == "title" and self._title_parts is not None:
+            # Treat empty <title> as missing
+            self.title = "".join(self._title_parts) or None
+            self._title_parts = None
+        elif tag == "head":
+            self.close_head()
+
+    def handle_data(self, data: str):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def handle_meta_tag(self, attrs: dict):
+        """
+        Remember `content` of the first `<meta>` tag with each `property`.
+        """
+        meta_property = attrs.get("property")
+        if meta_property and meta_property not in self.meta:
+            self.meta[meta_property] = attrs.get("content") or ""
+
+    def close_head(self):
+        """
+        Mark the head as parsed, ignoring the rest of the document.
+        """
+        self.done = True
+
+
+def parse_link_tag(link_tag: dict, host_url: str) -> dict:
     """
-    Parse full URL and image size from link Tag, which in turn was parsed by BeautifulSoup
+    Parse full URL and image size from attributes of the <link> tag, which in turn was parsed
     from HTML document.
 
-    :param Tag link_tag: <link> tag parsed by BeautifulSoup from HTML document.
+    :param dict link_tag: attributes of the <link> tag parsed from HTML document.
     :param str host_url: host's full URL (e.g. http://hazadus.ru/), used to build full
                          URL of the icon file.
     :return: dict with link (str) and size (int), e.g. {"href": "http://hazadus.ru/image.png", "size": 192}
@@ -67,26 +193,24 @@ def parse_link_tag(link_tag: Tag, host_url: str) -> dict:
     return {"href": href, "size": size}
 
 
-def parse_best_favicon_url(html: BeautifulSoup, host_url: str) -> str | None:
+def parse_best_favicon_url(link_tags: list[dict], host_url: str) -> str | None:
     """
-    Parse URL of "best" favicon in `html` document.
+    Parse URL of "best" favicon from <link> tags of HTML document.
     We assume that the "best" icon is the one with max "size" attribute, in case there's multiple
     links to icons in the document, with "sizes" attributes.
 
-    :param BeautifulSoup html: HTML document parsed by BeautifulSoup
+    :param list[dict] link_tags: attributes of all <link> tags parsed from HTML document.
     :param str host_url: host's full URL (e.g. http://hazadus.ru/), used to build full
                          URL of the icon file.
     :return: full URL of the icon file, or None if there were no icons found. This URL is tested for
-             accessibility (`requests.get()` on it returned 200).
+             accessibility (HEAD request to it returned 200).
     """
-    icons = []
-    # Parse all <link> tags, where "rel" attribute contains word "icon":
-    link_tags = html.find_all("link", attrs={"rel": re.compile(".*icon.*", re.I)})
-
-    # Parse each <link> tag found for icon's URL and size
-    for link_tag in link_tags:
-        # Add to `icons`: {href, size}
-        icons.append(parse_link_tag(link_tag=link_tag, host_url=host_url))
+    # Parse each <link> tag, where "rel" attribute contains word "icon", for icon's URL and size
+    icons = [
+        parse_link_tag(link_tag=link_tag, host_url=host_url)
+        for link_tag in link_tags
+        if "icon" in (link_tag.get("rel") or "").lower()
+    ]
 
     # No icon links found
     if not len(icons):
@@ -104,55 +228,114 @@ def parse_best_favicon_url(html: BeautifulSoup, host_url: str) -> str | None:
     return None
 
 
-def parse_page_meta(html: BeautifulSoup, host_url: str) -> dict:
+def parse_page_meta(page_head: PageHeadParser, host_url: str) -> dict:
     """
-    Parse page title and meta info - description, image - from `html` document.
+    Parse page title and meta info - description, image - from the head of HTML document.
 
-    :param BeautifulSoup html: HTML document parsed by BeautifulSoup
+    :param PageHeadParser page_head: parser which was fed with the HTML document.
     :param str host_url: host's full URL (e.g. http://hazadus.ru/), used to build full
                          URL of the image file.
     :return: dict `{"title": "...", "description": "...", "image_url": "...",}`.
     """
-    title = html.title.string if html.title else "Unknown Title"
-    description_soup = html.find("meta", property="og:description")
-    image_url_soup = html.find("meta", property="og:image")
-
-    image_url = ""
-    if image_url_soup:
-        image_url = image_url_soup["content"]
-        if not image_url.startswith("http"):
-            image_url = host_url + image_url[1:]
+    image_url = page_head.meta.get("og:image", "")
+    if image_url and not image_url.startswith("http"):
+        image_url = host_url + image_url[1:]
 
     return {
-        "title": title,
-        "description": description_soup["content"] if description_soup else "",
+        "title": page_head.title if page_head.title is not None else "Unknown Title",
+        "description": page_head.meta.get("og:description", ""),
         "image_url": image_url,
     }
 
 
-def parse_page_info_from_url(url: str) -> dict:
+def parse_page_head_from_url(url: str) -> PageHeadParser:
+    """
+    Stream HTML document from `url` and parse its head, stopping at `</head>` or after
+    `PAGE_HEAD_MAX_BYTES` bytes, whichever comes first.
+
+    :param str url: URL of the HTML document.
+    :return: `PageHeadParser` fed with the head of the document.
+    :raises requests.exceptions.RequestException: in case of HTTP error.
+    """
+    page_head = PageHeadParser()
+    bytes_read = 0
+
+    with http_get_stream(url) as response:
+        chunks = response.iter_content(chunk_size=PAGE_HEAD_CHUNK_SIZE)
+        first_bytes = _read_charset_sniff_bytes(chunks)
+        decoder = _get_incremental_decoder(response, first_bytes)
+        for chunk in itertools.chain([first_bytes], chunks):
+            page_head.feed(decoder.decode(chunk))
+            bytes_read += len(chunk)
+            if page_head.done or bytes_read >= PAGE_HEAD_MAX_BYTES:
+                break
+
+    page_head.close()
+    return page_head
+
+
+def _read_charset_sniff_bytes(chunks: Iterator[bytes]) -> bytes:
     """
-    Parse meta info and favicon URL from `url`.
+    Read first `CHARSET_SNIFF_BYTES` bytes of the page from `chunks`, stopping early
+    at `<meta>` tag with charset or at `</head>`, so the page body is not read.
+    """
+    first_bytes = b""
+    for chunk in chunks:
+        first_bytes += chunk
+        if (
+            len(first_bytes) >= CHARSET_SNIFF_BYTES
+            or META_CHARSET_RE.search(first_bytes)
+            or b"</head" in first_bytes.lower()
+        ):
+            break
+    return first_bytes
+
+
+def _get_incremental_decoder(
+    response: requests.Response, first_bytes: bytes
+) -> codecs.IncrementalDecoder:
+    """
+    Build decoder for the response body. Use charset from `Content-Type` header, or from
+    `<meta>` tag in the `first_bytes` of the body, falling back to UTF-8.
+    """
+    encoding = None
+    if "charset" in response.headers.get("Content-Type", "").lower():
+        encoding = response.encoding
+    if not encoding and (match := META_CHARSET_RE.search(first_bytes)):
+        encoding = match.group(1).decode("ascii")
+
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def parse_page_info_from_url(url: str, with_favicon: bool = True) -> dict:
+    """
+    Parse meta info and favicon URL from `url`. Only the head of the page is downloaded and parsed.
 
     :param str url: URL to parse meta tags and favicon link from.
+    :param bool with_favicon: if False, don't look for favicon (and don't make request to check it).
     :return: `{"title": "...", "description": "...", "image_url": "...", "favicon_url": "..."}` on success,
              or None otherwise.
     :raises CantGetPageInfoFromURL: in case of any error.
     """
     try:
-        response = requests.get(url, timeout=5.0)
+        page_head = parse_page_head_from_url(url)
     except Exception as exc:
         logger.exception(f"Failed to get content from {url}", exc_info=exc)
         raise CantGetPageInfoFromURL
 
-    html = BeautifulSoup(response.content, "html.parser")
-
     # We need host URL to build full link to favicon or image in case it is set as relative path.
     parsed_uri = urlparse(url)
     host_url = "{uri.scheme}://{uri.netloc}/".format(uri=parsed_uri)
 
-    meta = parse_page_meta(html=html, host_url=host_url)
-    favicon_url = parse_best_favicon_url(html=html, host_url=host_url)
+    meta = parse_page_meta(page_head=page_head, host_url=host_url)
+    favicon_url = (
+        parse_best_favicon_url(link_tags=page_head.link_tags, host_url=host_url)
+        if with_favicon
+        else None
+    )
 
     return {
         "title": meta["title"],
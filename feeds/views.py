@@ -3,7 +3,8 @@ import logging
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.http import HttpRequest, HttpResponse
+from django.db.models import QuerySet
+from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views import View
@@ -17,20 +18,25 @@ from django.views.generic import (
 )
 from django.views.generic.base import ContextMixin, TemplateView
 
-from feeds.forms import FeedCreateForm
+from feeds.forms import FeedCreateForm, FeedUpdateForm
 from feeds.models import Entry, Feed
 from feeds.selectors import (
+    InvalidCursor,
     get_all_feeds,
     get_all_folders,
+    get_entry_page,
     get_entry_queryset,
     get_feed,
     get_folder,
     get_next_entry,
     get_previous_entry,
-    get_total_entry_count,
-    get_unread_entry_count,
+    get_smart_feed_counts,
+    get_user_entries,
 )
 from feeds.services import (
+    feed_change_url,
+    feed_create,
+    folders_update_entry_counters,
     mark_entry_as_read,
     mark_feed_as_read,
     toggle_entry_is_favorite,
@@ -52,27 +58,14 @@ class BaseFeedColumnView(ContextMixin, View):
 
         context["folders"] = get_all_folders(user=self.request.user)
 
-        context["all_entries_count"] = get_total_entry_count(
-            user=self.request.user, mode="all"
-        )
-        context["all_unread_count"] = get_unread_entry_count(
-            user=self.request.user, mode="all"
-        )
-        context["today_entries_count"] = get_total_entry_count(
-            user=self.request.user, mode="today"
-        )
-        context["today_unread_count"] = get_unread_entry_count(
-            user=self.request.user, mode="today"
-        )
-        context["unread_entries_count"] = get_total_entry_count(
-            user=self.request.user, mode="unread"
-        )
-        context["read_entries_count"] = get_total_entry_count(
-            user=self.request.user, mode="read"
-        )
-        context["favorites_entries_count"] = get_total_entry_count(
-            user=self.request.user, mode="favorites"
-        )
+        counts = get_smart_feed_counts(user=self.request.user)
+        context["all_entries_count"] = counts.all
+        context["all_unread_count"] = counts.all_unread
+        context["today_entries_count"] = counts.today
+        context["today_unread_count"] = counts.today_unread
+        context["unread_entries_count"] = counts.unread
+        context["read_entries_count"] = counts.read
+        context["favorites_entries_count"] = counts.favorites
         return context
 
 
@@ -107,6 +100,25 @@ class BaseEntryColumnView(ContextMixin, View):
 
         return context
 
+    def get_entry_count(self, context: dict, entry_queryset: QuerySet) -> int:
+        """
+        Get total number of entries in `entry_queryset` from the counters, if possible,
+        so it isn't counted on every page.
+        """
+        mode = context["mode"]
+        feed_or_folder = context.get("feed") or context.get("folder")
+        if not feed_or_folder:
+            return context[f"{mode}_entries_count"]
+
+        # Entries of other users' feeds are not listed
+        if feed_or_folder.user_id == self.request.user.pk and mode == "all":
+            return feed_or_folder.total_entry_count
+        if feed_or_folder.user_id == self.request.user.pk and mode == "unread":
+            return feed_or_folder.unread_entry_count
+
+        # NB: `all()` is workaround for queryset caching
+        return entry_queryset.all().count()
+
 
 class FeedListView(LoginRequiredMixin, BaseFeedColumnView, ListView):
     """
@@ -128,27 +140,39 @@ class EntryListView(
     Represents two columns of the UI "Entries" and "Feeds".
     """
 
-    paginate_by = 15
+    page_size = 15
     model = Entry
     template_name = "feeds/layout.html"
     context_object_name = "entries"
 
     def get_queryset(self):
-        mode = self.kwargs.get("mode", None)
-        queryset = get_entry_queryset(user=self.request.user, mode=mode)
-
-        if in_feed := self.request.GET.get("in_feed", None):
-            queryset = queryset.filter(feed=in_feed)
-
-        if in_folder := self.request.GET.get("in_folder", None):
-            queryset = queryset.filter(feed__folder=in_folder)
-
-        return queryset.select_related("feed").prefetch_related("tags")
+        return get_entry_queryset(
+            user=self.request.user,
+            mode=self.kwargs.get("mode", None),
+            feed=self.request.GET.get("in_feed", None),
+            folder=self.request.GET.get("in_folder", None),
+        )
 
     def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        # NB: `all()` is workaround for queryset caching
-        context["entry_count"] = self.get_queryset().all().count()
+        try:
+            entry_page = get_entry_page(
+                self.object_list,
+                cursor=self.request.GET.get("cursor", None),
+                page_size=self.page_size,
+            )
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+
+        context = super().get_context_data(object_list=entry_page.entries, **kwargs)
+        context["entry_count"] = self.get_entry_count(context, self.object_list)
+
+        params = self.request.GET.copy()
+        params.pop("cursor", None)
+        if "cursor" in self.request.GET:
+            context["first_page_url"] = f"?{params.urlencode()}"
+        if entry_page.next_cursor:
+            params["cursor"] = entry_page.next_cursor
+            context["next_page_url"] = f"?{params.urlencode()}"
         return context
 
 
@@ -167,27 +191,32 @@ class EntryDetailView(
         """
         Mark entry as "read" when user opens the page.
         """
-        mark_entry_as_read(pk=self.get_object().pk)
+        mark_entry_as_read(user=request.user, pk=self.kwargs["pk"])
         return super().get(request, *args, **kwargs)
 
+    def get_queryset(self):
+        """
+        Only entries of the feeds `user` is subscribed to are shown, with the user's marks.
+        """
+        return get_user_entries(user=self.request.user)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         mode = self.kwargs.get("mode", "all")
-        entry_queryset = get_entry_queryset(user=self.request.user, mode=mode)
-
-        if context.get("feed", None):
-            entry_queryset = entry_queryset.filter(feed=context.get("feed"))
-        elif context.get("folder", None):
-            entry_queryset = entry_queryset.filter(feed__folder=context.get("folder"))
+        entry_queryset = get_entry_queryset(
+            user=self.request.user,
+            mode=mode,
+            feed=context.get("feed", None),
+            folder=None if context.get("feed", None) else context.get("folder", None),
+        )
 
-        # NB: `all()` is workaround for queryset caching
-        context["entry_count"] = entry_queryset.all().count()
+        context["entry_count"] = self.get_entry_count(context, entry_queryset)
         # Limit number of entries here (gotta implement some kind of pagination later)
-        context["entries"] = entry_queryset.prefetch_related("feed")[:15]
+        context["entries"] = entry_queryset[:15]
 
         # Stuff specific for detailed entry view
-        entry = self.get_object()
+        entry = self.object
         context["previous_entry"] = get_previous_entry(
             user=self.request.user, entry=entry, queryset=entry_queryset
         )
@@ -212,8 +241,8 @@ def entry_export_favorites(request: HttpRequest) -> HttpResponse:
             "- [{title}]({url}) in [{feed_title}]({site_url}) on {pub_date}\n".format(
                 title=entry.title,
                 url=entry.url,
-                feed_title=entry.feed.title,
-                site_url=entry.feed.site_url,
+                feed_title=entry.feed_title,
+                site_url=entry.feed_site_url,
                 pub_date=entry.pub_date.strftime("%d.%m.%Y"),
             )
         )
@@ -233,7 +262,7 @@ def entry_toggle_is_favorite_view(request: HttpRequest, entry_pk: int) -> HttpRe
     :param HttpRequest request: HttpRequest object
     :param int entry_pk: entry where to toggle Favorite status
     """
-    toggle_entry_is_favorite(pk=entry_pk)
+    toggle_entry_is_favorite(user=request.user, pk=entry_pk)
 
     # noinspection PyArgumentList
     return redirect(
@@ -292,12 +321,18 @@ class FeedsSettingsView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
 
     def form_valid(self, form):
         """
-        Set logged in user as `user` of new Feed.
+        Subscribe logged in user to the feed source with the URL from the form.
         """
-        feed = form.save(commit=False)
-        # Associate new Feed with logged in user:
-        feed.user = self.request.user
-        feed.save()
+        feed = feed_create(
+            user=self.request.user,
+            title=form.cleaned_data["title"],
+            feed_url=form.cleaned_data["url"],
+            site_url=form.cleaned_data["site_url"],
+            image_url=form.cleaned_data["image_url"],
+            folder=form.cleaned_data["folder"],
+        )
+        # `ModelFormMixin.form_valid()` saves the form, so the created feed is set into it.
+        form.instance = feed
 
         parse_and_set_image_for_feed.delay(feed.pk)
         update_feed.delay(feed.pk)
@@ -316,7 +351,7 @@ class FeedUpdateView(
     """
 
     model = Feed
-    fields = ["url", "title", "site_url", "image_url", "folder"]
+    form_class = FeedUpdateForm
     template_name = "layout_settings.html"
     context_object_name = "feed"
     success_message = "Feed successfully updated!"
@@ -331,6 +366,20 @@ class FeedUpdateView(
         context["folders"] = get_all_folders(user=self.request.user)
         return context
 
+    def form_valid(self, form):
+        """
+        Move the feed to the source with the new URL, and entry counters of the feed to
+        the new folder, if they were changed.
+        """
+        response = super().form_valid(form)
+        if "url" in form.changed_data:
+            feed_change_url(self.object, form.cleaned_data["url"])
+        if "folder" in form.changed_data:
+            folders_update_entry_counters(
+                [form.initial.get("folder"), self.object.folder_id]
+            )
+        return response
+
     def get_success_url(self):
         return reverse_lazy("feeds:update_feed", kwargs={"pk": self.get_object().pk})
 
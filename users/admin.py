@@ -19,13 +19,13 @@ class CustomUserAdmin(UserAdmin):
     fieldsets = UserAdmin.fieldsets + (
         (
             None,
-            {"fields": ("profile_image",)},
+            {"fields": ("profile_image", "time_zone")},
         ),
     )
     # Which fields to show when creating user via admin panel:
     add_fieldsets = UserAdmin.add_fieldsets + (
         (
             None,
-            {"fields": ("profile_image",)},
+            {"fields": ("profile_image", "time_zone")},
         ),
     )
@@ -0,0 +1,17 @@
+from zoneinfo import available_timezones
+
+from django import forms
+from django.forms import ModelForm
+
+from users.models import CustomUser
+
+
+class UserProfileForm(ModelForm):
+    time_zone = forms.ChoiceField(
+        choices=[("", "Default")] + [(tz, tz) for tz in sorted(available_timezones())],
+        required=False,
+    )
+
+    class Meta:
+        model = CustomUser
+        fields = ["username", "first_name", "last_name", "profile_image", "time_zone"]
@@ -0,0 +1,26 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:54
+
+from django.db import migrations, models
+
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customuser",
+            name="time_zone",
+            field=models.CharField(
+                blank=True,
+                default="",
+                max_length=64,
+                validators=[users.models.validate_time_zone],
+                verbose_name="time zone",
+            ),
+        ),
+    ]
@@ -1,7 +1,19 @@
+from zoneinfo import ZoneInfo, available_timezones
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
+def validate_time_zone(value: str) -> None:
+    """
+    :raises ValidationError: if `value` is not a name of IANA time zone.
+    """
+    if value not in available_timezones():
+        raise ValidationError(f"Unknown time zone '{value}'")
+
+
 class CustomUser(AbstractUser):
     """
     Custom user model with additional fields.
@@ -13,6 +25,20 @@ class CustomUser(AbstractUser):
         blank=True,
         upload_to="images/profiles/",
     )
+    # Used to find out when "today" starts for the user. Empty means `settings.TIME_ZONE`.
+    time_zone = models.CharField(
+        verbose_name="time zone",
+        max_length=64,
+        blank=True,
+        default="",
+        validators=[validate_time_zone],
+    )
 
     def __str__(self):
         return self.username
+
+    def get_time_zone(self) -> ZoneInfo:
+        """
+        Return user's time zone, or the default one if it's not set.
+        """
+        return ZoneInfo(self.time_zone or settings.TIME_ZONE)
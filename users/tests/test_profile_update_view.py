@@ -16,8 +16,10 @@ class UserProfileUpdateTest(TestCase):
     fixtures = [
         "users/tests/fixtures/users.json",
         "feeds/tests/fixtures/tags.json",
+        "feeds/tests/fixtures/feed_sources.json",
         "feeds/tests/fixtures/feeds.json",
         "feeds/tests/fixtures/entries.json",
+        "feeds/tests/fixtures/entry_states.json",
     ]
 
     @classmethod
@@ -80,3 +82,24 @@ class UserProfileUpdateTest(TestCase):
         self.assertEqual(updated_user.username, new_username)
         self.assertEqual(updated_user.first_name, new_first_name)
         self.assertEqual(updated_user.last_name, new_last_name)
+
+    def test_profile_update_time_zone(self):
+        # Login
+        url = reverse("account_login")
+        self.client.post(
+            url, {"login": self.email, "password": self.password}, follow=True
+        )
+
+        url = reverse("users:user_profile", kwargs={"pk": self.user.pk})
+        data = {"username": self.user.username, "time_zone": "Asia/Tokyo"}
+        self.client.post(url, data=data, follow=True)
+        self.assertEqual(
+            CustomUser.objects.get(pk=self.user.pk).time_zone, "Asia/Tokyo"
+        )
+
+        data["time_zone"] = "Mars/Olympus_Mons"
+        response = self.client.post(url, data=data, follow=True)
+        self.assertTrue(response.context["form"].errors)
+        self.assertEqual(
+            CustomUser.objects.get(pk=self.user.pk).time_zone, "Asia/Tokyo"
+        )
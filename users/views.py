@@ -3,6 +3,7 @@ from django.contrib.messages.views import SuccessMessageMixin
 from django.urls import reverse_lazy
 from django.views.generic import UpdateView
 
+from users.forms import UserProfileForm
 from users.models import CustomUser
 
 
@@ -10,7 +11,7 @@ class UserProfileView(
     LoginRequiredMixin, UserPassesTestMixin, SuccessMessageMixin, UpdateView
 ):
     model = CustomUser
-    fields = ["username", "first_name", "last_name", "profile_image"]
+    form_class = UserProfileForm
     template_name = "layout_settings.html"
     success_message = "Profile successfully updated!"
 